@@ -0,0 +1,153 @@
+# _common.py
+"""Small helpers shared by the benchmark scripts.
+
+Benchmarks are plain scripts, run from the repository root, e.g.:
+    python -m benchmarks.bench_hidden_files
+
+They never touch the real notes: `use_temp_data_folder()` must be
+called before anything from `scripts` is imported so that every
+data path points into a throwaway folder.
+"""
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import types
+from pathlib import Path
+
+RESULTS_FOLDER = Path(__file__).resolve().parent / "results"
+
+
+def use_temp_data_folder(prefix="bmtb_bench_") -> Path:
+    """Point %APPDATA% (where all BM data lives) at a temp folder."""
+    folder = Path(tempfile.mkdtemp(prefix=prefix))
+    os.environ["APPDATA"] = str(folder)
+    return folder
+
+
+def shim_windows_modules():
+    """Stand in for Windows-only modules so benchmarks run on Linux CI.
+
+    `scripts.utils.set_user_env_var` needs `winreg`; no benchmark
+    calls it, but this keeps any import of it from failing.
+    """
+    try:
+        import winreg  # noqa: F401
+    except ImportError:
+        winreg = types.ModuleType("winreg")
+        winreg.HKEY_CURRENT_USER = None
+        winreg.KEY_SET_VALUE = None
+        winreg.REG_SZ = None
+        sys.modules["winreg"] = winreg
+
+
+def parse_size(text) -> int:
+    """'512', '4KB', '5MB' -> number of bytes."""
+    text = text.strip().upper()
+    for suffix, factor in (("KB", 1024), ("MB", 1024 ** 2),
+                           ("GB", 1024 ** 3), ("B", 1)):
+        if text.endswith(suffix):
+            return int(float(text[:-len(suffix)]) * factor)
+    return int(text)
+
+
+def human_size(n) -> str:
+    for unit in ("B", "KB", "MB", "GB"):
+        if n < 1024 or unit == "GB":
+            return f"{n:g}{unit}" if unit == "B" else f"{n:.0f}{unit}"
+        n /= 1024
+
+
+WORDS = ("the of and to in is you that it he was for on are as with his "
+         "they at be this have from or one had by word but not what all "
+         "were we when your can said there use an each which she do how "
+         "their if will up other about out many then them these so some "
+         "plan idea note write think later today tomorrow remember").split()
+
+
+def make_body(rng, size) -> str:
+    """Return roughly `size` characters of word-like text."""
+    paragraph = []
+    length = 0
+    while length < min(size, 4096):
+        word = rng.choice(WORDS)
+        paragraph.append(word)
+        length += len(word) + 1
+    text = " ".join(paragraph) + "\n"
+    # Repeat one paragraph for big bodies: generating 5 MB of random
+    # words per note would dominate the run time.
+    return (text * (size // len(text) + 1))[:size]
+
+
+def summarize(samples) -> dict:
+    """Return latency stats (in milliseconds) for a list of seconds."""
+    ms = sorted(s * 1000 for s in samples)
+    if not ms:
+        return {"n": 0}
+    return {
+        "n": len(ms),
+        "min_ms": ms[0],
+        "p50_ms": statistics.median(ms),
+        "p95_ms": ms[min(len(ms) - 1, int(len(ms) * 0.95))],
+        "max_ms": ms[-1],
+        "mean_ms": statistics.fmean(ms),
+    }
+
+
+def time_calls(func, repeat=100, *args, **kwargs) -> dict:
+    """Call `func` `repeat` times and summarize each call's latency."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def write_results(name, results, path=None) -> Path:
+    """Save benchmark results as JSON so versions can be compared."""
+    from scripts.constants import APP_VERSION
+
+    if path is None:
+        RESULTS_FOLDER.mkdir(parents=True, exist_ok=True)
+        path = RESULTS_FOLDER / f"{name}-{APP_VERSION}.json"
+    payload = {
+        "benchmark": name,
+        "app_version": APP_VERSION,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2)
+    return Path(path)
+
+
+def compare_results(old_path, new_results: dict):
+    """Print how each case's p50 moved compared to an older results file."""
+    with open(old_path, "r", encoding="utf-8") as f:
+        old = json.load(f)
+    print(f"\nCompared to {old.get('app_version')} ({old_path}):")
+    for case, stats in new_results.items():
+        before = old.get("results", {}).get(case, {}).get("p50_ms")
+        if before is None or "p50_ms" not in stats:
+            continue
+        ratio = stats["p50_ms"] / before if before else float("inf")
+        flag = "  <-- slower" if ratio > 1.2 else ""
+        print(f"{case:<40} {before:9.3f} -> {stats['p50_ms']:9.3f} ms"
+              f"  (x{ratio:.2f}){flag}")
+
+
+def print_table(results: dict):
+    """Print `{case: stats}` as a simple aligned table."""
+    for case, stats in results.items():
+        if "p50_ms" not in stats:
+            print(f"{case:<40} {stats}")
+            continue
+        print(f"{case:<40} p50 {stats['p50_ms']:9.3f} ms"
+              f"   p95 {stats['p95_ms']:9.3f} ms"
+              f"   max {stats['max_ms']:9.3f} ms")
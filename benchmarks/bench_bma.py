@@ -0,0 +1,83 @@
+# bench_bma.py
+"""Throughput of handing activities (POAs) to BMA.
+
+    python -m benchmarks.bench_bma
+    python -m benchmarks.bench_bma --activities 10,100,1000
+
+Runs ActivitiesAPI against benchmarks/stub_bma.py (a small Python
+program standing in for Activities.exe) and compares:
+- one process per activity (the previous behaviour, max_batch=1);
+- batched hand-off: many activities per `add` call.
+Every run checks that the stub received exactly the activities sent.
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from pathlib import Path
+
+from benchmarks._common import (compare_results, print_table, summarize,
+                                use_temp_data_folder, write_results)
+
+DATA_FOLDER = use_temp_data_folder()
+
+from scripts.bma_express import MAX_BATCH, ActivitiesAPI  # noqa: E402
+
+STUB = Path(__file__).resolve().parent / "stub_bma.py"
+
+logging.disable(logging.INFO)
+
+
+def received(path) -> list:
+    if not path.exists():
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line)["activity"] for line in f]
+
+
+def run(activities, out_file, single=False) -> float:
+    out_file.unlink(missing_ok=True)
+    os.environ["STUB_BMA_FILE"] = str(out_file)
+    api = ActivitiesAPI(bma_command=[sys.executable, str(STUB)],
+                        max_batch=1 if single else MAX_BATCH)
+    start = time.perf_counter()
+    added = api.add_activities(activities)
+    elapsed = time.perf_counter() - start
+    got = received(out_file)
+    if added != len(activities) or sorted(got) != sorted(activities):
+        raise SystemExit(f"stub got {len(got)} of {len(activities)} "
+                         f"activities (add_activities said {added})")
+    return elapsed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--activities", default="10,100,500",
+                        help="comma separated batch sizes")
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--compare", help="older results file to diff with")
+    args = parser.parse_args(argv)
+
+    out_file = DATA_FOLDER / "activities.jsonl"
+
+    results = {}
+    for count in (int(n) for n in args.activities.split(",")):
+        activities = [f"Plan item {i}: follow up on note {i}"
+                      for i in range(count)]
+        per_process = run(activities, out_file, single=True)
+        batched = run(activities, out_file)
+        results[f"one_per_process[{count}]"] = summarize([per_process])
+        results[f"batched[{count}]"] = summarize([batched])
+        results[f"batched_per_second[{count}]"] = {
+            "activities_per_s": round(count / batched)}
+
+    print_table(results)
+    if args.compare:
+        compare_results(args.compare, results)
+    print(f"Saved: {write_results('bma', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
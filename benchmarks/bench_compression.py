@@ -0,0 +1,153 @@
+# bench_compression.py
+"""Database size and load time with and without compressed bodies.
+
+    python -m benchmarks.bench_compression
+    python -m benchmarks.bench_compression --notes 2000 --body-size 32KB
+    python -m benchmarks.bench_compression --large-note 4MB --edits 50
+
+Writes the same encrypted corpus twice, once as plain TEXT (the old
+format) and once converted by recompact_notes() the way the app does
+it in the background, then compares:
+- database file size (after VACUUM);
+- how long recompaction took;
+- get_note (open one note: read + decompress) and get_notes_page
+  (list the sidebar, which never reads bodies).
+
+It also saves one large note over and over with a small edit each
+time, stored whole (zlib) and as deduplicated chunks, and reports save
+latency, how many bytes each save had to write and, for chunks, how
+many reference counts it updated.
+"""
+import argparse
+import logging
+import os
+import random
+import shutil
+import time
+
+from benchmarks._common import (WORDS, compare_results, human_size,
+                                parse_size, print_table,
+                                shim_windows_modules, summarize,
+                                time_calls, use_temp_data_folder,
+                                write_results)
+
+DATA_FOLDER = use_temp_data_folder()
+shim_windows_modules()
+
+from scripts import chunk_store, utils  # noqa: E402
+from scripts.cipher import SimpleCipher  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+
+def prose(rng, size) -> str:
+    """Non-repeating word salad: compresses about like real prose."""
+    words, length = [], 0
+    while length < size:
+        word = rng.choice(WORDS)
+        words.append(word + ("\n" if rng.random() < 0.05 else " "))
+        length += len(words[-1])
+    return "".join(words)[:size]
+
+
+def measure(label, db_path, ids, samples) -> dict:
+    utils.NOTES_DB = db_path
+    rng = random.Random(0)
+    return {
+        f"db_size[{label}]": {"bytes": os.path.getsize(db_path)},
+        f"get_note[{label}]": time_calls(
+            lambda: utils.get_note(rng.choice(ids)), samples),
+        f"get_notes_page[{label}]": time_calls(utils.get_notes_page,
+                                               samples),
+    }
+
+
+def bench_edits(label, text, edits, rng) -> dict:
+    """Save `text` `edits` times, inserting a line somewhere each time."""
+    utils.NOTES_DB = DATA_FOLDER / f"edits_{label}.db"
+    utils.create_table()
+    note_id = utils.add_note("Large", text)
+    times, written, refs = [], [], []
+    for i in range(edits):
+        at = text.find("\n", rng.randrange(len(text))) + 1
+        text = text[:at] + f"edit {i}\n" + text[at:]
+        chunk_store.STATS.clear()
+        start = time.perf_counter()
+        utils.update_note(note_id, "Large", text)
+        times.append(time.perf_counter() - start)
+        if label == "chunked":
+            written.append(chunk_store.STATS["bytes_written"])
+            refs.append(chunk_store.STATS["refs_updated"])
+        else:
+            written.append(len(utils.encode_content(text)))
+    results = {f"save_large[{label}]": summarize(times),
+               f"bytes_per_save[{label}]": {
+                   "mean": round(sum(written) / len(written))}}
+    if refs:
+        results["refs_per_save[chunked]"] = {
+            "mean": round(sum(refs) / len(refs))}
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=500)
+    parser.add_argument("--body-size", default="16KB")
+    parser.add_argument("--samples", type=int, default=200)
+    parser.add_argument("--large-note", default="1MB",
+                        help="size of the note for the edit benchmark")
+    parser.add_argument("--edits", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--compare", help="older results file to diff with")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    size = parse_size(args.body_size)
+    cipher = SimpleCipher()
+    print(f"writing {args.notes} x {human_size(size)}...")
+
+    plain_db = DATA_FOLDER / "plain.db"
+    utils.NOTES_DB = plain_db
+    utils.create_table()
+    utils.set_compression(False)
+    utils.add_notes((f"Note {i}", cipher.encrypt(prose(rng, size)))
+                    for i in range(args.notes))
+    utils.vacuum()
+    ids = [note["id"] for note in utils.iter_notes()]
+
+    packed_db = DATA_FOLDER / "compressed.db"
+    shutil.copyfile(plain_db, packed_db)
+    utils.NOTES_DB = packed_db
+    utils.set_compression(True)
+    start = time.perf_counter()
+    rewritten, saved = utils.recompact_notes()
+    recompact = time.perf_counter() - start
+    utils.vacuum()
+
+    results = {}
+    results.update(measure("text", plain_db, ids, args.samples))
+    results.update(measure("zlib", packed_db, ids, args.samples))
+    results["recompact_notes"] = summarize([recompact])
+    results["recompacted"] = {"notes": rewritten, "bytes_saved": saved}
+
+    large = cipher.encrypt(prose(rng, parse_size(args.large_note)))
+    chunk_min = utils.CHUNK_MIN_CHARS
+    utils.CHUNK_MIN_CHARS = len(large) + 1  # store it whole
+    results.update(bench_edits("whole", large, args.edits,
+                               random.Random(args.seed)))
+    utils.CHUNK_MIN_CHARS = chunk_min
+    results.update(bench_edits("chunked", large, args.edits,
+                               random.Random(args.seed)))
+
+    print_table(results)
+    ratio = (results["db_size[zlib]"]["bytes"]
+             / results["db_size[text]"]["bytes"])
+    print(f"compressed database is {ratio:.0%} of the plain one")
+    if args.compare:
+        compare_results(args.compare, results)
+    print(f"Saved: {write_results('compression', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
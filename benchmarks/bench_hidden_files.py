@@ -0,0 +1,62 @@
+# bench_hidden_files.py
+"""Per-call latency of the hidden JSON files (license, device id, email).
+
+    python -m benchmarks.bench_hidden_files [--repeat N]
+
+On Windows the old `os.system('attrib ...')` approach is measured too,
+for comparison. Elsewhere hiding is a no-op and only file I/O is timed.
+"""
+import argparse
+import os
+import sys
+
+from benchmarks._common import (print_table, time_calls,
+                                use_temp_data_folder, write_results)
+
+use_temp_data_folder()
+
+from scripts import constants  # noqa: E402
+from scripts.constants import (HIDDEN_FOLDER, bootstrap,  # noqa: E402
+                               read_json_file, write_json_file,
+                               get_device_id)
+
+
+def legacy_hideables(file, hide=True):
+    """The previous implementation: two `attrib` processes per call."""
+    flag = "+H" if hide else "-H"
+    os.system(f'attrib {flag} "{HIDDEN_FOLDER}"')
+    os.system(f'attrib {flag} "{file}"')
+
+
+def legacy_read_json_file(file):
+    legacy_hideables(file, hide=False)
+    read_json_file(file)
+    legacy_hideables(file, hide=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args(argv)
+    bootstrap(with_logging=False)
+
+    file = HIDDEN_FOLDER / "bench.json"
+    write_json_file(file, {"device_id": "bench"})
+
+    results = {
+        "write_json_file": time_calls(
+            write_json_file, args.repeat, file, {"device_id": "bench"}),
+        "read_json_file": time_calls(read_json_file, args.repeat, file),
+        "get_device_id": time_calls(
+            get_device_id, args.repeat, constants.ID_FILE),
+    }
+    if sys.platform == "win32":
+        results["legacy_read_json_file"] = time_calls(
+            legacy_read_json_file, min(args.repeat, 20), file)
+
+    print_table(results)
+    print(f"Saved: {write_results('hidden_files', results)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+# bench_mmap.py
+"""List and search latency with and without memory-mapped reads.
+
+    python -m benchmarks.bench_mmap
+    python -m benchmarks.bench_mmap --sizes 100MB,1GB --samples 20
+
+For every database size a synthetic notes database is written, then
+each operation is timed through scripts/utils.py with MMAP_READS off
+(a new connection per call, the old behaviour) and on (the cached,
+memory-mapped read-only connection):
+- list: the first sidebar page, and walking every page of titles;
+- search: a tag query, and reading every body (like `bmtb search`).
+
+"cold" is the first call after the OS page cache was dropped (only
+possible as root on Linux; otherwise it is just the first call on a
+fresh connection, noted in the results), "warm" the median of the
+following calls.
+"""
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import time
+
+from benchmarks._common import (compare_results, human_size, make_body,
+                                parse_size, print_table,
+                                shim_windows_modules, summarize,
+                                use_temp_data_folder, write_results)
+
+DATA_FOLDER = use_temp_data_folder()
+shim_windows_modules()
+
+from scripts import utils  # noqa: E402
+
+logging.disable(logging.WARNING)
+
+BODY_SIZE = 64 * 1024
+
+
+def build_database(path, size, rng):
+    """Write about `size` bytes of notes (uncompressed, as TEXT)."""
+    utils.NOTES_DB = path
+    utils.create_table()
+    count = max(1, size // BODY_SIZE)
+    body = make_body(rng, BODY_SIZE)
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO notes (title, content, updated_at) VALUES"
+            " (?, ?, datetime('now', ?))",
+            ((f"Note {i}", body, f"-{i} seconds") for i in range(count)))
+        tag_id = conn.execute(
+            "INSERT INTO tags (name) VALUES ('work')").lastrowid
+        conn.executemany(
+            "INSERT INTO note_tags (note_id, tag_id) VALUES (?, ?)",
+            ((i, tag_id) for i in range(1, count + 1, 10)))
+        conn.commit()
+    return count
+
+
+def drop_os_cache() -> bool:
+    try:
+        os.sync()
+        with open("/proc/sys/vm/drop_caches", "w") as f:
+            f.write("3\n")
+        return True
+    except OSError:
+        return False
+
+
+def walk_pages():
+    page = utils.get_notes_page()
+    while page:
+        page = utils.get_notes_page(after=utils.page_cursor(page[-1]))
+
+
+def scan_bodies():
+    for note in utils.iter_notes():
+        "needle" in note["content"]
+
+
+OPERATIONS = {
+    "list:first_page": utils.get_notes_page,
+    "list:all_pages": walk_pages,
+    "search:tag": lambda: utils.get_notes_by_tags(["work"],
+                                                  with_content=False),
+    "search:bodies": scan_bodies,
+}
+
+
+def time_operation(func, samples):
+    utils.close_read_connection()
+    os_cold = drop_os_cache()
+    start = time.perf_counter()
+    func()
+    cold = time.perf_counter() - start
+    warm = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        func()
+        warm.append(time.perf_counter() - start)
+    return cold, warm, os_cold
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", default="100MB,1GB",
+                        help="comma separated database sizes")
+    parser.add_argument("--samples", type=int, default=10,
+                        help="warm calls per operation")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--compare", help="older results file to diff with")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    results = {}
+    for size in (parse_size(s) for s in args.sizes.split(",")):
+        label = human_size(size)
+        path = DATA_FOLDER / f"mmap_{label}.db"
+        print(f"building {label} database...")
+        count = build_database(path, size, rng)
+        results[f"notes[{label}]"] = {"count": count}
+
+        for mode, enabled in (("no_mmap", False), ("mmap", True)):
+            utils.set_mmap_reads(enabled)
+            for name, func in OPERATIONS.items():
+                samples = args.samples if not name.endswith(
+                    ("all_pages", "bodies")) else max(1, args.samples // 5)
+                cold, warm, os_cold = time_operation(func, samples)
+                results[f"{name}:cold[{mode},{label}]"] = {
+                    **summarize([cold]), "os_cache_dropped": os_cold}
+                results[f"{name}:warm[{mode},{label}]"] = summarize(warm)
+
+        utils.close_read_connection()
+        path.unlink()
+
+    print_table(results)
+    if args.compare:
+        compare_results(args.compare, results)
+    print(f"Saved: {write_results('mmap', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
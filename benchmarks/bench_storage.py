@@ -0,0 +1,151 @@
+# bench_storage.py
+"""Benchmark the notes storage layer (scripts/utils.py).
+
+    python -m benchmarks.bench_storage
+    python -m benchmarks.bench_storage --notes 10,1000,100000 \\
+        --body-sizes 1KB,64KB,5MB --budget 2GB
+    python -m benchmarks.bench_storage --compare old-results.json
+
+For every (number of notes, body size) pair a synthetic corpus is
+written into a temporary NOTES_DB and these are timed:
+create_table, save_note (insert and update), get_notes, get_notes_page
+(first page and from the middle), count_notes, delete_note,
+clear_all_notes and migrate_from_json.
+
+Pairs whose corpus would be larger than --budget are skipped.
+Results are saved to benchmarks/results/ as JSON.
+"""
+import argparse
+import json
+import logging
+import random
+import sqlite3
+import time
+
+from benchmarks._common import (compare_results, human_size, make_body,
+                                parse_size, print_table,
+                                shim_windows_modules, summarize,
+                                time_calls, use_temp_data_folder,
+                                write_results)
+
+DATA_FOLDER = use_temp_data_folder()
+shim_windows_modules()
+
+from scripts import utils  # noqa: E402
+
+# The size warning in create_table is expected here
+logging.disable(logging.WARNING)
+
+def populate(db_path, count, body):
+    """Bulk-insert `count` notes directly (setup, not measured)."""
+    utils.NOTES_DB = db_path
+    utils.create_table()
+    with sqlite3.connect(db_path) as conn:
+        conn.executemany(
+            "INSERT INTO notes (title, content) VALUES (?, ?)",
+            ((f"Note {i}", body) for i in range(count)))
+        conn.commit()
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    func(*args)
+    return summarize([time.perf_counter() - start])
+
+
+def bench_case(count, size, rng, samples) -> dict:
+    tag = f"{count}x{human_size(size)}"
+    db_path = DATA_FOLDER / f"bench_{tag}.db"
+    body = make_body(rng, size)
+    results = {}
+
+    utils.NOTES_DB = db_path
+    results[f"create_table[empty:{tag}]"] = timed(utils.create_table)
+    populate(db_path, count, body)
+    results[f"create_table[{tag}]"] = time_calls(utils.create_table, 5)
+
+    results[f"get_notes[{tag}]"] = time_calls(
+        utils.get_notes, max(1, min(samples, 20_000_000 // (count * size))))
+
+    first_page = utils.get_notes_page()
+    results[f"get_notes_page:first[{tag}]"] = time_calls(
+        utils.get_notes_page, samples)
+    if len(first_page) == utils.PAGE_SIZE:
+        last = utils.get_notes_page(limit=1, after=utils.page_cursor(
+            utils.get_notes_page(limit=count // 2)[-1]))
+        results[f"get_notes_page:middle[{tag}]"] = time_calls(
+            utils.get_notes_page, samples, after=utils.page_cursor(last[0]))
+    results[f"count_notes[{tag}]"] = time_calls(utils.count_notes, samples)
+
+    n = min(samples, 50)
+    results[f"save_note:insert[{tag}]"] = time_calls(
+        utils.save_note, n, "Bench", body)
+    ids = [note["id"] for note in utils.get_notes()[:n]]
+    update_times = []
+    for note_id in ids:
+        start = time.perf_counter()
+        utils.save_note("Bench (edited)", body, note_id)
+        update_times.append(time.perf_counter() - start)
+    results[f"save_note:update[{tag}]"] = summarize(update_times)
+
+    delete_times = []
+    for note_id in ids:
+        start = time.perf_counter()
+        utils.delete_note(note_id)
+        delete_times.append(time.perf_counter() - start)
+    results[f"delete_note[{tag}]"] = summarize(delete_times)
+
+    results[f"clear_all_notes[{tag}]"] = timed(utils.clear_all_notes)
+
+    json_path = DATA_FOLDER / f"bench_{tag}.json"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump([{"title": f"Note {i}", "content": body}
+                   for i in range(min(count, 10_000))], f)
+    results[f"migrate_from_json[{min(count, 10_000)}x"
+            f"{human_size(size)}]"] = timed(utils.migrate_from_json,
+                                            str(json_path))
+
+    utils.close_read_connection()
+    db_path.unlink(missing_ok=True)
+    json_path.unlink(missing_ok=True)
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", default="10,1000,10000,100000",
+                        help="comma separated corpus sizes")
+    parser.add_argument("--body-sizes", default="1KB,64KB,1MB,5MB",
+                        help="comma separated note body sizes")
+    parser.add_argument("--budget", default="256MB",
+                        help="skip corpora larger than this")
+    parser.add_argument("--samples", type=int, default=30,
+                        help="calls per per-call measurement")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--compare", help="older results file to diff with")
+    args = parser.parse_args(argv)
+
+    counts = [int(n) for n in args.notes.split(",")]
+    sizes = [parse_size(s) for s in args.body_sizes.split(",")]
+    budget = parse_size(args.budget)
+    rng = random.Random(args.seed)
+
+    results = {}
+    for count in counts:
+        for size in sizes:
+            if count * size > budget:
+                print(f"skip {count} x {human_size(size)} (over budget)")
+                continue
+            print(f"running {count} x {human_size(size)}...")
+            results.update(bench_case(count, size, rng, args.samples))
+
+    print()
+    print_table(results)
+    if args.compare:
+        compare_results(args.compare, results)
+    print(f"Saved: {write_results('storage', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+# bench_switcher.py
+"""Quick switcher (Ctrl+P) title search on a large number of notes.
+
+    python -m benchmarks.bench_switcher
+    python -m benchmarks.bench_switcher --notes 200000 --queries 2000
+
+Builds a TitleIndex over synthetic titles (a few words each, from a
+vocabulary of made-up words plus the common ones in _common.WORDS) and
+times:
+- building the index, and the memory it takes;
+- searches by query kind: 1-2 characters, a word prefix, a substring,
+  two words, and misses that fall back to subsequence matching;
+- updating a title (save) and removing one (delete).
+"""
+import argparse
+import random
+import time
+import tracemalloc
+
+from benchmarks._common import (WORDS, compare_results, print_table,
+                                summarize, use_temp_data_folder,
+                                write_results)
+
+DATA_FOLDER = use_temp_data_folder()
+
+from scripts.title_index import TitleIndex  # noqa: E402
+
+SYLLABLES = ("ba be bi bo ka ke ko la le li lo ma me mi mo na ne no"
+             " ra re ri ro sa se si so ta te ti to va ve vi").split()
+
+
+def make_titles(rng, count):
+    vocabulary = list(WORDS) + [
+        "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        for _ in range(3000)]
+    return vocabulary, [
+        " ".join(rng.choice(vocabulary) for _ in range(rng.randint(1, 5)))
+        for _ in range(count)]
+
+
+def make_queries(rng, titles, vocabulary, count):
+    queries = {"short": [], "prefix": [], "substring": [], "two_words": [],
+               "miss": []}
+    for _ in range(count):
+        words = rng.choice(titles).split()
+        word = rng.choice(words)
+        queries["short"].append(word[:rng.randint(1, 2)])
+        queries["prefix"].append(word[:rng.randint(3, max(3, len(word)))])
+        start = rng.randrange(max(1, len(word) - 3))
+        queries["substring"].append(word[start:start + 4])
+        queries["two_words"].append(
+            f"{rng.choice(vocabulary)[:4]} {rng.choice(words)[:3]}")
+        # Letters of a word, in order, with gaps: not a substring
+        queries["miss"].append(word[::2] + "q")
+    return queries
+
+
+def time_each(func, items) -> dict:
+    samples = []
+    for item in items:
+        start = time.perf_counter()
+        func(item)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=100_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--compare", help="older results file to diff with")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    vocabulary, titles = make_titles(rng, args.notes)
+    print(f"indexing {args.notes} titles...")
+
+    start = time.perf_counter()
+    index = TitleIndex(enumerate(titles, start=1))
+    build = time.perf_counter() - start
+    # Again, for its size (tracing makes building much slower)
+    tracemalloc.start()
+    sized = TitleIndex(enumerate(titles, start=1))
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del sized
+
+    results = {"build": summarize([build]),
+               "index_memory": {"MB": round(memory / 2 ** 20, 1)}}
+    queries = make_queries(rng, titles, vocabulary, args.queries)
+    for kind, items in queries.items():
+        results[f"search[{kind}]"] = time_each(index.search, items)
+        hits = sum(bool(index.search(q)) for q in items)
+        results[f"hit_rate[{kind}]"] = {"percent": round(
+            100 * hits / len(items))}
+
+    ids = [rng.randint(1, args.notes) for _ in range(args.queries)]
+    results["set_title"] = time_each(
+        lambda i: index.set(i, rng.choice(titles)), ids)
+    results["remove"] = time_each(index.remove, set(ids))
+
+    print_table(results)
+    if args.compare:
+        compare_results(args.compare, results)
+    print(f"Saved: {write_results('switcher', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
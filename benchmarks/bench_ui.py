@@ -0,0 +1,222 @@
+# bench_ui.py
+"""UI latency benchmark for NotesApp, headless under Xvfb.
+
+    python -m benchmarks.bench_ui
+    python -m benchmarks.bench_ui --notes 500 --body-size 256KB --keys 400
+
+Starts the real NotesApp on a virtual X display (Xvfb is started
+automatically when $DISPLAY is not set) against a temporary, seeded
+database, with the license and update managers stubbed out. It then
+types synthetic keystrokes (including Enter on bullet lines), switches
+between notes through the sidebar and toggles focus mode.
+
+Two kinds of numbers are recorded:
+- per-call latency of refresh_list, load_note, save_current_note,
+  handle_bullets and focus_write (through scripts.perf);
+- frame-to-frame event-loop lag: how late a 10 ms heartbeat fires
+  while the scripted session runs. This is the lag users feel.
+"""
+import argparse
+import contextlib
+import os
+import random
+import shutil
+import subprocess
+import time
+
+from benchmarks._common import (compare_results, make_body, parse_size,
+                                print_table, shim_windows_modules,
+                                summarize, use_temp_data_folder,
+                                write_results)
+
+DATA_FOLDER = use_temp_data_folder()
+shim_windows_modules()
+
+from scripts import perf  # noqa: E402
+from scripts.constants import bootstrap  # noqa: E402
+from scripts.cipher import SimpleCipher  # noqa: E402
+from scripts import utils  # noqa: E402
+
+HEARTBEAT_MS = 10
+KEYSYMS = {" ": "space", "\n": "Return", "-": "minus", ".": "period"}
+
+
+@contextlib.contextmanager
+def virtual_display(size="1280x800x24"):
+    """Run Xvfb for the duration of the block, unless a display exists."""
+    if os.getenv("DISPLAY"):
+        yield os.environ["DISPLAY"]
+        return
+    if not shutil.which("Xvfb"):
+        raise SystemExit("No $DISPLAY and Xvfb is not installed.")
+
+    display = f":{random.randint(100, 999)}"
+    proc = subprocess.Popen(["Xvfb", display, "-screen", "0", size,
+                             "-nolisten", "tcp"],
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL)
+    os.environ["DISPLAY"] = display
+    try:
+        time.sleep(0.5)  # give the server a moment to accept clients
+        yield display
+    finally:
+        proc.terminate()
+        proc.wait()
+        del os.environ["DISPLAY"]
+
+
+class StubLicenseManager:
+    def __init__(self, master):
+        self.master = master
+
+    def is_premium_user(self):
+        return True  # no freemium note limit during benchmarks
+
+    def _show_license_window(self, master):
+        pass
+
+
+class StubUpdater:
+    def __init__(self, parent, auto_install=True):
+        pass
+
+    def check_update_background(self):
+        pass
+
+    def check_update_and_prompt(self):
+        pass
+
+
+def seed_database(count, body_size, rng):
+    """Fill the temporary NOTES_DB the way the app would."""
+    bootstrap(with_logging=False)
+    utils.create_table()
+    cipher = SimpleCipher()
+    for i in range(count):
+        body = f"- plan item {i}\n" + make_body(rng, body_size)
+        utils.add_note(f"Note {i}", cipher.encrypt(body))
+
+
+def build_app():
+    import note_app
+
+    note_app.LicenseManager = StubLicenseManager
+    note_app.AutoUpdater = StubUpdater
+    # .ico files are Windows-only; the icon is irrelevant here.
+    note_app.NotesApp.wm_iconbitmap = lambda self, *a, **kw: None
+
+    app = note_app.NotesApp()
+    app.geometry("900x500")
+    app.update()
+    return app
+
+
+class Session:
+    """Runs scripted steps on the Tk event loop and measures its lag."""
+
+    def __init__(self, app, step_gap_ms=15):
+        self.app = app
+        self.step_gap_ms = step_gap_ms
+        self.steps = []
+        self.lags = []
+        self.running = False
+
+    def add(self, func, *args):
+        self.steps.append((func, args))
+
+    def _heartbeat(self, expected):
+        if not self.running:
+            return
+        now = time.perf_counter()
+        self.lags.append(max(0.0, now - expected))
+        self.app.after(HEARTBEAT_MS, self._heartbeat,
+                       time.perf_counter() + HEARTBEAT_MS / 1000)
+
+    def _next(self, i=0):
+        if i >= len(self.steps):
+            # let pending autosaves and idle tasks settle, then stop
+            self.app.after(1000, self._stop)
+            return
+        func, args = self.steps[i]
+        func(*args)
+        self.app.after(self.step_gap_ms, self._next, i + 1)
+
+    def _stop(self):
+        self.running = False
+        self.app.quit()
+
+    def run(self):
+        self.running = True
+        self.app.after(0, self._heartbeat,
+                       time.perf_counter())
+        self.app.after(0, self._next)
+        self.app.mainloop()
+        return summarize(self.lags)
+
+
+def press(widget, char):
+    keysym = KEYSYMS.get(char, char)
+    widget.event_generate("<KeyPress>", keysym=keysym)
+    widget.event_generate("<KeyRelease>", keysym=keysym)
+
+
+def script_session(session, app, rng, keys, switches):
+    text = app.textbox._textbox  # the underlying tk.Text
+
+    session.add(text.focus_force)
+    session.add(text.mark_set, "insert", "end")
+    typed = "- buy milk\nwrite the report\n\n"
+    for i in range(keys):
+        session.add(press, text, typed[i % len(typed)])
+
+    for _ in range(switches):
+        session.add(lambda: app.note_buttons[
+            rng.randrange(len(app.note_buttons))].invoke())
+
+    for _ in range(4):
+        session.add(app.focus_write)
+    session.add(app.refresh_list)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--notes", type=int, default=200)
+    parser.add_argument("--body-size", default="64KB")
+    parser.add_argument("--keys", type=int, default=300,
+                        help="synthetic keystrokes to type")
+    parser.add_argument("--switches", type=int, default=40,
+                        help="note switches through the sidebar")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="where to write the JSON results")
+    parser.add_argument("--compare", help="older results file to diff with")
+    args = parser.parse_args(argv)
+
+    rng = random.Random(args.seed)
+    seed_database(args.notes, parse_size(args.body_size), rng)
+
+    with virtual_display():
+        perf.enable()
+        start = time.perf_counter()
+        app = build_app()
+        startup = time.perf_counter() - start
+
+        session = Session(app)
+        script_session(session, app, rng, args.keys, args.switches)
+        lag = session.run()
+        app.destroy()
+
+    results = {"startup": summarize([startup]),
+               "event_loop_lag": lag}
+    for name, stats in perf.stats().items():
+        results[name] = {"n": stats["count"], "p50_ms": stats["p50_ms"],
+                         "p95_ms": stats["p95_ms"],
+                         "max_ms": stats["max_ms"]}
+
+    print_table(results)
+    if args.compare:
+        compare_results(args.compare, results)
+    print(f"Saved: {write_results('ui', results, args.output)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# stub_bma.py
+"""A stand-in for BMA's `Activities.exe`, for benchmarks and tests.
+
+    python benchmarks/stub_bma.py add "Buy milk" "Call Ada" ...
+
+Appends each activity as a JSON line to $STUB_BMA_FILE (default:
+stub_bma.jsonl in the temp folder) and prints what it did, like BMA.
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+
+DEFAULT_FILE = os.path.join(tempfile.gettempdir(), "stub_bma.jsonl")
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] != "add":
+        print("usage: stub_bma.py add ACTIVITY [ACTIVITY ...]",
+              file=sys.stderr)
+        return 2
+    activities = argv[1:]
+
+    now = time.time()
+    with open(os.getenv("STUB_BMA_FILE", DEFAULT_FILE), "a",
+              encoding="utf-8") as f:
+        for activity in activities:
+            f.write(json.dumps({"activity": activity, "added": now}) + "\n")
+    print(f"Added {len(activities)} activities.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,11 @@
+# bmtb.py
+"""Entry point of the `bmtb` command-line API (see scripts/cli.py).
+
+    python bmtb.py list
+"""
+import sys
+
+from scripts.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
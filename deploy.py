@@ -12,6 +12,7 @@ from scripts.constants import (
     APP_VERSION,
     APP_SHORT_NAME,
     DEPLOY_INFO_PATH,
+    bootstrap,
     write_json_file,
     read_json_file
 )
@@ -391,6 +392,7 @@ def reminder_crucial():
 
 if __name__ == "__main__":
     main()
+    bootstrap(with_logging=False)  # deploy.info lives in the data folder
     write_json_file(DEPLOY_INFO_PATH, deploy_info)
     
     # optionally modify the constants.py file after everydeploy
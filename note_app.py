@@ -6,46 +6,131 @@ with license key verification using RSA public key cryptography.
 
 # This key must be have been generated at the same time as the private key
 # used to sign the license keys. Otherwise, license verification will fail.
-from scripts.password_manager import (PasswordManager, SimpleCipher,)
+from scripts.password_manager import PasswordManager
+from scripts.cipher import SimpleCipher
 from scripts.constants import (APP_NAME,
                                APP_ICON, APP_VERSION,
 
+                               NOTES_DB,
                                PASS_FILE,
+                               bootstrap,
                                logging,)
 
-from scripts.utils import (center_window, create_table,
+from scripts.utils import (center_window, count_notes, create_table,
+                           recompact_notes,
+                           get_all_titles,
+                           get_existing_ids,
+                           get_notes_changed_since,
+                           latest_update,
+                           SaveConflict,
+                           update_note,
+                           set_compression,
+                           set_mmap_reads,
                            delete_note,
-                           get_notes,
-                           save_note)
-from scripts.settings import (SettingsWindow, load_settings)
+                           get_editor_state,
+                           get_note,
+                           get_notes_by_tags,
+                           get_notes_page,
+                           iter_notes,
+                           get_meta,
+                           set_meta,
+                           page_cursor,
+                           parse_tags,
+                           save_editor_state,
+                           save_note,
+                           set_note_tags)
+from scripts.settings import (SettingsWindow, load_settings, save_settings)
 from scripts.license_manager import LicenseManager
+from scripts.licensing import MAX_FREEMIUM_NOTES
+from scripts.editor_buffer import LineBuffer, TextWatcher
+from scripts.editor_state import EditorState, EditorStateCache, UndoStack
+from scripts.note_cache import DEFAULT_BUDGET_MB, NoteCache
+from scripts.poa import PoaScanner, extract_poas
+from scripts.bma_express import ActivitiesAPI
+from scripts.maintenance import (MaintenanceScheduler, convert_auto_vacuum,
+                                 release_free_pages)
+from scripts.journal import EditJournal
+from scripts.instances import DatabaseWatcher, InstanceLock
+from scripts.quick_switcher import QuickSwitcher
+from scripts.title_index import TitleIndex
+from scripts.display_titles import DisplayTitles
+from scripts.text_stats import TextStats
+from scripts.perf import traced
+from scripts import perf
 from scripts.auto_updater import AutoUpdater
 import sys
+import threading
 import customtkinter as ctk
 from tkinter import messagebox as tkmsg
 
+# Notes longer than this (in characters) are put into the editor
+# a chunk at a time so the window never freezes while loading.
+LARGE_NOTE_CHARS = 200_000
+LOAD_CHUNK_CHARS = 50_000
+# How often to look for "open" requests and other writers' changes
+SYNC_POLL_MS = 500
+# How long the closed app waits for the POA scan to finish
+POA_SCAN_WAIT_SECONDS = 5
+# Room for a title inside a sidebar button (px, at the button's font)
+SIDEBAR_TEXT_PX = 150
+
 
 class NotesApp(ctk.CTk):
-    def __init__(self):
+    def __init__(self, instance=None):
         """Initialize the NotesApp, load settings, password, freemium checks, and UI"""
         super().__init__()
+        bootstrap()  # data folders + logging (no-op if already done)
+        # Receives "open" from app launches while this one runs
+        self.instance = instance or InstanceLock()
 
         # Database
         try:
             create_table()
         except Exception as e:
             logging.error(f"Error while creating table: {e}")
+        try:
+            # Once, for older databases; a full VACUUM, so it runs
+            # before the window opens and anything else is saving.
+            convert_auto_vacuum(NOTES_DB)
+        except Exception as e:
+            logging.error(f"Switching to incremental vacuum failed: {e}")
+        try:
+            # Before the read connection maps the file (Windows can't
+            # truncate a mapped file)
+            release_free_pages(NOTES_DB)
+        except Exception as e:
+            logging.error(f"Releasing free pages failed: {e}")
 
         self.init_settings()
         self.init_managers()
-        self.start_ui()
-
         self.current_note = ""
         self.autosave_after_id = None
+        self.poa_thread = None
+        self.start_ui()
 
     # --- Managers and settings ---
     def init_settings(self):
         settings = load_settings()
+        if settings.get("performance_tracing", False):
+            perf.enable()
+        # Keep each note's cursor/scroll position across restarts
+        self.persist_editor_state = settings.get(
+            "remember_editor_state", True)
+        # Decrypted bodies of recently opened notes
+        self.note_cache = NoteCache(
+            settings.get("note_cache_mb", DEFAULT_BUDGET_MB) * 1024 * 1024)
+        # Notes written before tags existed get indexed once
+        self.tags_indexed = settings.get("tags_indexed", False)
+        # Long note bodies are stored compressed; existing notes are
+        # converted in the background when the setting changes.
+        self.compress_notes = settings.get("compress_notes", True)
+        set_compression(self.compress_notes)
+        set_mmap_reads(settings.get("mmap_reads", True))
+        self.recompact_needed = settings.get(
+            "notes_compacted") != self.compress_notes
+        # Database upkeep (vacuum, ANALYZE) waits for this much idle time
+        self.maintenance = MaintenanceScheduler(
+            self, NOTES_DB, settings.get("maintenance_idle_seconds", 30))
         self.locked = settings.get("request_password", False)
         if self.locked:
             while self.locked:
@@ -63,6 +148,9 @@ class NotesApp(ctk.CTk):
         self.cipher = SimpleCipher()
         self.encrypt = self.cipher.encrypt
         self.decrypt = self.cipher.decrypt
+        # Edits not saved yet, kept safe from crashes
+        self.journal = EditJournal(encrypt=self.encrypt,
+                                   decrypt=self.decrypt)
 
         # Settings + Password
         self.password = None
@@ -88,7 +176,15 @@ class NotesApp(ctk.CTk):
         self.wm_title(f"{APP_NAME} {APP_VERSION}")
         self.wm_iconbitmap(APP_ICON)
 
-        self.notes = self.load_notes()
+        # The sidebar holds one page of notes at first and fetches the
+        # next page when scrolled near the bottom.
+        self.notes = []
+        self._note_ids = set()
+        self.notes_cursor = None
+        self.all_notes_loaded = False
+        self._page_after_id = None
+        self.recover_unsaved_edits()
+        self.load_notes()
         self.current_index = None
 
         # Sidebar
@@ -109,8 +205,20 @@ class NotesApp(ctk.CTk):
                                            command=self.delete_note, width=80)
         self.delete_button.pack(side="right", pady=5)
 
+        # Only show notes having all of the typed #tags
+        self.tag_filter = None  # ids of the notes to show, None = all
+        self.tag_entry = ctk.CTkEntry(
+            self.sidebar, placeholder_text="Filter: #tag #other")
+        self.tag_entry.pack(fill="x", padx=2)
+        self.tag_entry.bind("<Return>", lambda e: self.filter_by_tags())
+        self.tag_entry.bind(
+            "<KeyRelease>",
+            lambda e: self.filter_by_tags() if not self.tag_entry.get()
+            else None)
+
         self.scrollable_list = ctk.CTkScrollableFrame(self.sidebar, width=200)
         self.scrollable_list.pack(fill="both", expand=True)
+        self._watch_list_scroll()
 
         pair = ctk.CTkFrame(self.sidebar)
         pair.pack(fill="x")
@@ -128,7 +236,11 @@ class NotesApp(ctk.CTk):
             command=self.focus_write)
         focus_btn.pack(side="right")
 
+        # The sidebar's display model: what each button currently shows,
+        # so a refresh only reconfigures the rows that changed.
         self.note_buttons = []
+        self._button_rows = []  # (index, text, selected) per button
+        self.display_titles = DisplayTitles(ctk.CTkFont(), SIDEBAR_TEXT_PX)
 
         # Editor
         self.right_side = ctk.CTkFrame(self, height=300)
@@ -142,10 +254,42 @@ class NotesApp(ctk.CTk):
             self.editor_frame, placeholder_text="Title")
         self.title_entry.pack(fill="x", pady=5)
 
+        # Tk's own undo is off: undo history is kept per note by
+        # `self.undo_stack` instead (see scripts/editor_state.py).
         self.textbox = ctk.CTkTextbox(
-            self.editor_frame, undo=True, wrap=ctk.WORD)
+            self.editor_frame, undo=False, wrap=ctk.WORD)
         self.textbox.pack(fill="both", expand=True, pady=5)
 
+        self.status_bar = ctk.CTkLabel(
+            self.editor_frame, text="", anchor="e", height=16,
+            text_color="#888888", font=ctk.CTkFont(size=11))
+        self.status_bar.pack(fill="x", padx=5)
+
+        # Mirror every edit into a line buffer so saving doesn't have
+        # to read the whole document back out of the widget.
+        self.text_watcher = TextWatcher(self.textbox._textbox)
+        self.line_buffer = LineBuffer()
+        self.text_watcher.add_listener(self.line_buffer.apply)
+        self.text_stats = TextStats()
+        self.text_watcher.add_listener(self.text_stats.apply)
+        self.text_watcher.add_listener(self.journal.record)
+        self.text_watcher.add_listener(
+            lambda change: self.schedule_status_update())
+        self._status_after_id = None
+
+        # Cursor, scroll and undo history of recently opened notes
+        self.editor_states = EditorStateCache()
+        self.undo_stack = UndoStack()
+        self._pending_view = None
+        self.text_watcher.add_listener(
+            lambda change: self.undo_stack.record(change))
+        self.text_watcher.undo_handler = lambda: self.undo_stack.undo(
+            self.textbox)
+        self.text_watcher.redo_handler = lambda: self.undo_stack.redo(
+            self.textbox)
+        self.loading_note = False
+        self._chunk_after_id = None
+
         self.extra_bt_frame = ctk.CTkFrame(self.right_side)
         self.unfocus_btn = ctk.CTkButton(
             self.extra_bt_frame, text="Unfocus",
@@ -157,17 +301,72 @@ class NotesApp(ctk.CTk):
         self.textbox.bind("<KeyRelease>", lambda e: self.schedule_autosave())
         self.title_entry.bind("<Return>", lambda e: self.textbox.focus_set())
         self.textbox.bind("<Return>", self.handle_bullets)
+        # Ctrl+P: quick switcher. On the textbox too, where it would
+        # otherwise move the cursor up a line.
+        self.title_index = None  # built on first use
+        for widget in (self, self.textbox):
+            widget.bind("<Control-p>", self.open_quick_switcher)
+            widget.bind("<Control-P>", self.open_quick_switcher)
 
         self.wm_protocol("WM_DELETE_WINDOW", self.on_close)
+        self.bind("<Unmap>", self.on_minimize)
 
         if not self.notes:
             self.add_note()
         else:
             self.load_note(0)
         self.after(400, self.refresh_list)
+        if not self.tags_indexed:
+            threading.Thread(target=self.index_all_tags, daemon=True,
+                             name="Tag indexer").start()
+        if self.recompact_needed:
+            threading.Thread(target=self.recompact_storage, daemon=True,
+                             name="Recompaction").start()
+        self.maintenance.start()
+
+        # Other processes writing to the database (bmtb, a second
+        # window when single_instance is off)
+        self.db_watcher = DatabaseWatcher(NOTES_DB)
+        self.db_watcher.changed()
+        self._synced_at = latest_update()
+        self._note_count = count_notes()
+        self.after(SYNC_POLL_MS, self._poll_other_instances)
+
+    def open_quick_switcher(self, event=None):
+        if self.title_index is None:
+            self.title_index = TitleIndex(get_all_titles())
+        QuickSwitcher(self, self.title_index, self.open_note_by_id)
+        return "break"
+
+    def _index_title(self, note_id, title):
+        """Keep the quick switcher's index in step (title None = gone)."""
+        if self.title_index is None or not note_id:
+            return
+        if title is None:
+            self.title_index.remove(note_id)
+        else:
+            self.title_index.set(note_id, title)
+
+    def open_note_by_id(self, note_id):
+        """Open a note, adding it to the sidebar if it isn't listed yet."""
+        for index, note in enumerate(self.notes):
+            if note.get("id") == note_id:
+                break
+        else:
+            note = get_note(note_id)
+            if note is None:
+                self._index_title(note_id, None)
+                return
+            self.notes.append(note)
+            self._note_ids.add(note_id)
+            index = len(self.notes) - 1
+            self._add_note_button(index, note)
+        self.load_note(index)
 
     def schedule_autosave(self):
         """Schedule an autosave after a short delay to reduce excessive writes."""
+        self.maintenance.touch()
+        self.journal.record_title(self.title_entry.get())
         if self.autosave_after_id:
             self.after_cancel(self.autosave_after_id)
         self.autosave_after_id = self.after(500, self.save_current_note)
@@ -175,16 +374,220 @@ class NotesApp(ctk.CTk):
     def on_close(self):
         """Handle app close event, process POAs and destroy window."""
         try:
-            pass
-            # Pause on BMA integration for now.
-            # poas = self.get_poas(current_content)
-            # self.bma.make_activities(poas)
+            if self.autosave_after_id:
+                self.after_cancel(self.autosave_after_id)
+                self.autosave_after_id = None
+                self.save_current_note()
+        except Exception as e:
+            # The journal still has the edits for the next start
+            logging.error(f"Final save failed: {e}")
+        try:
+            if self.persist_editor_state and self.current_index is not None:
+                self.remember_editor_state()
+            self.note_cache.clear()
+            # The scan runs after the window is gone; it only needs the
+            # database and the cipher, never Tk. main() waits for it a
+            # few seconds at most.
+            self.poa_thread = threading.Thread(
+                target=self.send_new_poas, daemon=True, name="POA scan")
+            self.poa_thread.start()
         except Exception as e:
             logging.error(f"Error during app close: {e}")
         finally:
+            self.journal.close()
+            self.db_watcher.close()
             logging.info("App closed successfully.")
+            self.withdraw()
             self.destroy()
 
+    def recover_unsaved_edits(self):
+        """Save the edits a crash kept from being saved last time."""
+        def load(note_id):
+            note = get_note(note_id)
+            if note is None:
+                return None
+            return note["title"], self.decrypt(note["content"])
+
+        try:
+            for note_id, title, text in self.journal.recover(load):
+                save_note(title, self.encrypt(text), note_id)
+                set_note_tags(note_id, parse_tags(text))
+                self.note_cache.invalidate(note_id)
+                logging.info(f"Recovered unsaved edits of note {note_id}.")
+        except Exception as e:
+            logging.error(f"Recovering unsaved edits failed: {e}")
+
+    def _poll_other_instances(self):
+        try:
+            for message in self.instance.pending():
+                if message == "open":
+                    self.bring_to_front()
+            if self.db_watcher.changed():
+                self.sync_external_changes()
+        except Exception as e:
+            logging.error(f"Syncing with other instances failed: {e}")
+        try:
+            self.after(SYNC_POLL_MS, self._poll_other_instances)
+        except Exception:
+            pass  # window destroyed
+
+    def bring_to_front(self):
+        """Show the window; the app was launched again."""
+        self.deiconify()
+        self.lift()
+        self.focus_force()
+
+    def sync_external_changes(self):
+        """Update the notes someone else saved, added or deleted."""
+        changed = get_notes_changed_since(self._synced_at)
+        if changed:
+            self._synced_at = changed[0]["updated_at"]
+        positions = {note.get("id"): i for i, note in enumerate(self.notes)}
+        new, list_changed = [], False
+        for row in changed:
+            i = positions.get(row["id"])
+            if i is None:
+                new.append(row)
+                self._index_title(row["id"], row["title"])
+                continue
+            note = self.notes[i]
+            if note.get("version") == row["version"]:
+                continue  # e.g. our own save
+            self._index_title(row["id"], row["title"])
+            self.note_cache.invalidate(row["id"])
+            list_changed |= note.get("title") != row["title"]
+            if i == self.current_index:
+                self._reload_current_note(row)
+            else:
+                note.clear()  # content is fetched again when opened
+                note.update(row)
+
+        count = count_notes()
+        if count < self._note_count + len(new):
+            gone = self._note_ids - get_existing_ids(self._note_ids)
+            # Ids only known from a tag filter or a save aren't listed
+            listed = (positions.get(note_id) for note_id in gone)
+            for i in sorted((i for i in listed if i is not None),
+                            reverse=True):
+                self._forget_deleted_note(i)
+            self._note_ids -= gone
+            list_changed |= bool(gone)
+        self._note_count = count
+
+        if new:
+            self.notes[0:0] = new
+            self._note_ids.update(row["id"] for row in new)
+            if self.current_index is not None:
+                self.current_index += len(new)
+            list_changed = True
+        if list_changed:
+            self.refresh_list()
+
+    def _reload_current_note(self, row):
+        note = self.notes[self.current_index]
+        if self.line_buffer.dirty\
+                or self.title_entry.get() != note.get("title"):
+            # The next save finds the new version and keeps both copies
+            return
+        fresh = get_note(row["id"])
+        if fresh is None:
+            return
+        same = fresh["content"] == note.get("content")
+        note.update(fresh)
+        self.title_entry.delete(0, "end")
+        self.title_entry.insert(0, fresh["title"])
+        if same:
+            return
+        content = self.decrypt(fresh["content"])
+        cursor, scroll = self.textbox.index("insert"), self.textbox.yview()[0]
+        self.show_content(content)
+        self.journal.checkpoint(row["id"], fresh["title"], content)
+        self.undo_stack = UndoStack()
+        if self.loading_note:
+            self._pending_view = (cursor, scroll)
+        else:
+            self._restore_view(cursor, scroll)
+
+    def _forget_deleted_note(self, index):
+        note_id = self.notes[index].get("id")
+        self._index_title(note_id, None)
+        self._note_ids.discard(note_id)
+        self.editor_states.discard(note_id)
+        self.note_cache.invalidate(note_id)
+        self.display_titles.discard(note_id)
+        if index == self.current_index:
+            if self.line_buffer.dirty:
+                # Still being edited: the next save adds it back
+                self.notes[index]["id"] = None
+                return
+            self.journal.clear()
+            self.title_entry.delete(0, "end")
+            self.show_content("")
+            self.undo_stack = UndoStack()
+            self.current_index = None
+        elif self.current_index is not None and index < self.current_index:
+            self.current_index -= 1
+        del self.notes[index]
+
+    def reset_after_clear(self):
+        """Forget every note; the database was just emptied."""
+        self._cancel_chunked_load()
+        self.notes.clear()
+        self._note_ids.clear()
+        self.notes_cursor = None
+        self.all_notes_loaded = True
+        self.current_index = None
+        self.tag_filter = None
+        self.tag_entry.delete(0, "end")
+        self.editor_states.clear()
+        self.note_cache.clear()
+        self.display_titles.clear()
+        self.title_index = None  # rebuilt on next use
+        self.journal.clear()
+        self.undo_stack = UndoStack()
+        self.title_entry.delete(0, "end")
+        self.show_content("")
+        self._synced_at = latest_update()
+        self._note_count = count_notes()
+        self.refresh_list()
+
+    def get_poas(self, content):
+        """Return the plans of action (bullets, TODOs) in `content`."""
+        return extract_poas(content)
+
+    def send_new_poas(self):
+        """Hand POAs added since the last close over to BMA."""
+        try:
+            bma = ActivitiesAPI()
+            if bma.status != "installed":
+                return  # the install reminder needs a window
+            scanner = PoaScanner()
+            # Only notes saved since the last scan are read
+            scanned_at = latest_update()
+            since = None if scanner.first_scan\
+                else get_meta("poa_scanned_at")
+            poas = scanner.scan(iter_notes(since=since), self.decrypt,
+                                complete=since is None)
+            if since is not None:
+                scanner.forget_deleted(get_existing_ids(scanner.note_ids()))
+            if poas:
+                added = bma.add_activities(poas)
+                logging.info(f"Sent {added} of {len(poas)} new POAs to BMA.")
+            scanner.save()
+            if scanned_at is not None:
+                set_meta("poa_scanned_at", scanned_at)
+        except Exception as e:
+            logging.error(f"POA scan failed: {e}")
+
+    def on_minimize(self, event=None):
+        """Forget decrypted notes while a password-protected app is hidden."""
+        if event is not None and event.widget is not self:
+            return
+        if self.state() == "iconic"\
+                and load_settings().get("request_password", False):
+            self.note_cache.clear()
+
+    @traced()
     def focus_write(self):
         # This is also a valuable feature given the UI
         """Toggle focus mode: hides/shows sidebar and extra buttons."""
@@ -202,21 +605,54 @@ class NotesApp(ctk.CTk):
 
     def get_note_count(self):
         """Return current number of notes"""
-        return len(self.load_notes())
+        return count_notes()
 
     # --------------------------
 
     # --- Note-based methods ---
 
     def load_notes(self) -> list:
-        """Load all notes from the database."""
-        return get_notes()
+        """Load the next page of notes from the database.
+
+        Returns the notes added to `self.notes` (without content, which
+        is fetched when a note is opened).
+        """
+        if self.all_notes_loaded:
+            return []
+        page = get_notes_page(after=self.notes_cursor)
+        if not page:
+            self.all_notes_loaded = True
+            return []
+        self.notes_cursor = page_cursor(page[-1])
+        # Notes may already be here, e.g. shown by a tag filter
+        page = [note for note in page if note["id"] not in self._note_ids]
+        self.notes.extend(page)
+        self._note_ids.update(note["id"] for note in page)
+        return page
+
+    def load_more_notes(self):
+        """Add the next page of notes to the sidebar."""
+        self._page_after_id = None
+        start = len(self.notes)
+        if self.load_notes():
+            for idx in range(start, len(self.notes)):
+                self._add_note_button(idx, self.notes[idx])
+
+    def _watch_list_scroll(self):
+        """Fetch the next page when the sidebar is scrolled near the end."""
+        canvas = self.scrollable_list._parent_canvas
+        scrollbar_set = canvas.cget("yscrollcommand")
+
+        def on_scroll(first, last):
+            self.tk.call(scrollbar_set, first, last)
+            if float(last) > 0.9 and not self.all_notes_loaded\
+                    and self._page_after_id is None:
+                self._page_after_id = self.after_idle(self.load_more_notes)
+
+        canvas.configure(yscrollcommand=on_scroll)
 
     def add_note(self):
         """Create a new note, save current, and enforce freemium limits."""
-        MAX_FREEMIUM_NOTES = 5
-        #
-
         # --- Mandatory Security Check ---
         if not self.license_manager.is_premium_user()\
                 and self.get_note_count() >= MAX_FREEMIUM_NOTES:
@@ -233,10 +669,12 @@ class NotesApp(ctk.CTk):
 
         if self.current_index is not None:
             self.save_current_note(index_to_save=self.current_index)
+            self.remember_editor_state()
 
         self.current_index = None
         self.title_entry.delete(0, "end")
-        self.textbox.delete("1.0", "end")
+        self.show_content("")
+        self.undo_stack = UndoStack()
         self.title_entry.insert(0, "New Note")
         self.title_entry.focus_set()
 
@@ -245,66 +683,229 @@ class NotesApp(ctk.CTk):
         self.title_entry.select_range(0, "end")
         self.title_entry.focus()
 
+    @traced()
     def save_current_note(self, index_to_save=None):
         """Save the current note or a specified note index to the database."""
-        idx, content = self.get_current_note(index_to_save)
-        content_encrypted = self.encrypt(content)
+        idx = index_to_save if index_to_save is not None else self.current_index
         title = self.title_entry.get()
+        if idx is not None and self.notes[idx].get("id")\
+                and not self.line_buffer.dirty\
+                and self.notes[idx].get("title") == title:
+            return  # nothing was edited since the last save
+
+        idx, content = self.get_current_note(index_to_save)
+        # Only the lines edited since the last save are encrypted again
+        content_encrypted = self.line_buffer.encoded(self.encrypt)
 
         if idx is not None:
             note_id = self.notes[idx].get("id")
             if note_id:
-                save_note(title, content_encrypted, note_id)
-                self.notes[idx] = {"id": note_id,
-                                   "title": title, "content": content_encrypted}
+                try:
+                    version = update_note(note_id, title, content_encrypted,
+                                          self.notes[idx].get("version"))
+                except SaveConflict as conflict:
+                    note_id, title = self._keep_both_copies(
+                        idx, conflict, title, content_encrypted)
+                    version = 1
+                self.notes[idx] = {"id": note_id, "title": title,
+                                   "content": content_encrypted,
+                                   "version": version}
             else:
                 new_id = save_note(title, content_encrypted)
-                self.notes[idx] = {"id": new_id,
-                                   "title": title, "content": content_encrypted}
+                self.notes[idx] = {"id": new_id, "title": title,
+                                   "content": content_encrypted, "version": 1}
+                self._note_ids.add(new_id)
         else:
             new_id = save_note(title, content_encrypted)
             self.notes.append({"id": new_id, "title": title,
-                              "content": content_encrypted})
+                              "content": content_encrypted, "version": 1})
+            self._note_ids.add(new_id)
             self.current_index = len(self.notes) - 1
 
+        # What was just saved is what the next load would decrypt
+        saved = self.notes[idx if idx is not None else self.current_index]
+        self.note_cache.put(saved["id"], saved["version"], content)
+        self._index_title(saved["id"], saved["title"])
+        if set_note_tags(saved["id"], parse_tags(content))\
+                and self.tag_filter is not None:
+            self.tag_filter = self._notes_with_tags(self.tag_entry.get())
+        self.line_buffer.mark_saved()
+        if self.current_index is not None\
+                and saved is self.notes[self.current_index]:
+            self.journal.checkpoint(saved["id"], title,
+                                    self.line_buffer.text())
         self.refresh_list()
 
+    def _keep_both_copies(self, idx, conflict, title, content_encrypted):
+        """Save ours as a new note when the stored one changed meanwhile.
+
+        Returns the id and title of our copy; the other version stays
+        where it was and is listed right after it.
+        """
+        title = f"{title} (conflicting copy)"
+        new_id = save_note(title, content_encrypted)
+        self._note_ids.add(new_id)
+        logging.warning(f"Save conflict ({conflict});"
+                        f" this window's text was saved as note {new_id}.")
+        other = get_note(conflict.note_id) if conflict.found else None
+        if other is None:
+            self._note_ids.discard(conflict.note_id)
+        else:
+            del other["content"]
+            self.note_cache.invalidate(conflict.note_id)
+            self.notes.insert(idx + 1, other)
+            if self.current_index is not None and self.current_index > idx:
+                self.current_index += 1
+        if idx == self.current_index:
+            self.title_entry.delete(0, "end")
+            self.title_entry.insert(0, title)
+        return new_id, title
+
     def get_current_note(self, index_to_save=None):
         """Return the current note index and content (unencrypted)."""
         idx = index_to_save if index_to_save is not None else self.current_index
-        content = self.textbox.get("1.0", "end-1c").strip()
+        content = self.line_buffer.text().strip()
         return idx, content
 
+    @traced()
     def refresh_list(self):
-        """Refresh the sidebar list of notes and update buttons."""
-        for btn in self.note_buttons:
-            btn.destroy()
-        self.note_buttons.clear()
+        """Refresh the sidebar list of notes and update buttons.
 
+        Buttons are reused: each row is only reconfigured if its note,
+        title or highlight changed since the last refresh.
+        """
+        row = 0
         for idx, note in enumerate(self.notes):
-            display_title = self._truncate_text(
-                note.get("title", "Untitled"), 20)
+            if self._listed(note):
+                self._show_row(row, idx, note)
+                row += 1
+        for btn in self.note_buttons[row:]:
+            btn.destroy()
+        del self.note_buttons[row:]
+        del self._button_rows[row:]
+
+    def _listed(self, note) -> bool:
+        return self.tag_filter is None or not note.get("id")\
+            or note["id"] in self.tag_filter
+
+    def _add_note_button(self, idx, note):
+        if self._listed(note):
+            self._show_row(len(self.note_buttons), idx, note)
+
+    def _show_row(self, row, idx, note):
+        text = self.display_titles.get(note.get("id"),
+                                       note.get("title", "Untitled"))
+        state = (idx, text, idx == self.current_index)
+        color = "#555555" if state[2] else "#333333"
+        if row == len(self.note_buttons):
             btn = ctk.CTkButton(
-                self.scrollable_list, fg_color="#333333", text=display_title, width=180,
+                self.scrollable_list, fg_color=color, text=text, width=180,
                 command=lambda i=idx: self.load_note(i))
             btn.pack(pady=2)
             self.note_buttons.append(btn)
+            self._button_rows.append(state)
+            return
+        old = self._button_rows[row]
+        if old == state:
+            return
+        changes = {}
+        if old[0] != idx:
+            changes["command"] = lambda i=idx: self.load_note(i)
+        if old[1] != text:
+            changes["text"] = text
+        if old[2] != state[2]:
+            changes["fg_color"] = color
+        self.note_buttons[row].configure(**changes)
+        self._button_rows[row] = state
+
+    def _highlight_current(self):
+        for row, (idx, text, selected) in enumerate(self._button_rows):
+            if selected != (idx == self.current_index):
+                self.note_buttons[row].configure(
+                    fg_color="#333333" if selected else "#555555")
+                self._button_rows[row] = (idx, text, not selected)
+
+    def filter_by_tags(self):
+        """Apply the #tags typed in the sidebar's filter box."""
+        self.tag_filter = self._notes_with_tags(self.tag_entry.get())
+        self.refresh_list()
 
+    def _notes_with_tags(self, text):
+        tags = parse_tags(text) or {
+            word.lstrip("#").lower() for word in text.split()}
+        if not tags:
+            return None
+        matches = get_notes_by_tags(all_of=tags, with_content=False)
+        for note in matches:
+            # Matching notes from pages not fetched yet
+            if note["id"] not in self._note_ids:
+                del note["content"]
+                self.notes.append(note)
+                self._note_ids.add(note["id"])
+        return {note["id"] for note in matches}
+
+    def recompact_storage(self):
+        """Store existing notes in the current (compressed or not) format."""
+        try:
+            rewritten, saved = recompact_notes()
+            logging.info(f"Recompacted {rewritten} notes, "
+                         f"{saved / 1024:.0f} KB smaller.")
+            settings = load_settings()
+            settings["notes_compacted"] = self.compress_notes
+            save_settings(settings)
+        except Exception as e:
+            logging.error(f"Recompacting notes failed: {e}")
+
+    def index_all_tags(self):
+        """Index the #tags of notes saved before tagging existed."""
+        try:
+            # Page by page: a read left open would block the writes
+            page = get_notes_page(with_content=True)
+            while page:
+                for note in page:
+                    set_note_tags(note["id"], parse_tags(
+                        self.decrypt(note["content"])))
+                page = get_notes_page(after=page_cursor(page[-1]),
+                                      with_content=True)
+            settings = load_settings()
+            settings["tags_indexed"] = True
+            save_settings(settings)
+        except Exception as e:
+            logging.error(f"Indexing tags failed: {e}")
+
+    @traced()
     def load_note(self, index):
         """Load note by index, saving current note first."""
         if self.current_index is not None:
+            note_id = self.notes[index].get("id")
             self.save_current_note(index_to_save=self.current_index)
+            self.remember_editor_state()
+            if note_id and self.notes[index].get("id") != note_id:
+                # A save conflict listed another row above it
+                index = next(i for i, note in enumerate(self.notes)
+                             if note.get("id") == note_id)
 
         self.current_index = index
         note = self.notes[index]
+        if self.title_index is not None and note.get("id"):
+            self.title_index.touch(note["id"])  # recent in Ctrl+P
 
         self.title_entry.delete(0, "end")
         self.title_entry.insert(0, note.get("title", ""))
-        self.textbox.delete("1.0", "end")
-        self.textbox.insert("1.0", self.decrypt(note.get("content", "")))
-
-        for i, btn in enumerate(self.note_buttons):
-            btn.configure(fg_color="#555555" if i == index else "#333333")
+        content = self.note_cache.get(note.get("id"), note.get("version"))
+        if content is None:
+            if "content" not in note and note.get("id"):
+                # Listed without its content; fetch it now
+                note.update(get_note(note["id"]) or {"content": ""})
+            content = self.decrypt(note.get("content", ""))
+            self.note_cache.put(note.get("id"), note.get("version"),
+                                content)
+        self.show_content(content)
+        self.journal.checkpoint(note.get("id"), note.get("title", ""),
+                                content)
+        self.restore_editor_state(note.get("id"), content)
+
+        self._highlight_current()
 
     def delete_note(self):
         """Delete the current note after confirmation."""
@@ -317,9 +918,16 @@ class NotesApp(ctk.CTk):
             if note_id:
                 delete_note(note_id)
                 del self.notes[self.current_index]
+                self._note_ids.discard(note_id)
+                self.editor_states.discard(note_id)
+                self.note_cache.invalidate(note_id)
+                self.display_titles.discard(note_id)
+                self._index_title(note_id, None)
 
+            self.journal.clear()
             self.title_entry.delete(0, "end")
-            self.textbox.delete("1.0", "end")
+            self.show_content("")
+            self.undo_stack = UndoStack()
             self.current_index = None
 
             self.refresh_list()
@@ -328,10 +936,105 @@ class NotesApp(ctk.CTk):
 
     # --- Text-based methods ---
 
-    def _truncate_text(self, text, max_length=20):
-        """Truncate a string to fit within max_length (chr) for display in buttons."""
-        return text if len(text) <= max_length else text[:max_length - 3] + "..."
+    def show_content(self, content):
+        """Put `content` in the editor, replacing what is there.
 
+        Large notes show their first chunk straight away; the rest is
+        appended in the background while the editor is read-only.
+        """
+        self._cancel_chunked_load()
+        with self.text_watcher.paused():
+            self.textbox.delete("1.0", "end")
+            if len(content) <= LARGE_NOTE_CHARS:
+                self.textbox.insert("1.0", content)
+            else:
+                self.loading_note = True
+                self.textbox.insert("1.0", content[:LOAD_CHUNK_CHARS])
+                self.textbox.configure(state="disabled")
+                self._chunk_after_id = self.after_idle(
+                    self._load_next_chunk, content, LOAD_CHUNK_CHARS)
+        self.line_buffer.load(content)
+        self.text_stats.load(content)
+        self.schedule_status_update()
+
+    def _load_next_chunk(self, content, start):
+        end = start + LOAD_CHUNK_CHARS
+        self.textbox.configure(state="normal")
+        with self.text_watcher.paused():
+            self.textbox.insert("end", content[start:end])
+        if end < len(content):
+            self.textbox.configure(state="disabled")
+            self._chunk_after_id = self.after_idle(
+                self._load_next_chunk, content, end)
+        else:
+            self._chunk_after_id = None
+            self.loading_note = False
+            if self._pending_view is not None:
+                self._restore_view(*self._pending_view)
+
+    def remember_editor_state(self):
+        """Keep the cursor, scroll and undo history of the open note."""
+        note_id = self.notes[self.current_index].get("id")
+        if not note_id:
+            return
+        text = self.line_buffer.text()
+        stripped = text.strip()
+        state = EditorState(
+            cursor=self.textbox.index("insert"),
+            scroll=self.textbox.yview()[0],
+            undo=self.undo_stack,
+            # Saving strips the text; leading whitespace would shift
+            # every index in the undo history.
+            length=len(stripped) if text.startswith(stripped) else None)
+        self.editor_states.put(note_id, state)
+        if self.persist_editor_state:
+            save_editor_state(note_id, state.cursor, state.scroll)
+
+    def restore_editor_state(self, note_id, content):
+        """Put the view of a just-loaded note back where it was left."""
+        state = self.editor_states.get(note_id)
+        if state is None and note_id and self.persist_editor_state:
+            saved = get_editor_state(note_id)
+            if saved:
+                state = EditorState(saved["cursor"], saved["scroll"])
+
+        if state is not None and state.length == len(content):
+            self.undo_stack = state.undo
+        else:
+            self.undo_stack = UndoStack()
+
+        self._pending_view = None
+        if state is None:
+            return
+        if self.loading_note:
+            # Wait until the whole note is in the editor
+            self._pending_view = (state.cursor, state.scroll)
+        else:
+            self._restore_view(state.cursor, state.scroll)
+
+    def _restore_view(self, cursor, scroll):
+        self._pending_view = None
+        self.textbox.mark_set("insert", cursor)
+        self.textbox.yview_moveto(scroll)
+
+    def schedule_status_update(self):
+        """Refresh the status bar once the current burst of edits is done."""
+        if self._status_after_id is None:
+            self._status_after_id = self.after_idle(self._update_status_bar)
+
+    def _update_status_bar(self):
+        self._status_after_id = None
+        self.status_bar.configure(text=self.text_stats.summary())
+
+    def _cancel_chunked_load(self):
+        if self._chunk_after_id:
+            self.after_cancel(self._chunk_after_id)
+            self._chunk_after_id = None
+        if self.loading_note:
+            self.loading_note = False
+            self.textbox.configure(state="normal")
+
+    @traced()
     def handle_bullets(self, event=None):
         """Handle multiline bullet input when Enter key is pressed."""
         index = self.textbox.index("insert linestart")
@@ -352,10 +1055,22 @@ class NotesApp(ctk.CTk):
 
 
 def main():
+    bootstrap()
+    instance = InstanceLock()
+    if load_settings().get("single_instance", True)\
+            and not instance.acquire():
+        if instance.forward("open"):
+            logging.info("Already running; brought that window forward.")
+            return
+        logging.warning("Another instance holds the lock but doesn't"
+                        " answer; starting anyway.")
     ctk.set_appearance_mode("dark")
-    app = NotesApp()
+    app = NotesApp(instance)
     center_window(app, 900, 500)
     app.mainloop()
+    if app.poa_thread is not None:
+        app.poa_thread.join(POA_SCAN_WAIT_SECONDS)
+    instance.release()
 
 
 if __name__ == "__main__":
@@ -10,6 +10,10 @@ import os
 from .constants import BMA_DOWNLOAD_LINK, NOTES_FOLDER
 import logging
 
+# Windows caps a command line at 32,767 characters; stay well below.
+MAX_COMMAND_CHARS = 30_000
+MAX_BATCH = 500
+
 
 class ActivitiesAPI:
     """First check if BMA is installed or not
@@ -21,13 +25,22 @@ class ActivitiesAPI:
     def _check_installed(self, path):
         return "installed" if os.path.exists(path) else "not installed"
 
-    def __init__(self) -> None:
+    def __init__(self, bma_command=None, max_batch=MAX_BATCH) -> None:
         self.poa_list = []
-        self.BMA_FOLDER = Path(f"{os.getenv("BMA", "")}")
+        # Activities per `add` call (1: a process for each)
+        self.max_batch = max_batch
+        self.BMA_FOLDER = Path(os.getenv("BMA", ""))
 
         # .exe typical path to BMA app
         self.BMA_PATH = self.BMA_FOLDER / "Activities.exe"
-        self.status = self._check_installed(self.BMA_PATH)
+        # How BMA is invoked, e.g. [python, "benchmarks/stub_bma.py"]
+        # to talk to the stub instead of the real app.
+        if bma_command is not None:
+            self.bma_command = list(bma_command)
+            self.status = "installed"
+        else:
+            self.bma_command = [str(self.BMA_PATH)]
+            self.status = self._check_installed(self.BMA_PATH)
 
         # TODO
         # Number of times not to remind
@@ -96,18 +109,60 @@ class ActivitiesAPI:
     def _make(self, poa_list):
         """Before executing, check if BMA is actually installed."""
         self.poa_list = poa_list
+        self.add_activities(self.poa_list)
+
+    def add_activities(self, activities) -> int:
+        """Hand activities to BMA, many per process (`BMA add a b c`).
 
-        for actv in self.poa_list:
-            try:
-                # cmd = f'{self.BMA_PATH} add "{actv}"'
-                info = subprocess.run(
-                    [f"{self.BMA_PATH}", "add", actv], capture_output=True, text=True)
-                logging.info(
-                    "I talked to BMA. He says: "
-                    f"{info.stdout.strip()}"
-                )
-            except Exception as e:
-                logging.error(f"{e}: {info.stderr}")
+        That is the suite's CLI contract, `BMA add <list_of_POAs>`
+        (docs/feature_science.md). Starting BMA costs far more than
+        adding an activity, so the list is split only as much as the
+        command-line length and max_batch allow.
+        Returns the number of activities BMA accepted.
+        """
+        added = 0
+        for batch in self._batches(activities):
+            code = self._run_add(batch)
+            if code == 0:
+                added += len(batch)
+            elif code is None:
+                break  # BMA can't be started at all
+        return added
+
+    def _batches(self, activities):
+        base = sum(len(part) + 3 for part in self.bma_command) + len("add")
+        batch, length = [], base
+        for actv in activities:
+            # +3: separating space and the quotes Windows may add
+            size = len(actv) + 3
+            if batch and (length + size > MAX_COMMAND_CHARS
+                          or len(batch) >= self.max_batch):
+                yield batch
+                batch, length = [], base
+            batch.append(actv)
+            length += size
+        if batch:
+            yield batch
+
+    def _run_add(self, activities):
+        """Run `BMA add ...` once. Returns its exit code (None: no BMA)."""
+        try:
+            info = subprocess.run(
+                [*self.bma_command, "add", *activities],
+                capture_output=True, text=True, timeout=120)
+        except (OSError, subprocess.SubprocessError) as e:
+            logging.error(f"Could not run BMA: {e}")
+            return None
+        if info.returncode != 0:
+            logging.error(
+                f"BMA refused {len(activities)} activities "
+                f"(exit {info.returncode}): {info.stderr.strip()}")
+        else:
+            logging.info(
+                "I talked to BMA. He says: "
+                f"{info.stdout.strip()}"
+            )
+        return info.returncode
 
 
 if __name__ == "__main__":
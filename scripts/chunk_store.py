@@ -0,0 +1,188 @@
+# chunk_store.py
+"""Content-addressed, deduplicated storage for large note bodies.
+
+A large body is cut into chunks at content-defined points: a line
+ends a chunk when the hash of that line has its low bits at zero
+(within minimum and maximum chunk sizes). Because the cut points
+depend on the text and not on offsets, an edit only changes the
+chunk(s) around it, and all the others are found again by hash.
+
+Chunks live in the `chunks` table, keyed by the hash of their text and
+shared between notes. The notes row holds a small BLOB: the
+FORMAT_CHUNKED byte followed by the ordered chunk ids. Each chunk
+counts how many times notes reference it; releasing a body drops the
+counts and deletes chunks nobody uses any more.
+
+Saving over an existing body diffs against it: its chunks are looked
+up by hash first, and only the references that changed are written.
+Typing a line into a 2 MB note writes the one or two chunks around the
+edit, the notes row, and a few reference counts.
+
+Every function takes an open sqlite3 connection, so scripts/utils.py
+can run them inside its own transactions.
+"""
+import hashlib
+import struct
+import zlib
+from collections import Counter
+from typing import List
+
+FORMAT_CHUNKED = 2
+
+MIN_CHUNK_CHARS = 1024
+MAX_CHUNK_CHARS = 16 * 1024
+BOUNDARY_MASK = 0x1F  # about one line in 32 ends a chunk
+
+RAW, ZLIB = 0, 1
+_ID_SIZE = 8
+_SQL_VARIABLES = 900  # stay under SQLite's limit of bound parameters
+
+# Counters for benchmarks: how much a save actually had to write
+STATS = Counter()
+
+
+def chunk_text(text: str) -> List[str]:
+    """Split `text` at content-defined line boundaries."""
+    chunks, buf, size = [], [], 0
+    for line in text.splitlines(keepends=True):
+        while len(line) > MAX_CHUNK_CHARS:
+            # One huge line: cut it at fixed offsets
+            if buf:
+                chunks.append("".join(buf))
+                buf, size = [], 0
+            chunks.append(line[:MAX_CHUNK_CHARS])
+            line = line[MAX_CHUNK_CHARS:]
+        buf.append(line)
+        size += len(line)
+        if size >= MAX_CHUNK_CHARS or (
+                size >= MIN_CHUNK_CHARS
+                and zlib.crc32(line.encode("utf-8")) & BOUNDARY_MASK == 0):
+            chunks.append("".join(buf))
+            buf, size = [], 0
+    if buf:
+        chunks.append("".join(buf))
+    return chunks
+
+
+def create_tables(conn) -> None:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS chunks (
+        id INTEGER PRIMARY KEY,
+        hash BLOB NOT NULL UNIQUE,
+        data BLOB NOT NULL,
+        refs INTEGER NOT NULL DEFAULT 0
+        );
+        """
+    )
+
+
+def is_chunked(value) -> bool:
+    return isinstance(value, bytes) and value[:1] == bytes([FORMAT_CHUNKED])
+
+
+def _ids(value) -> List[int]:
+    count = (len(value) - 1) // _ID_SIZE
+    return list(struct.unpack(f"<{count}q", value[1:]))
+
+
+def _pack(data: bytes) -> bytes:
+    packed = zlib.compress(data, 6)
+    if len(packed) < len(data):
+        return bytes([ZLIB]) + packed
+    return bytes([RAW]) + data
+
+
+def _unpack(blob: bytes) -> str:
+    data = zlib.decompress(blob[1:]) if blob[0] == ZLIB else blob[1:]
+    return data.decode("utf-8")
+
+
+def _hashes(conn, ids) -> dict:
+    """hash -> id of the chunks with these ids."""
+    found = {}
+    unique = list(set(ids))
+    for start in range(0, len(unique), _SQL_VARIABLES):
+        batch = unique[start:start + _SQL_VARIABLES]
+        found.update(conn.execute(
+            "SELECT hash, id FROM chunks WHERE id IN"
+            f" ({', '.join('?' * len(batch))})", batch).fetchall())
+    return found
+
+
+def store(conn, text: str, old=None) -> bytes:
+    """Save `text` as chunks; return the value for the notes row.
+
+    `old` is the value being replaced, if any. Its references are
+    released here, so only the chunks that differ are touched.
+    """
+    old_ids = _ids(old) if is_chunked(old) else []
+    known = _hashes(conn, old_ids)
+    ids = []
+    for piece in chunk_text(text):
+        data = piece.encode("utf-8")
+        digest = hashlib.blake2b(data, digest_size=16).digest()
+        row = (known[digest],) if digest in known else conn.execute(
+            "SELECT id FROM chunks WHERE hash = ?", (digest,)).fetchone()
+        if row is not None:
+            ids.append(row[0])
+            STATS["chunks_reused"] += 1
+            continue
+        blob = _pack(data)
+        ids.append(conn.execute(
+            "INSERT INTO chunks (hash, data) VALUES (?, ?)",
+            (digest, blob)).lastrowid)
+        STATS["chunks_written"] += 1
+        STATS["bytes_written"] += len(blob)
+    new, before = Counter(ids), Counter(old_ids)
+    _add_refs(conn, new - before, 1)
+    _add_refs(conn, before - new, -1)
+    return bytes([FORMAT_CHUNKED]) + struct.pack(f"<{len(ids)}q", *ids)
+
+
+def _add_refs(conn, counts: Counter, sign: int) -> None:
+    conn.executemany("UPDATE chunks SET refs = refs + ? WHERE id = ?",
+                     ((sign * n, i) for i, n in counts.items()))
+    if sign < 0:
+        conn.executemany("DELETE FROM chunks WHERE id = ? AND refs <= 0",
+                         ((i,) for i in counts))
+    STATS["refs_updated"] += len(counts)
+
+
+def load(conn, value) -> str:
+    """Reassemble the text of a chunked notes value."""
+    ids = _ids(value)
+    found = {}
+    unique = list(set(ids))
+    for start in range(0, len(unique), _SQL_VARIABLES):
+        batch = unique[start:start + _SQL_VARIABLES]
+        found.update(conn.execute(
+            "SELECT id, data FROM chunks WHERE id IN"
+            f" ({', '.join('?' * len(batch))})", batch).fetchall())
+    missing = set(ids) - found.keys()
+    if missing:
+        raise ValueError(f"{len(missing)} chunks of this note are missing")
+    return "".join(_unpack(found[i]) for i in ids)
+
+
+def release(conn, value) -> None:
+    """Drop one reference to each chunk of `value` (if it is chunked)."""
+    if is_chunked(value):
+        _add_refs(conn, Counter(_ids(value)), -1)
+
+
+def collect_garbage(conn) -> int:
+    """Recount every chunk's references from the notes; delete orphans.
+
+    Normally release() keeps the counts right; this repairs them after
+    e.g. a crash between writes. Returns the number of chunks deleted.
+    """
+    counts = Counter()
+    for (value,) in conn.execute(
+            "SELECT content FROM notes WHERE typeof(content) = 'blob'"
+            " AND substr(content, 1, 1) = ?", (bytes([FORMAT_CHUNKED]),)):
+        counts.update(_ids(value))
+    conn.execute("UPDATE chunks SET refs = 0")
+    conn.executemany("UPDATE chunks SET refs = ? WHERE id = ?",
+                     ((n, i) for i, n in counts.items()))
+    return conn.execute("DELETE FROM chunks WHERE refs <= 0").rowcount
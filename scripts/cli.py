@@ -0,0 +1,276 @@
+# cli.py
+"""`bmtb`: Thought Book's command-line API.
+
+Every BM app exposes a CLI so the other apps (and scripts) can work
+with its data without opening its window (see docs/feature_science.md).
+
+    bmtb list [--limit N] [--json] [--tag TAG ...]
+    bmtb tags [--json]                # every #tag and how many notes use it
+    bmtb search QUERY [--titles] [--case-sensitive] [--json]
+    bmtb add TITLE [CONTENT]          # CONTENT from stdin when omitted
+    bmtb import FILE                  # JSON list or JSON lines, - = stdin
+    bmtb export [FILE]                # JSON lines, decrypted
+    bmtb vacuum
+
+Without a license `add` and `import` stop at the free version's note
+limit, as the app does.
+
+Output is written a note at a time, so piping a large database into
+another tool starts immediately and uses little memory. Imports are
+written in batches of --batch notes per transaction.
+
+This module only uses the database helpers from scripts/utils.py and
+the cipher, and never imports tkinter or customtkinter, so it runs
+without a display.
+"""
+import argparse
+import getpass
+import itertools
+import json
+import os
+import sys
+
+from .constants import NOTES_DB, PASS_FILE, SETTINGS_FILE, bootstrap
+from .cipher import SimpleCipher
+from .licensing import MAX_FREEMIUM_NOTES, has_valid_license
+from . import utils
+
+
+class CLIError(Exception):
+    """A problem worth one line on stderr and exit code 1."""
+
+
+def _load_settings() -> dict:
+    # scripts.settings has the same helpers but imports customtkinter
+    try:
+        with open(SETTINGS_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _password_required() -> bool:
+    return _load_settings().get("request_password", False)
+
+
+def unlock(cipher):
+    """Ask for the password when the app is set to require one.
+
+    Non-interactive callers can pass it in $BMTB_PASSWORD.
+    """
+    if not _password_required():
+        return
+    entered = os.getenv("BMTB_PASSWORD")
+    if entered is None:
+        if not sys.stdin.isatty():
+            raise CLIError("password required (set BMTB_PASSWORD)")
+        entered = getpass.getpass("Password: ")
+    try:
+        with open(PASS_FILE, "r") as f:
+            stored_hash = f.readline().strip()
+    except OSError:
+        return  # protection on but no password set yet
+    if cipher.pass_hash(entered) != stored_hash:
+        raise CLIError("incorrect password")
+
+
+def _write(line):
+    sys.stdout.write(line + "\n")
+
+
+def _summary(note) -> str:
+    return f"{note['id']}\t{note['updated_at']}\t{note['title']}"
+
+
+def _as_json(note, cipher) -> str:
+    return json.dumps({**note, "content": cipher.decrypt(note["content"])},
+                      ensure_ascii=False)
+
+
+# --- Commands ---
+
+def cmd_list(args, cipher):
+    notes = utils.get_notes_by_tags(all_of=args.tag, with_content=args.json)\
+        if args.tag else utils.iter_notes()
+    for note in itertools.islice(notes, args.limit):
+        _write(_as_json(note, cipher) if args.json else _summary(note))
+
+
+def cmd_tags(args, cipher):
+    for name, count in utils.get_all_tags():
+        _write(json.dumps({"tag": name, "notes": count}) if args.json
+               else f"{count}\t#{name}")
+
+
+def cmd_search(args, cipher):
+    def contains(text):
+        if args.case_sensitive:
+            return args.query in text
+        return args.query.lower() in text.lower()
+
+    found = 0
+    for note in utils.iter_notes():
+        # Titles are stored in plain text; only decrypt when needed
+        if not contains(note["title"]) and (
+                args.titles or not contains(cipher.decrypt(note["content"]))):
+            continue
+        _write(_as_json(note, cipher) if args.json else _summary(note))
+        found += 1
+        if args.limit and found >= args.limit:
+            break
+
+
+def _free_slots(premium: bool):
+    """How many more notes may be added (None: no limit)."""
+    if premium:
+        return None
+    return max(0, MAX_FREEMIUM_NOTES - utils.count_notes())
+
+
+def _limit_reached() -> CLIError:
+    return CLIError(f"the free version holds {MAX_FREEMIUM_NOTES} notes;"
+                    " activate a license in the app to add more")
+
+
+def cmd_add(args, cipher):
+    if _free_slots(has_valid_license()) == 0:
+        raise _limit_reached()
+    content = args.content
+    if content is None or content == "-":
+        content = sys.stdin.read()
+    content = content.strip()
+    note_id = utils.add_note(args.title, cipher.encrypt(content))
+    utils.set_note_tags(note_id, utils.parse_tags(content))
+    _write(str(note_id))
+
+
+def _read_records(path):
+    """Yield dicts from a JSON list or a JSON-lines file ('-' = stdin)."""
+    f = sys.stdin if path == "-" else open(path, "r", encoding="utf-8")
+    try:
+        first = f.read(1)
+        while first and first.isspace():
+            first = f.read(1)
+        if first == "[":
+            yield from json.loads(first + f.read())
+            return
+        for number, line in enumerate(
+                itertools.chain([first + f.readline()], f), start=1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    raise CLIError(f"{path}: line {number}: {e}")
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def cmd_import(args, cipher):
+    def row(item):
+        content = str(item.get("content", "")).strip()
+        return (str(item.get("title", "")), cipher.encrypt(content),
+                utils.parse_tags(content))
+
+    rows = (row(item) for item in _read_records(args.file))
+    premium = has_valid_license()
+    total = 0
+    try:
+        while True:
+            # Recounted every batch: the app may be adding notes too
+            slots = _free_slots(premium)
+            size = args.batch if slots is None else min(args.batch, slots)
+            batch = list(itertools.islice(rows, size))
+            if not batch:
+                if size == 0 and next(rows, None) is not None:
+                    raise _limit_reached()
+                break
+            total += utils.add_notes(batch)
+    finally:
+        print(f"Imported {total} notes.", file=sys.stderr)
+
+
+def cmd_export(args, cipher):
+    out = sys.stdout if args.file in (None, "-")\
+        else open(args.file, "w", encoding="utf-8")
+    try:
+        for note in utils.iter_notes():
+            out.write(_as_json(note, cipher) + "\n")
+    finally:
+        if out is not sys.stdout:
+            out.close()
+
+
+def cmd_vacuum(args, cipher):
+    before = os.path.getsize(NOTES_DB)
+    utils.collect_chunk_garbage()
+    utils.vacuum()
+    after = os.path.getsize(NOTES_DB)
+    _write(f"{before:,} -> {after:,} bytes")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="bmtb", description="Thought Book command-line API.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("list", help="list notes, newest first")
+    p.add_argument("--limit", type=int)
+    p.add_argument("--json", action="store_true",
+                   help="one JSON object per line, with content")
+    p.add_argument("--tag", action="append",
+                   help="only notes with this #tag (repeatable: all of)")
+    p.set_defaults(func=cmd_list)
+
+    p = sub.add_parser("tags", help="list #tags, most used first")
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_tags)
+
+    p = sub.add_parser("search", help="find notes containing QUERY")
+    p.add_argument("query")
+    p.add_argument("--titles", action="store_true",
+                   help="only search titles (fast, nothing is decrypted)")
+    p.add_argument("--case-sensitive", action="store_true")
+    p.add_argument("--limit", type=int)
+    p.add_argument("--json", action="store_true")
+    p.set_defaults(func=cmd_search)
+
+    p = sub.add_parser("add", help="add a note")
+    p.add_argument("title")
+    p.add_argument("content", nargs="?",
+                   help="note text; read from stdin when omitted")
+    p.set_defaults(func=cmd_add)
+
+    p = sub.add_parser("import", help="add notes from JSON / JSON lines")
+    p.add_argument("file", help="path, or - for stdin")
+    p.add_argument("--batch", type=int, default=1000,
+                   help="notes per transaction (default: 1000)")
+    p.set_defaults(func=cmd_import)
+
+    p = sub.add_parser("export", help="write all notes as JSON lines")
+    p.add_argument("file", nargs="?", help="path (default: stdout)")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("vacuum", help="compact the database file")
+    p.set_defaults(func=cmd_vacuum)
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    bootstrap(with_logging=False)
+    utils.create_table()
+    utils.set_compression(_load_settings().get("compress_notes", True))
+    cipher = SimpleCipher()
+    try:
+        unlock(cipher)
+        args.func(args, cipher)
+    except CLIError as e:
+        print(f"bmtb: {e}", file=sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # e.g. `bmtb list | head`; nobody is reading any more.
+        # Silence the final flush of stdout at exit too.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    return 0
@@ -1,9 +1,11 @@
 # constants.py
-from logging.handlers import RotatingFileHandler
 import os
 import json
 import uuid
 import logging
+import functools
+import threading
+import time
 from pathlib import Path
 import sys
 
@@ -65,13 +67,9 @@ APP_PHOTO = IMGS_FOLDER / "logo.png"
 # --- Data Storage (always under %APPDATA%/BM) ---
 DATA_FOLDER = Path(os.getenv("APPDATA", "")) / "BM"
 NOTES_FOLDER = DATA_FOLDER / APP_NAME
-# Only create folders if they do not exist (avoid unnecessary disk operations)
-if not NOTES_FOLDER.exists():
-    NOTES_FOLDER.mkdir(parents=True)
-
 HIDDEN_FOLDER = NOTES_FOLDER / f".{APP_SHORT_NAME}"
-if not HIDDEN_FOLDER.exists():
-    HIDDEN_FOLDER.mkdir(parents=True)
+# NOTE: importing this module never touches the disk.
+# The folders are created by `bootstrap()`.
 
 
 # --- Files ---
@@ -93,24 +91,108 @@ SETTINGS_FILE = NOTES_FOLDER / "settings.json"
 LOGS_FILE = NOTES_FOLDER / "app.log"
 
 
-# --- Logging ---
-# Use RotatingFileHandler to prevent slow startup from large log files
-handler = RotatingFileHandler(LOGS_FILE, maxBytes=1_000_000, backupCount=3)
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[handler]
-)
+# --- Startup ---
+# Everything with side effects (folders, logging, device id) happens
+# on demand, once, instead of at import time.
+BOOTSTRAP_TIMINGS = {}  # step -> seconds it took, for profiling startup
+_bootstrap_lock = threading.Lock()
+
+
+def _timed_step(name, func):
+    start = time.perf_counter()
+    result = func()
+    BOOTSTRAP_TIMINGS[name] = time.perf_counter() - start
+    return result
+
+
+def make_folders():
+    """Create the data folders if they are missing."""
+    for folder in (NOTES_FOLDER, HIDDEN_FOLDER):
+        if not folder.exists():
+            folder.mkdir(parents=True)
+
+
+def setup_logging():
+    """Send the root logger to the app's log file.
+
+    Records go through a queue to a writer thread, so logging on the
+    UI thread never waits on disk writes or log rotation.
+    """
+    from scripts.logging_pipeline import start_logging
+    start_logging(LOGS_FILE)
+
+
+def bootstrap(with_logging=True) -> dict:
+    """Prepare the data folders and logging. Safe to call many times.
+
+    Each step runs only once per process. Returns `BOOTSTRAP_TIMINGS`.
+    """
+    with _bootstrap_lock:
+        if "folders" not in BOOTSTRAP_TIMINGS:
+            _timed_step("folders", make_folders)
+        if with_logging and "logging" not in BOOTSTRAP_TIMINGS:
+            _timed_step("logging", setup_logging)
+            logging.info(
+                "Bootstrap timings (ms): " + ", ".join(
+                    f"{k}={v * 1000:.2f}"
+                    for k, v in BOOTSTRAP_TIMINGS.items()))
+    return BOOTSTRAP_TIMINGS
+
+
+# --- Hidden files ---
+# Attributes are changed through the Win32 API directly instead of
+# spawning `attrib`, which cost a whole process per call.
+FILE_ATTRIBUTE_HIDDEN = 0x2
+FILE_ATTRIBUTE_NORMAL = 0x80
+INVALID_FILE_ATTRIBUTES = 0xFFFFFFFF
+
+if sys.platform == "win32":
+    import ctypes
+    from ctypes import wintypes
+
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _kernel32.GetFileAttributesW.argtypes = [wintypes.LPCWSTR]
+    _kernel32.GetFileAttributesW.restype = wintypes.DWORD
+    _kernel32.SetFileAttributesW.argtypes = [wintypes.LPCWSTR, wintypes.DWORD]
+    _kernel32.SetFileAttributesW.restype = wintypes.BOOL
+else:
+    # No hidden attribute to manage (dotfiles are already hidden)
+    _kernel32 = None
+
+
+def set_hidden(path, hidden=True) -> bool:
+    """Set or clear the hidden attribute of `path`.
+
+    Only writes the attributes when they actually need changing.
+    Returns True if the attributes were changed.
+    """
+    if _kernel32 is None or path is None:
+        return False
+
+    attrs = _kernel32.GetFileAttributesW(str(path))
+    if attrs == INVALID_FILE_ATTRIBUTES:
+        return False  # missing file, nothing to hide
+    if bool(attrs & FILE_ATTRIBUTE_HIDDEN) == hidden:
+        return False
+
+    if hidden:
+        new_attrs = (attrs & ~FILE_ATTRIBUTE_NORMAL) | FILE_ATTRIBUTE_HIDDEN
+    else:
+        new_attrs = (attrs & ~FILE_ATTRIBUTE_HIDDEN) or FILE_ATTRIBUTE_NORMAL
+
+    if not _kernel32.SetFileAttributesW(str(path), new_attrs):
+        logging.error(
+            f"Could not change attributes of '{path}':"
+            f" {ctypes.WinError(ctypes.get_last_error())}")
+        return False
+    return True
 
 
 def hideables(file=None, hide=True):
+    """Hide (or unhide) the hidden folder and `file` in it."""
     try:
-        if not hide:
-            os.system(f'attrib -H "{HIDDEN_FOLDER}"')  # Hide folder
-            os.system(f'attrib -H "{file}"')  # Hide metrics.json
-        else:
-            os.system(f'attrib +H "{HIDDEN_FOLDER}"')  # Hide folder
-            os.system(f'attrib +H "{file}"')  # Hide metrics.json
+        set_hidden(HIDDEN_FOLDER, hide)
+        set_hidden(file, hide)
     except Exception as e:
         logging.error(f"{e}")
 
@@ -118,9 +200,12 @@ def hideables(file=None, hide=True):
 def write_json_file(file, contents={}):
     """Must be in json"""
     try:
-        hideables(file=file, hide=False)
-        with open(file, "w") as w:
+        # Windows refuses to truncate-open ("w") a hidden file, but
+        # rewriting it in place ("r+") works without unhiding it first.
+        mode = "r+" if os.path.exists(file) else "w"
+        with open(file, mode) as w:
             json.dump(contents, w)
+            w.truncate()
         hideables(file=file, hide=True)
     except Exception as e:
         logging.error(e)
@@ -129,7 +214,7 @@ def write_json_file(file, contents={}):
 def read_json_file(file):
     """Must be in json"""
     try:
-        hideables(file, hide=False)
+        # Hidden files can be read as they are.
         with open(file, "r") as r:
             contents = dict(json.load(r))
         hideables(file, hide=True)
@@ -175,6 +260,12 @@ def get_device_id(config_file):
 # the app on each individual
 # installation of bmtb
 # config for unique device id
+@functools.cache
+def user_app_id() -> str:
+    """Return this installation's device id (looked up once)."""
+    bootstrap(with_logging=False)
+    return _timed_step("device_id", lambda: get_device_id(ID_FILE))
+
 
 PREMIUM_PRICE = 10_000
 
@@ -194,6 +285,7 @@ TNR_BMTB_SERVER = "https://feedback-server-tnr.onrender.com"
 if __name__ == "__main__":
     # print(f"Main folder: {MAIN_FOLDER}")
     print(f"Data folder: {DATA_FOLDER}")
-    print(f"Device ID: {get_device_id(ID_FILE)}")
+    print(f"Device ID: {user_app_id()}")
+    print(f"Startup timings: {BOOTSTRAP_TIMINGS}")
     print(f"App version: {APP_VERSION}")
     print(f"App ICON: {APP_ICON}")
@@ -0,0 +1,89 @@
+# display_titles.py
+"""Sidebar labels: note titles shortened to fit their button.
+
+Cutting a title at a number of characters gets both ends wrong: wide
+characters (CJK, emoji) overflow the button, narrow ones leave room
+unused, and a cut can split an accent from its letter or an emoji
+sequence in half. `fit_text` instead measures with the button's font
+and only cuts between grapheme clusters.
+
+Measuring costs a few Tk calls per title, so `DisplayTitles` keeps the
+result per note id and only measures again when the title changed.
+"""
+import unicodedata
+from typing import Callable, Dict, List, Tuple
+
+ELLIPSIS = "…"
+ZWJ = "\u200d"
+
+
+def _extends(char: str) -> bool:
+    """Whether `char` belongs to the cluster before it."""
+    return (unicodedata.combining(char) != 0
+            or unicodedata.category(char) in ("Mn", "Me", "Mc")
+            or "\ufe00" <= char <= "\ufe0f"    # variation selectors
+            or "\U0001f3fb" <= char <= "\U0001f3ff"    # skin tones
+            or "\U000e0020" <= char <= "\U000e007f")   # emoji tags
+
+
+def _regional(char: str) -> bool:
+    return "\U0001f1e6" <= char <= "\U0001f1ff"
+
+
+def graphemes(text: str) -> List[str]:
+    """Split `text` into user-perceived characters (close enough).
+
+    Handles combining marks, variation selectors, emoji modifiers,
+    zero-width-joiner sequences and flag pairs; not every rule of
+    Unicode's segmentation algorithm.
+    """
+    clusters: List[str] = []
+    for char in text:
+        if clusters and (
+                _extends(char) or char == ZWJ
+                or clusters[-1].endswith(ZWJ)
+                or _regional(char) and len(clusters[-1]) == 1
+                and _regional(clusters[-1])):
+            clusters[-1] += char
+        else:
+            clusters.append(char)
+    return clusters
+
+
+def fit_text(text: str, max_px: int, measure: Callable[[str], int]) -> str:
+    """`text`, or its longest start that fits with an ellipsis."""
+    if measure(text) <= max_px:
+        return text
+    clusters = graphemes(text)
+    lo, hi = 0, len(clusters)  # clusters[:lo] fits, [:hi] doesn't
+    while hi - lo > 1:
+        mid = (lo + hi) // 2
+        if measure("".join(clusters[:mid]).rstrip() + ELLIPSIS) <= max_px:
+            lo = mid
+        else:
+            hi = mid
+    return "".join(clusters[:lo]).rstrip() + ELLIPSIS
+
+
+class DisplayTitles:
+    """Fitted titles per note id, recomputed only when a title changes."""
+
+    def __init__(self, font, max_px):
+        self.measure = font.measure
+        self.max_px = max_px
+        self._cache: Dict[int, Tuple[str, str]] = {}  # id -> (title, shown)
+
+    def get(self, note_id, title: str) -> str:
+        cached = self._cache.get(note_id)
+        if cached is not None and cached[0] == title:
+            return cached[1]
+        shown = fit_text(title, self.max_px, self.measure)
+        if note_id:
+            self._cache[note_id] = (title, shown)
+        return shown
+
+    def discard(self, note_id):
+        self._cache.pop(note_id, None)
+
+    def clear(self):
+        self._cache.clear()
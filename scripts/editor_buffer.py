@@ -0,0 +1,289 @@
+# editor_buffer.py
+"""Change tracking for the note editor.
+
+`TextWatcher` sits in front of a tk.Text widget (the same trick IDLE
+uses: the widget's Tcl command is renamed and replaced by ours) and
+reports every insert/delete as a `TextChange`: which lines were
+replaced by which new lines. Listeners can then keep their own view
+of the text up to date by touching only those lines.
+
+`LineBuffer` is such a listener. It keeps the note's lines in a Python
+list, so saving never has to read the whole document back out of the
+widget, and it remembers which range of lines was edited since the
+last save: `encoded()` keeps each line's encrypted form and only
+encrypts the edited lines again.
+
+USAGE:
+    watcher = TextWatcher(textbox._textbox)   # the inner tk.Text
+    buffer = LineBuffer()
+    watcher.add_listener(buffer.apply)
+
+    with watcher.paused():                    # bulk load, not tracked
+        textbox.insert("1.0", text)
+    buffer.load(text)
+    ...
+    content = buffer.encoded(cipher.encrypt)  # == encrypt(text().strip())
+    buffer.mark_saved()
+"""
+import contextlib
+import logging
+from tkinter import TclError
+from typing import Callable, List, NamedTuple, Optional
+
+
+class TextChange(NamedTuple):
+    """Lines `first`..`old_last` (1-based) were replaced by `new_lines`.
+
+    `op` is "insert", "delete" or "reset". A reset means the change
+    could not be described precisely (e.g. Tk's own undo) and
+    `new_lines` holds the whole text.
+    `index`/`end`/`text` describe the raw operation in Tk indexes:
+    `text` was inserted at, or deleted from, `index`..`end`.
+    """
+    op: str
+    first: int
+    old_last: int
+    new_lines: List[str]
+    index: str = "1.0"
+    end: str = ""
+    text: str = ""
+
+
+def line_of(index: str) -> int:
+    """'12.5' -> 12"""
+    return int(index.split(".", 1)[0])
+
+
+class TextWatcher:
+    """Intercepts a tk.Text widget's insert/delete commands."""
+
+    def __init__(self, widget):
+        self.widget = widget
+        self.tk = widget.tk
+        self.name = str(widget)
+        self.orig = self.name + "_orig"
+        self.listeners = []
+        self._paused = 0
+        # Called instead of Tk's own "edit undo"/"edit redo" when set
+        self.undo_handler = None
+        self.redo_handler = None
+
+        self.tk.call("rename", self.name, self.orig)
+        self.tk.createcommand(self.name, self._dispatch)
+
+    def add_listener(self, listener):
+        self.listeners.append(listener)
+
+    def remove_listener(self, listener):
+        if listener in self.listeners:
+            self.listeners.remove(listener)
+
+    @contextlib.contextmanager
+    def paused(self):
+        """Let changes through without reporting them."""
+        self._paused += 1
+        try:
+            yield
+        finally:
+            self._paused -= 1
+
+    def call(self, *args):
+        """Run a command on the real widget, bypassing the watcher."""
+        return self.tk.call((self.orig,) + args)
+
+    # --- Command dispatch ---
+    def _dispatch(self, cmd, *args):
+        try:
+            if self._paused or not self.listeners:
+                return self.call(cmd, *args)
+            if cmd in ("insert", "delete", "replace") and self._disabled():
+                # Tk ignores these (e.g. Backspace during a chunked
+                # load); reporting them would put the listeners out
+                # of step with the text.
+                return self.call(cmd, *args)
+            if cmd == "insert":
+                return self._insert(*args)
+            if cmd == "delete":
+                return self._delete(*args)
+            if cmd == "replace":
+                self._delete(args[0], args[1])
+                return self._insert(args[0], *args[2:])
+            if cmd == "edit" and args and args[0] in ("undo", "redo"):
+                handler = (self.undo_handler if args[0] == "undo"
+                           else self.redo_handler)
+                if handler is not None:
+                    handler()
+                    return ""
+                result = self.call(cmd, *args)
+                self.notify_reset()
+                return result
+            return self.call(cmd, *args)
+        except TclError:
+            # Tk's bindings delete "sel.first" even when there is no
+            # selection and rely on that error being harmless.
+            if cmd in ("delete", "replace") and self._no_selection(args):
+                return ""
+            raise
+
+    def _disabled(self) -> bool:
+        return str(self.call("cget", "-state")) == "disabled"
+
+    def _no_selection(self, args) -> bool:
+        return any(str(a).startswith("sel.") for a in args[:2])\
+            and not self.call("tag", "ranges", "sel")
+
+    def _insert(self, index, *chunks_and_tags):
+        text = "".join(chunks_and_tags[0::2])
+        index = self.call("index", index)
+        # Text inserted at "end" actually goes before the final newline
+        if self.call("compare", index, "==", "end"):
+            index = self.call("index", "end-1c")
+        # A right-gravity mark ends up just after the inserted text
+        self.call("mark", "set", "watcher_end", index)
+        self.call("mark", "gravity", "watcher_end", "right")
+        result = self.call("insert", index, *chunks_and_tags)
+        if text:
+            first = line_of(index)
+            last = first + text.count("\n")
+            self._notify(TextChange(
+                "insert", first, first, self._lines(first, last),
+                index=index, end=self.call("index", "watcher_end"),
+                text=text))
+        return result
+
+    def _delete(self, index1, index2=None, *more):
+        if more:
+            # Several ranges at once; rare enough to just resync.
+            result = self.call("delete", index1, index2, *more)
+            self.notify_reset()
+            return result
+
+        start = self.call("index", index1)
+        end = self.call("index", index2 if index2 is not None
+                        else f"{start}+1c")
+        last_char = self.call("index", "end-1c")
+        if self.call("compare", end, ">", last_char):
+            end = last_char  # the final newline can't be deleted
+        if not self.call("compare", start, "<", end):
+            return ""
+
+        removed = self.call("get", start, end)
+        result = self.call("delete", start, end)
+        first = line_of(start)
+        self._notify(TextChange(
+            "delete", first, line_of(end), self._lines(first, first),
+            index=start, end=end, text=removed))
+        return result
+
+    def _lines(self, first, last) -> List[str]:
+        return self.call("get", f"{first}.0", f"{last}.end").split("\n")
+
+    def notify_reset(self):
+        """Tell listeners to resync from the widget's full text."""
+        text = self.call("get", "1.0", "end-1c")
+        self._notify(TextChange("reset", 1, -1, text.split("\n"), text=text))
+
+    def _notify(self, change):
+        for listener in list(self.listeners):
+            try:
+                listener(change)
+            except Exception as e:
+                logging.error(f"Editor listener {listener} failed: {e}")
+
+
+class LineBuffer:
+    """The editor's text as a list of lines, kept in sync by changes."""
+
+    def __init__(self, text=""):
+        self.load(text)
+
+    def load(self, text: str):
+        """Replace everything; the result counts as saved (not dirty)."""
+        self.lines = text.split("\n")
+        self._text: Optional[str] = text
+        self.edited: Optional[tuple] = None  # (first, last) lines
+        # Encoded form of each line, None until encoded() runs
+        self._encoded: Optional[List[Optional[str]]] = None
+
+    def apply(self, change: TextChange):
+        if change.op == "reset":
+            self.lines = list(change.new_lines)
+            self._text = change.text
+            self.edited = (1, len(self.lines))
+            self._encoded = None
+            return
+
+        first, old_last = change.first, change.old_last
+        new_last = first + len(change.new_lines) - 1
+        self.lines[first - 1:old_last] = change.new_lines
+        if self._encoded is not None:
+            self._encoded[first - 1:old_last] = [None] * len(
+                change.new_lines)
+        self._text = None
+        self._mark_edited(first, old_last, new_last)
+
+    def _mark_edited(self, first, old_last, new_last):
+        if self.edited is None:
+            self.edited = (first, new_last)
+            return
+        lo, hi = self.edited
+        shift = new_last - old_last
+        if hi > old_last:
+            hi += shift  # lines after the change moved
+        self.edited = (min(lo, first),
+                       min(max(hi, new_last), len(self.lines)))
+
+    @property
+    def dirty(self) -> bool:
+        return self.edited is not None
+
+    def mark_saved(self):
+        self.edited = None
+
+    def text(self) -> str:
+        if self._text is None:
+            self._text = "\n".join(self.lines)
+        return self._text
+
+    def encoded(self, encode: Callable[[str], str]) -> str:
+        """`encode(self.text().strip())`, encoding only edited lines.
+
+        `encode` must work character by character, i.e.
+        encode(a + b) == encode(a) + encode(b), as SimpleCipher does.
+        The first and last lines are encoded each time (they are the
+        ones stripped); the others are kept from earlier calls unless
+        they were edited since the last save.
+        """
+        lines = self.lines
+        first = next((i for i, line in enumerate(lines) if line.strip()),
+                     None)
+        if first is None:
+            return encode("")
+        last = next(i for i in range(len(lines) - 1, -1, -1)
+                    if lines[i].strip())
+        if first == last:
+            return encode(lines[first].strip())
+
+        if self._encoded is None:
+            self._encoded = [None] * len(lines)
+            lo, hi = first + 1, last
+        elif self.edited is not None:
+            lo, hi = max(self.edited[0] - 1, first + 1), self.edited[1]
+        else:
+            lo, hi = 0, 0
+        cache = self._encoded
+        for i in range(lo, min(hi, last)):
+            if cache[i] is None:
+                cache[i] = encode(lines[i])
+        middle = cache[first + 1:last]
+        if None in middle:
+            # Outside the edited range; shouldn't happen, but be safe
+            for i, line in enumerate(lines[first + 1:last], first + 1):
+                if cache[i] is None:
+                    cache[i] = encode(line)
+            middle = cache[first + 1:last]
+        return encode("\n").join([encode(lines[first].lstrip()), *middle,
+                                  encode(lines[last].rstrip())])
+
+    def __len__(self):
+        return len(self.lines)
@@ -0,0 +1,135 @@
+# editor_state.py
+"""Per-note editor state: cursor, scroll position and undo history.
+
+When the user switches notes the state of the note being left is
+kept in a small LRU cache, so coming back to it restores the exact
+view (and Ctrl+Z still works) without re-reading anything.
+
+The undo history is our own `UndoStack` rather than Tk's, because Tk
+offers no way to save and restore its undo stack per document. It is
+fed by the editor's `TextChange` events (see editor_buffer.py) and is
+driven by Tk's normal <<Undo>>/<<Redo>> bindings through the watcher.
+"""
+import time
+from collections import OrderedDict
+
+MAX_UNDO_GROUPS = 300
+GROUP_PAUSE_SECONDS = 1.5
+
+
+class UndoStack:
+    """Undo/redo of editor changes, grouped the way people type."""
+
+    def __init__(self):
+        self.groups = []   # each group: list of (op, index, end, text, t)
+        self.redo_groups = []
+        self._replaying = False
+
+    def record(self, change):
+        if self._replaying:
+            return
+        if change.op == "reset":
+            self.clear()  # the recorded indexes no longer apply
+            return
+
+        edit = (change.op, change.index, change.end, change.text,
+                time.monotonic())
+        self.redo_groups.clear()
+        if self.groups and self._continues(self.groups[-1][-1], edit):
+            self.groups[-1].append(edit)
+        else:
+            self.groups.append([edit])
+            if len(self.groups) > MAX_UNDO_GROUPS:
+                del self.groups[0]
+
+    def _continues(self, prev, edit) -> bool:
+        """Whether `edit` belongs in the same undo step as `prev`."""
+        op, index, end, text, t = edit
+        if op != prev[0] or "\n" in text\
+                or t - prev[4] > GROUP_PAUSE_SECONDS:
+            return False
+        if op == "insert":
+            if text.isspace() and not prev[3].isspace():
+                return False  # undo a word at a time
+            return index == prev[2]  # typing on from the last insert
+        # Backspace (ends where the last delete began) or Delete
+        return end == prev[1] or index == prev[1]
+
+    def undo(self, widget) -> bool:
+        if not self.groups:
+            return False
+        group = self.groups.pop()
+        self._replay(widget, [
+            ("delete", index, end, text) if op == "insert"
+            else ("insert", index, end, text)
+            for op, index, end, text, _ in reversed(group)])
+        self.redo_groups.append(group)
+        return True
+
+    def redo(self, widget) -> bool:
+        if not self.redo_groups:
+            return False
+        group = self.redo_groups.pop()
+        self._replay(widget, [edit[:4] for edit in group])
+        self.groups.append(group)
+        return True
+
+    def _replay(self, widget, edits):
+        self._replaying = True
+        try:
+            for op, index, end, text in edits:
+                if op == "insert":
+                    widget.insert(index, text)
+                    widget.mark_set("insert", end)
+                else:
+                    widget.delete(index, end)
+                    widget.mark_set("insert", index)
+            widget.see("insert")
+        finally:
+            self._replaying = False
+
+    def clear(self):
+        self.groups.clear()
+        self.redo_groups.clear()
+
+
+class EditorState:
+    """What to restore when the user comes back to a note."""
+    __slots__ = ("cursor", "scroll", "undo", "length")
+
+    def __init__(self, cursor="1.0", scroll=0.0, undo=None, length=None):
+        self.cursor = cursor
+        self.scroll = scroll
+        self.undo = undo if undo is not None else UndoStack()
+        # Length of the text the state belongs to. If the note changed
+        # in between, the undo history can't be trusted any more.
+        self.length = length
+
+
+class EditorStateCache:
+    """A bounded LRU of `EditorState` per note id."""
+
+    def __init__(self, capacity=20):
+        self.capacity = capacity
+        self._states = OrderedDict()
+
+    def get(self, note_id):
+        state = self._states.get(note_id)
+        if state is not None:
+            self._states.move_to_end(note_id)
+        return state
+
+    def put(self, note_id, state):
+        self._states[note_id] = state
+        self._states.move_to_end(note_id)
+        while len(self._states) > self.capacity:
+            self._states.popitem(last=False)
+
+    def discard(self, note_id):
+        self._states.pop(note_id, None)
+
+    def clear(self):
+        self._states.clear()
+
+    def __len__(self):
+        return len(self._states)
@@ -0,0 +1,160 @@
+# instances.py
+"""Living with other Thought Book processes.
+
+The Desktop and Start Menu shortcuts make it easy to start the app
+twice, and two windows holding their own lists of notes would
+overwrite each other's saves.
+
+`InstanceLock` keeps the app to one window: the first process holds
+an OS lock on `instance.lock` and listens on a localhost socket whose
+port (and a random token) it writes to `instance.port`. A second
+process finds the lock taken, sends "open" to that socket and exits;
+the running window then comes to the front.
+
+`DatabaseWatcher` notices commits made by anyone else (a second
+window when single-instance mode is off, `bmtb import`, ...) through
+`PRAGMA data_version`, which changes when any connection other than
+the watcher's own has written to the database. That includes the app's
+own saves, which go through connections of their own. So a change only
+means "look": the app then fetches the rows whose updated_at moved and
+skips those whose version it already has, i.e. the ones it saved.
+
+USAGE:
+    lock = InstanceLock()
+    if not lock.acquire() and lock.forward("open"):
+        sys.exit()
+    ...
+    for message in lock.pending():    # from a Tk after() loop
+        ...
+"""
+import logging
+import os
+import queue
+import secrets
+import socket
+import sqlite3
+import threading
+import time
+from typing import List
+
+from .constants import HIDDEN_FOLDER
+
+LOCK_FILE = HIDDEN_FOLDER / "instance.lock"
+PORT_FILE = HIDDEN_FOLDER / "instance.port"
+
+
+def try_lock(f) -> None:
+    """Lock `f` for this process; OSError if someone else has it."""
+    if os.name == "nt":
+        import msvcrt
+        msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        import fcntl
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+class InstanceLock:
+    """Makes sure only one window of the app runs at a time."""
+
+    def __init__(self, lock_file=LOCK_FILE, port_file=PORT_FILE):
+        self.lock_file = lock_file
+        self.port_file = port_file
+        self.messages = queue.Queue()
+        self._file = None
+        self._server = None
+        self._token = ""
+
+    def acquire(self) -> bool:
+        """Become the running instance. False if another one is."""
+        f = open(self.lock_file, "a")
+        try:
+            try_lock(f)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        self._token = secrets.token_hex(16)
+        self._server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server.bind(("127.0.0.1", 0))
+        self._server.listen()
+        with open(self.port_file, "w") as p:
+            p.write(f"{self._server.getsockname()[1]} {self._token}")
+        threading.Thread(target=self._serve, daemon=True,
+                         name="Instance listener").start()
+        return True
+
+    def forward(self, message="open", attempts=20) -> bool:
+        """Send `message` to the running instance.
+
+        Retries for a couple of seconds, as the other instance may be
+        starting up and not listening yet.
+        """
+        for _ in range(attempts):
+            try:
+                with open(self.port_file, "r") as p:
+                    port, token = p.read().split()
+                with socket.create_connection(("127.0.0.1", int(port)),
+                                              timeout=1) as s:
+                    s.sendall(f"{token} {message}\n".encode("utf-8"))
+                return True
+            except (OSError, ValueError):
+                time.sleep(0.1)
+        return False
+
+    def pending(self) -> List[str]:
+        """Messages received since the last call."""
+        received = []
+        while True:
+            try:
+                received.append(self.messages.get_nowait())
+            except queue.Empty:
+                return received
+
+    def release(self):
+        if self._server is not None:
+            self._server.close()
+            self._server = None
+        if self._file is not None:
+            self._file.close()  # also drops the lock
+            self._file = None
+
+    def _serve(self):
+        while self._server is not None:
+            try:
+                conn, _ = self._server.accept()
+            except OSError:
+                return  # closed by release()
+            try:
+                with conn:
+                    conn.settimeout(1)
+                    data = conn.recv(1024).decode("utf-8", "replace")
+                token, _, message = data.strip().partition(" ")
+                if secrets.compare_digest(token, self._token):
+                    self.messages.put(message)
+            except OSError as e:
+                logging.info(f"Instance message dropped: {e}")
+
+
+class DatabaseWatcher:
+    """Tells whether another connection has committed since last asked.
+
+    Any other connection: this process's own writes count too.
+    """
+
+    def __init__(self, db_path):
+        self.db_path = db_path
+        self._conn = None
+        self._version = None
+
+    def changed(self) -> bool:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.db_path)
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = self._version is not None and version != self._version
+        self._version = version
+        return changed
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,245 @@
+# journal.py
+"""Crash-safe journal of the edits made since the last save.
+
+Autosave waits for a pause in typing, and a save rewrites the whole
+note, so saving more often is not the way to lose less text. Instead
+every edit the `TextWatcher` reports is appended here as a small
+record (the changed lines only, encrypted like the notes). A writer
+thread fsyncs the records in batches, at most FLUSH_INTERVAL seconds
+after they were made.
+
+After each successful save (a checkpoint) the journal is emptied and
+restarted with a base record: which note, the whitespace the save
+stripped off the editor's text, and a hash of the saved text. On the
+next start `recover()` replays what is left on top of the saved note,
+if that note is still the one the base record describes.
+
+Every window (single_instance can be off) writes its own journal,
+edits.<pid>.journal, and holds an OS lock on it while it does. So
+`recover()` only replays, then deletes, the journals nobody holds:
+those of windows that crashed or closed with edits unsaved.
+
+USAGE:
+    journal = EditJournal(encrypt=cipher.encrypt, decrypt=cipher.decrypt)
+    for note_id, title, text in journal.recover(load):  # at startup
+        ...
+    journal.checkpoint(note_id, title, editor_text)     # after a save
+    watcher.add_listener(journal.record)
+"""
+import hashlib
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from .constants import NOTES_FOLDER
+from .editor_buffer import LineBuffer, TextChange
+from .instances import try_lock
+
+JOURNAL_GLOB = "edits*.journal"  # every window's, side by side
+FLUSH_INTERVAL = 0.2  # seconds; the most typing a crash can lose
+
+_TRUNCATE = object()
+_STOP = object()
+
+
+def text_hash(text: str) -> str:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def journal_file(folder=NOTES_FOLDER) -> Path:
+    """This process's journal."""
+    return Path(folder) / f"edits.{os.getpid()}.journal"
+
+
+class EditJournal:
+    """Append-only log of editor changes, replayed after a crash."""
+
+    def __init__(self, path=None, encrypt: Callable = str,
+                 decrypt: Callable = str, flush_interval=FLUSH_INTERVAL):
+        self.path = Path(path) if path is not None else journal_file()
+        self.encrypt = encrypt
+        self.decrypt = decrypt
+        self.flush_interval = flush_interval
+        self.note_id = None  # note the following records belong to
+        self.title = None
+        self._unsaved = False  # edits recorded since the checkpoint
+        self._queue = queue.Queue()
+        self._thread = None
+
+    # --- Writing (Tk thread) ---
+    def checkpoint(self, note_id, title, text):
+        """Start over from `text`, which was just saved (stripped)."""
+        stripped = text.strip()
+        start = text.find(stripped) if stripped else len(text)
+        self.note_id = note_id
+        self.title = title
+        self._unsaved = False
+        self._put(_TRUNCATE)
+        if note_id:
+            self._append({"n": note_id, "h": text_hash(stripped),
+                          "b": [text[:start], text[start + len(stripped):]]})
+
+    def clear(self):
+        """Nothing is left to recover (e.g. the note was deleted)."""
+        self.note_id = None
+        self._unsaved = False
+        self._put(_TRUNCATE)
+
+    def record(self, change: TextChange):
+        """TextWatcher listener: journal one edit of the open note."""
+        if not self.note_id:
+            return
+        self._unsaved = True
+        if change.op == "reset":
+            self._append({"n": self.note_id,
+                          "r": self.encrypt(change.text)})
+        else:
+            self._append({"n": self.note_id, "f": change.first,
+                          "o": change.old_last,
+                          "l": self.encrypt("\n".join(change.new_lines))})
+
+    def record_title(self, title):
+        if self.note_id and title != self.title:
+            self.title = title
+            self._unsaved = True
+            self._append({"n": self.note_id, "t": title})
+
+    def close(self):
+        """Write what is queued and stop the writer thread.
+
+        The file is deleted unless it has edits to recover.
+        """
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+            self._thread = None
+            if not self._unsaved:
+                try:
+                    os.remove(self.path)
+                except OSError as e:
+                    logging.info(f"Edit journal not removed: {e}")
+
+    def _append(self, entry):
+        self._put(json.dumps(entry, ensure_ascii=False) + "\n")
+
+    def _put(self, item):
+        if self._thread is None:
+            self._thread = threading.Thread(
+                target=self._write_loop, daemon=True, name="Edit journal")
+            self._thread.start()
+        self._queue.put(item)
+
+    # --- Writer thread ---
+    def _write_loop(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            try:
+                f.seek(0)  # Windows locks from the current position
+                try_lock(f)  # ours: recover() in other windows skips it
+            except OSError as e:
+                logging.error(f"Edit journal not locked: {e}")
+            while True:
+                batch = [self._queue.get()]
+                deadline = time.monotonic() + self.flush_interval
+                while batch[-1] is not _STOP:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    try:
+                        batch.append(self._queue.get(timeout=remaining))
+                    except queue.Empty:
+                        break
+                try:
+                    for item in batch:
+                        if item is _TRUNCATE:
+                            f.seek(0)
+                            f.truncate()
+                        elif item is not _STOP:
+                            f.write(item)
+                    f.flush()
+                    os.fsync(f.fileno())
+                except OSError as e:
+                    logging.error(f"Edit journal write failed: {e}")
+                if batch[-1] is _STOP:
+                    return
+
+    # --- Recovery (at startup, before anything is journaled) ---
+    def recover(self, load: Callable[[int], Optional[Tuple[str, str]]]
+                ) -> Iterator[Tuple[int, str, str]]:
+        """Yield (note id, title, text) for notes with unsaved edits.
+
+        `load(note_id)` returns the saved (title, decrypted text) of a
+        note, or None if it no longer exists. The caller saves what is
+        yielded. Covers the journals of every window that is gone,
+        each of which is deleted afterwards.
+        """
+        for path in sorted(self.path.parent.glob(JOURNAL_GLOB)):
+            if path == self.path and self._thread is not None:
+                continue  # being written
+            lines = self._read_unused(path)
+            if lines is None:
+                continue
+            yield from self._replay(lines, load)
+            try:
+                os.remove(path)
+            except OSError as e:
+                logging.info(f"Edit journal {path.name} not removed: {e}")
+
+    @staticmethod
+    def _read_unused(path) -> Optional[List[str]]:
+        """`path`'s lines, or None if a running window holds it."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                try_lock(f)
+                return f.readlines()
+        except OSError:
+            return None
+
+    def _replay(self, lines, load) -> Iterator[Tuple[int, str, str]]:
+        notes = {}  # note id -> [title, buffer, saved title] or None
+        for number, line in enumerate(lines, start=1):
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                # The last record can be cut short by the crash
+                logging.info(f"Edit journal ends at line {number}.")
+                break
+            note_id = entry["n"]
+            if "h" in entry:
+                notes[note_id] = self._base(note_id, entry, load)
+                continue
+            state = notes.get(note_id)
+            if state is None:
+                continue
+            if "t" in entry:
+                state[0] = entry["t"]
+            elif "r" in entry:
+                text = self.decrypt(entry["r"])
+                state[1].apply(TextChange("reset", 1, -1, text.split("\n"),
+                                          text=text))
+            else:
+                state[1].apply(TextChange(
+                    "insert", entry["f"], entry["o"],
+                    self.decrypt(entry["l"]).split("\n")))
+
+        for note_id, state in notes.items():
+            if state is not None and (state[1].dirty or state[0] != state[2]):
+                yield note_id, state[0], state[1].text().strip()
+
+    @staticmethod
+    def _base(note_id, entry, load):
+        saved = load(note_id)
+        if saved is None:
+            return None
+        title, text = saved
+        if text_hash(text) != entry["h"]:
+            # Saved again after this checkpoint (e.g. by another window)
+            logging.info(f"Edit journal for note {note_id} is outdated.")
+            return None
+        lead, trail = entry["b"]
+        # [title, buffer, saved title]
+        return [title, LineBuffer(lead + text + trail), title]
@@ -1,30 +1,25 @@
 # license_manager.py
 
 # For license management
-import json
 import re
 import threading
 import webbrowser
 import customtkinter as ctk
 import tkinter.messagebox as tkmsg
 import os
-from cryptography.hazmat.primitives import hashes, serialization
-from cryptography.hazmat.primitives.asymmetric import padding
-import base64
 
 import requests
 
 from scripts.constants import (EMAIL_ID_FILE, LICENSE_FILE,
                                TNR_BMTB_SERVER,  logging,
                                APP_ICON, APP_NAME, read_json_file,
-                               get_device_id,
-                               ID_FILE, PUBLIC_KEY,
+                               user_app_id, PUBLIC_KEY,
                                write_json_file,
                                PREMIUM_PRICE)
 
 from scripts.utils import askstring, center_window, connected_to_server
-
-USER_APP_ID = get_device_id(ID_FILE)
+from scripts.licensing import parse_license, verify_license
+from scripts.perf import traced
 
 
 class LicenseManager:
@@ -54,6 +49,7 @@ class LicenseManager:
         # Even if there's an error,
         # This would wake it up.
 
+    @traced()
     def load_and_validate_license(self):
         if not os.path.exists(self.license_file):
             logging.error("License file corrupted or missing!")
@@ -96,36 +92,14 @@ class LicenseManager:
     def is_premium_user(self):
         return self.is_premium
 
+    @traced()
     def verify_signature(self, license_data, license_key):
         """This is a silent function 
         as opposed to  `activate_license(...)`"""
-        try:
-            public_key = serialization.load_pem_public_key(
-                self.public_key.encode())
-
-            # Encode and hash the license data
-            license_bytes = license_data.encode()
-            signature = base64.b64decode(license_key)
-
-            public_key.verify(  # type: ignore
-                signature,
-                license_bytes,
-                padding.PKCS1v15(),  # type: ignore
-                hashes.SHA256()  # type: ignore
-            )
-
-            # ✅ Now confirm it’s for this specific machine
-            data = json.loads(license_data)
-            if data.get("device_id") != USER_APP_ID:
-                logging.error("License used on unauthorized device.")
-                return False
-
-            logging.info("License verified and bound to this device.")
-            self.is_premium = True
-            return True
-        except Exception as e:
-            logging.error(f"License verification failed: {e}")
+        if not verify_license(license_data, license_key):
             return False
+        self.is_premium = True
+        return True
 
     # Formatting
     def format_license(self, license_data, license_key):
@@ -135,9 +109,7 @@ class LicenseManager:
         }
 
     def parse_license(self, data):
-        """TODO: decrypt data"""
-        license_dict = data if isinstance(data, dict) else json.loads(data)
-        return license_dict["license_data"], license_dict["license_key"]
+        return parse_license(data)
 
     # --- Link and license acquisition ---
 
@@ -263,7 +235,7 @@ class LicenseManager:
                     # app
                     json={"amount": PREMIUM_PRICE,
                           "email": self.user_email,
-                          "device_id": USER_APP_ID})
+                          "device_id": user_app_id()})
 
                 reference = str(resp.json()["data"]["reference"])
             except Exception as e:
@@ -0,0 +1,64 @@
+# licensing.py
+"""The free-version limit and license checks.
+
+Kept apart from license_manager.py (which shows Tk windows) so the CLI
+can enforce the same limit as the app without importing tkinter.
+"""
+import base64
+import json
+import os
+
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import padding
+
+from scripts.constants import (LICENSE_FILE, PUBLIC_KEY, logging,
+                               read_json_file, user_app_id)
+
+MAX_FREEMIUM_NOTES = 5
+
+
+def verify_license(license_data, license_key) -> bool:
+    """True when `license_key` signs `license_data` for this device."""
+    try:
+        public_key = serialization.load_pem_public_key(PUBLIC_KEY.encode())
+
+        # Encode and hash the license data
+        license_bytes = license_data.encode()
+        signature = base64.b64decode(license_key)
+
+        public_key.verify(  # type: ignore
+            signature,
+            license_bytes,
+            padding.PKCS1v15(),  # type: ignore
+            hashes.SHA256()  # type: ignore
+        )
+
+        # ✅ Now confirm it’s for this specific machine
+        data = json.loads(license_data)
+        if data.get("device_id") != user_app_id():
+            logging.error("License used on unauthorized device.")
+            return False
+
+        logging.info("License verified and bound to this device.")
+        return True
+    except Exception as e:
+        logging.error(f"License verification failed: {e}")
+        return False
+
+
+def parse_license(data):
+    """TODO: decrypt data"""
+    license_dict = data if isinstance(data, dict) else json.loads(data)
+    return license_dict["license_data"], license_dict["license_key"]
+
+
+def has_valid_license(license_file=LICENSE_FILE) -> bool:
+    """Check the saved license, leaving the file alone either way."""
+    if not os.path.exists(license_file):
+        return False
+    try:
+        data = read_json_file(license_file)
+        return verify_license(*parse_license(data))
+    except Exception as e:
+        logging.error(f"License unreadable: {e}")
+        return False
@@ -0,0 +1,154 @@
+# logging_pipeline.py
+"""Non-blocking logging for the app.
+
+Log calls made on the Tk main thread (or any other thread) only put the
+record in a bounded in-memory queue. A single writer thread takes records
+off the queue and does the actual disk writes, including log rotation.
+If the queue is ever full the record is dropped and counted rather than
+making the caller wait.
+
+USAGE:
+    from scripts.logging_pipeline import start_logging
+    start_logging(LOGS_FILE)          # once, at startup
+    start_logging(LOGS_FILE, True)    # one JSON object per line instead
+
+Records are written as plain text by default. Set the `BMTB_LOG_JSON`
+environment variable to 1 for JSON-structured records.
+"""
+import atexit
+import copy
+import json
+import logging
+import os
+import queue
+import threading
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+
+TEXT_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+MAX_QUEUED_RECORDS = 10_000
+
+_listener = None
+_queue_handler = None
+_lock = threading.Lock()
+
+
+class DroppingQueueHandler(QueueHandler):
+    """A QueueHandler that never blocks the thread that logs."""
+
+    def __init__(self, q):
+        super().__init__(q)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+    def prepare(self, record):
+        # QueueHandler.prepare() would fold the traceback into the
+        # message and drop exc_info. Keep it apart, as text (the
+        # traceback's frames needn't live on in the queue), so the
+        # writer's formatter decides where it goes.
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _EXCEPTIONS.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+class _WriterListener(QueueListener):
+    def enqueue_sentinel(self):
+        # The queue may be full when stopping; the writer thread is
+        # still draining it, so waiting here is fine (and short).
+        self.queue.put(self._sentinel)
+
+
+_EXCEPTIONS = logging.Formatter()
+
+
+class JsonFormatter(logging.Formatter):
+    """Format each record as a single JSON object."""
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created).isoformat(
+                timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "where": f"{record.module}:{record.lineno}",
+            "message": record.getMessage(),
+        }
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exception"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False)
+
+
+def json_logs_requested() -> bool:
+    return os.getenv("BMTB_LOG_JSON", "") not in ("", "0", "false")
+
+
+def start_logging(log_file, json_records=None, level=logging.INFO,
+                  max_records=MAX_QUEUED_RECORDS):
+    """Route the root logger through a queue to a writer thread.
+
+    Calling it again while the pipeline is running does nothing.
+    """
+    global _listener, _queue_handler
+    if json_records is None:
+        json_records = json_logs_requested()
+
+    with _lock:
+        if _listener is not None:
+            return _listener
+
+        # delay=True: the file is opened by the writer thread, not here
+        file_handler = RotatingFileHandler(
+            log_file, maxBytes=1_000_000, backupCount=3,
+            encoding="utf-8", delay=True)
+        file_handler.setFormatter(
+            JsonFormatter() if json_records
+            else logging.Formatter(TEXT_FORMAT))
+
+        records = queue.Queue(maxsize=max_records)
+        _queue_handler = DroppingQueueHandler(records)
+
+        root = logging.getLogger()
+        root.setLevel(level)
+        root.addHandler(_queue_handler)
+
+        _listener = _WriterListener(
+            records, file_handler, respect_handler_level=True)
+        _listener.start()
+        atexit.register(stop_logging)
+        return _listener
+
+
+def stop_logging():
+    """Write out everything still queued and stop the writer thread."""
+    global _listener, _queue_handler
+    with _lock:
+        if _listener is None:
+            return
+        logging.getLogger().removeHandler(_queue_handler)
+        _listener.stop()
+        if _queue_handler.dropped:
+            # The writer thread is gone; write this one directly.
+            for handler in _listener.handlers:
+                handler.handle(logging.makeLogRecord({
+                    "levelno": logging.WARNING, "levelname": "WARNING",
+                    "msg": f"Log queue was full; dropped "
+                           f"{_queue_handler.dropped} record(s).",
+                }))
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+        _queue_handler = None
@@ -0,0 +1,174 @@
+# maintenance.py
+"""Database upkeep that runs while the user isn't typing.
+
+Deleting notes leaves free pages in BMTbnotes.db, and query plans
+drift as the data grows. `run_step()` does one small, bounded piece of
+upkeep and says whether more is waiting:
+
+1. ANALYZE (with a row limit) once a week;
+2. PRAGMA optimize once a day.
+
+When they last ran is kept in the `meta` table.
+
+Free pages are given back to the disk by `release_free_pages()` at
+startup instead, before the window opens: the app's read connection
+memory-maps the file, and Windows won't truncate a mapped file, so an
+incremental vacuum while it is open frees nothing. That needs
+auto_vacuum=INCREMENTAL. Older databases are switched by
+`convert_auto_vacuum()`, which takes a full VACUUM: the app runs it at
+startup too, and only for small files; `bmtb vacuum` converts big ones.
+
+`MaintenanceScheduler` calls run_step() in a background thread once
+the editor has been idle for a while, one step at a time, so a save
+never waits on more than one short step.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+AUTO_VACUUM_INCREMENTAL = 2
+CONVERT_MAX_BYTES = 50_000_000    # full VACUUM is fine up to this size
+ANALYZE_EVERY = 7 * 24 * 3600
+OPTIMIZE_EVERY = 24 * 3600
+ANALYSIS_LIMIT = 1000             # rows sampled per index by ANALYZE
+
+
+def create_tables(conn) -> None:
+    # New databases get incremental auto-vacuum from the start (the
+    # pragma only takes effect before the first table is created).
+    if conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0:
+        conn.execute(f"PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS meta (
+        key TEXT PRIMARY KEY,
+        value TEXT
+        );
+        """
+    )
+
+
+def get_meta(conn, key, default=None):
+    row = conn.execute("SELECT value FROM meta WHERE key = ?",
+                       (key,)).fetchone()
+    return default if row is None else row[0]
+
+
+def set_meta(conn, key, value) -> None:
+    conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                 (key, str(value)))
+
+
+def _due(conn, key, every, now) -> bool:
+    return now - float(get_meta(conn, key, 0)) >= every
+
+
+def convert_auto_vacuum(db_path) -> bool:
+    """Switch an older database to incremental auto-vacuum.
+
+    Blocks every other writer while the VACUUM runs, so call it before
+    the app starts saving. Returns True if the database was converted.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        mode = conn.execute("PRAGMA auto_vacuum").fetchone()[0]
+        if mode == AUTO_VACUUM_INCREMENTAL:
+            return False
+        if os.path.getsize(db_path) > CONVERT_MAX_BYTES:
+            logging.info("Database too big to convert at startup;"
+                         " `bmtb vacuum` will do it.")
+            return False
+        conn.execute(f"PRAGMA auto_vacuum = {AUTO_VACUUM_INCREMENTAL}")
+        conn.execute("VACUUM")
+        logging.info("Database switched to incremental vacuum.")
+        return True
+    finally:
+        conn.close()
+
+
+def release_free_pages(db_path) -> int:
+    """Shrink the file by its free pages. Returns how many were freed.
+
+    Call it while nothing has the database memory-mapped.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        if conn.execute("PRAGMA auto_vacuum").fetchone()[0]\
+                != AUTO_VACUUM_INCREMENTAL:
+            return 0
+        free = conn.execute("PRAGMA freelist_count").fetchone()[0]
+        if free:
+            # executescript: execute() would only free one page, as it
+            # stops stepping a statement that returns no columns
+            conn.executescript("PRAGMA incremental_vacuum;")
+        return free
+    finally:
+        conn.close()
+
+
+def run_step(db_path, now=None) -> bool:
+    """Do one bounded maintenance step. Returns True if more is due."""
+    now = time.time() if now is None else now
+    conn = sqlite3.connect(db_path, timeout=1)
+    try:
+        if _due(conn, "last_analyze", ANALYZE_EVERY, now):
+            conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+            conn.execute("ANALYZE")
+            set_meta(conn, "last_analyze", now)
+            conn.commit()
+            return True
+
+        if _due(conn, "last_optimize", OPTIMIZE_EVERY, now):
+            conn.execute("PRAGMA optimize")
+            set_meta(conn, "last_optimize", now)
+            conn.commit()
+        return False
+    finally:
+        conn.close()
+
+
+class MaintenanceScheduler:
+    """Runs `run_step` in the background while the editor is idle.
+
+    Call `touch()` on every keystroke; `start()` once.
+    """
+
+    def __init__(self, widget, db_path, idle_seconds=30, poll_ms=5000):
+        self.widget = widget
+        self.db_path = db_path
+        self.idle_seconds = idle_seconds
+        self.poll_ms = poll_ms
+        self.last_activity = time.monotonic()
+        self.more_work = True
+        self._thread = None
+
+    def touch(self):
+        self.last_activity = time.monotonic()
+        self.more_work = True
+
+    def start(self):
+        self.widget.after(self.poll_ms, self._poll)
+
+    def _poll(self):
+        idle = time.monotonic() - self.last_activity >= self.idle_seconds
+        busy = self._thread is not None and self._thread.is_alive()
+        if idle and self.more_work and not busy:
+            self._thread = threading.Thread(
+                target=self._step, daemon=True, name="DB maintenance")
+            self._thread.start()
+        try:
+            self.widget.after(self.poll_ms, self._poll)
+        except Exception:
+            pass  # window destroyed
+
+    def _step(self):
+        try:
+            self.more_work = run_step(self.db_path)
+        except sqlite3.OperationalError as e:
+            # e.g. the app is saving; try again on the next poll
+            logging.info(f"Maintenance postponed: {e}")
+        except Exception as e:
+            logging.error(f"Maintenance step failed: {e}")
+            self.more_work = False
@@ -0,0 +1,64 @@
+# note_cache.py
+"""Decrypted note bodies, kept in memory for fast note switching.
+
+Decrypting a note costs time proportional to its size, and flipping
+between the same few notes used to pay it on every click. `NoteCache`
+keeps the plaintext of recently opened notes, keyed by note id and a
+content version, so a note whose row didn't change is shown without
+decrypting it again.
+
+Memory is capped by a byte budget rather than a number of notes: one
+large note can take the space of hundreds of small ones. Plaintext is
+sensitive, so the owner wipes the cache whenever the notes are locked
+away (app closed, minimised with password protection on, all notes
+cleared).
+"""
+import sys
+from collections import OrderedDict
+
+DEFAULT_BUDGET_MB = 64
+
+
+class NoteCache:
+    """A byte-bounded LRU of plaintext per (note id, version)."""
+
+    def __init__(self, budget_bytes=DEFAULT_BUDGET_MB * 1024 * 1024):
+        self.budget = budget_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # note_id -> (version, text, size)
+
+    def get(self, note_id, version):
+        """The cached plaintext, or None if missing or outdated."""
+        entry = self._entries.get(note_id)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(note_id)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, note_id, version, text):
+        self.invalidate(note_id)
+        size = sys.getsizeof(text)
+        if not note_id or size > self.budget:
+            return  # would evict everything else for one note
+        self._entries[note_id] = (version, text, size)
+        self.size += size
+        while self.size > self.budget:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self.size -= evicted
+
+    def invalidate(self, note_id):
+        entry = self._entries.pop(note_id, None)
+        if entry is not None:
+            self.size -= entry[2]
+
+    def clear(self):
+        """Drop every plaintext (e.g. when the app locks)."""
+        self._entries.clear()
+        self.size = 0
+
+    def __len__(self):
+        return len(self._entries)
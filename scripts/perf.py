@@ -0,0 +1,131 @@
+# perf.py
+"""Lightweight timing of the app's hot paths.
+
+Timings are kept in small ring buffers (the last `RING_SIZE` calls per
+name) and summarised as p50/p95/max on demand. When tracing is off the
+only cost is one boolean check per call.
+
+USAGE:
+    from scripts.perf import traced, span
+
+    @traced()                      # name defaults to the function name
+    def get_notes(): ...
+
+    with span("decrypt"):
+        ...
+
+Tracing is off by default. It is turned on by the `BMTB_PERF=1`
+environment variable or the "performance_tracing" setting, and the
+numbers are shown in the hidden Performance section of the settings.
+"""
+import functools
+import json
+import os
+import time
+from collections import deque
+
+RING_SIZE = 512
+
+_enabled = os.getenv("BMTB_PERF", "") not in ("", "0", "false")
+_samples = {}  # name -> deque of durations in seconds
+
+
+def enable(on=True):
+    """Turn tracing on or off at runtime."""
+    global _enabled
+    _enabled = bool(on)
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def record(name, seconds):
+    """Store one duration (in seconds) for `name`."""
+    buf = _samples.get(name)
+    if buf is None:
+        buf = _samples.setdefault(name, deque(maxlen=RING_SIZE))
+    buf.append(seconds)
+
+
+class _Span:
+    __slots__ = ("name", "start")
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+def span(name):
+    """Context manager timing the enclosed block under `name`."""
+    return _Span(name) if _enabled else _NULL_SPAN
+
+
+def traced(name=None):
+    """Decorator timing every call of the function under `name`."""
+    def decorator(func):
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(label, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(len(sorted_values) * fraction))
+    return sorted_values[index]
+
+
+def stats() -> dict:
+    """Return {name: {count, p50_ms, p95_ms, max_ms}} for recent calls."""
+    summary = {}
+    for name, buf in sorted(_samples.items()):
+        values = sorted(buf)
+        if not values:
+            continue
+        summary[name] = {
+            "count": len(values),
+            "p50_ms": round(_percentile(values, 0.50) * 1000, 3),
+            "p95_ms": round(_percentile(values, 0.95) * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3),
+        }
+    return summary
+
+
+def export_json(path):
+    """Write the current `stats()` to `path` as JSON."""
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats(), f, indent=2)
+
+
+def reset():
+    """Forget every recorded duration."""
+    _samples.clear()
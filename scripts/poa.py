@@ -0,0 +1,120 @@
+# poa.py
+"""Plans of action (POAs): the to-dos hiding in notes.
+
+A POA is a bullet line ("- call the bank", the kind handle_bullets
+continues) or a line with a TODO marker ("TODO: renew passport").
+When the app closes, new POAs are handed to BMA (Bobsi Mo Activities).
+
+`PoaScanner` remembers, per note, a hash of the stored (encrypted)
+content and hashes of the POAs found in it: the cache file never holds
+note text. A scan only decrypts and parses
+notes whose content changed since the previous scan, and reports only
+POAs that weren't there before, so BMA never gets the same one twice.
+
+The app doesn't even read the other notes: it passes only those saved
+since its last scan (iter_notes(since=...)), then forgets the deleted
+ones with forget_deleted().
+
+USAGE:
+    scanner = PoaScanner()
+    new = scanner.scan(notes, cipher.decrypt)   # notes as from get_notes()
+    new = scanner.scan(changed, cipher.decrypt, complete=False)
+    scanner.forget_deleted(get_existing_ids(scanner.note_ids()))
+"""
+import hashlib
+import json
+import logging
+import os
+import re
+from typing import Callable, Dict, Iterable, List
+
+from .constants import NOTES_FOLDER
+
+POA_CACHE_FILE = NOTES_FOLDER / "poas.json"
+
+BULLET = re.compile(r"^\s*[-*]\s+(?!\[[xX]\])(?:\[ \]\s*)?(.+)$")
+TODO = re.compile(r"\bTODO\b[\s:\-]*(.+)$")
+
+
+def extract_poas(text: str) -> List[str]:
+    """Return the POAs in `text`, in order, without duplicates."""
+    poas = []
+    for line in text.splitlines():
+        match = BULLET.match(line) or TODO.search(line)
+        if match:
+            poa = match.group(1).strip()
+            if poa and poa not in poas:
+                poas.append(poa)
+    return poas
+
+
+def content_hash(content: str) -> str:
+    return hashlib.blake2b(content.encode("utf-8"),
+                           digest_size=16).hexdigest()
+
+
+class PoaScanner:
+    """Finds POAs added to notes since the last scan."""
+
+    def __init__(self, cache_file=POA_CACHE_FILE):
+        self.cache_file = cache_file
+        self.first_scan = not os.path.exists(cache_file)
+        # note id -> {"hash": content hash, "poa_hashes": [...]}
+        self.cache: Dict[str, dict] = {}
+        if not self.first_scan:
+            try:
+                with open(cache_file, "r", encoding="utf-8") as f:
+                    self.cache = json.load(f)
+            except (OSError, ValueError) as e:
+                logging.error(f"POA cache unreadable, rebuilding: {e}")
+                self.first_scan = True
+        for entry in self.cache.values():
+            if "poas" in entry:
+                # Written by an older version: hash the texts it stored
+                entry["poa_hashes"] = [content_hash(poa)
+                                       for poa in entry.pop("poas")]
+
+    def scan(self, notes: Iterable[dict], decrypt: Callable[[str], str],
+             complete: bool = True) -> List[str]:
+        """Return POAs that are new since the last scan.
+
+        `notes` are all the notes, or with `complete` False only those
+        that may have changed. The very first scan only records what is
+        already there: existing bullets are not news to the user.
+        """
+        new = []
+        seen = set()
+        for note in notes:
+            key = str(note.get("id"))
+            seen.add(key)
+            digest = content_hash(note.get("content", ""))
+            entry = self.cache.get(key)
+            if entry is not None and entry["hash"] == digest:
+                continue  # unchanged since the last scan
+
+            poas = extract_poas(decrypt(note.get("content", "")))
+            hashes = [content_hash(poa) for poa in poas]
+            if entry is not None or not self.first_scan:
+                old = set(entry["poa_hashes"]) if entry else set()
+                new.extend(poa for poa, poa_hash in zip(poas, hashes)
+                           if poa_hash not in old)
+            self.cache[key] = {"hash": digest, "poa_hashes": hashes}
+
+        if complete:
+            for key in set(self.cache) - seen:
+                del self.cache[key]  # deleted notes
+        self.first_scan = False
+        return new
+
+    def note_ids(self) -> List[int]:
+        return [int(key) for key in self.cache]
+
+    def forget_deleted(self, existing_ids: Iterable[int]):
+        """Drop the notes not in `existing_ids` (after a partial scan)."""
+        keep = {str(note_id) for note_id in existing_ids}
+        for key in set(self.cache) - keep:
+            del self.cache[key]
+
+    def save(self):
+        with open(self.cache_file, "w", encoding="utf-8") as f:
+            json.dump(self.cache, f)
@@ -0,0 +1,88 @@
+# quick_switcher.py
+"""Ctrl+P: open a note by typing part of its title.
+
+The window searches a `TitleIndex` on every keystroke and shows the
+best matches in a fixed set of rows, which are reused (only their text
+changes) rather than rebuilt. It opens on the most recently used
+notes. Up/Down pick a row, Enter or a click opens it, Escape closes
+the window.
+"""
+import customtkinter as ctk
+
+from scripts.constants import APP_ICON
+from scripts.display_titles import DisplayTitles
+
+ROWS = 10
+# Room for a title inside a row (px, at the row's font)
+ROW_TEXT_PX = 370
+
+
+class QuickSwitcher(ctk.CTkToplevel):
+    """Find-as-you-type list of note titles."""
+
+    def __init__(self, parent, index, on_open):
+        super().__init__(parent)
+        self.title("Open Note")
+        self.geometry("420x360")
+        self.wm_iconbitmap(APP_ICON)
+        self.resizable(False, False)
+        self.transient(parent)
+
+        self.index = index
+        self.on_open = on_open
+        self.results = []
+        self.selected = 0
+        self.display_titles = DisplayTitles(ctk.CTkFont(), ROW_TEXT_PX)
+
+        self.entry = ctk.CTkEntry(self, placeholder_text="Note title")
+        self.entry.pack(fill="x", padx=10, pady=10)
+        self.rows = []
+        for n in range(ROWS):
+            row = ctk.CTkButton(self, text="", anchor="w", height=26,
+                                fg_color="#333333",
+                                command=lambda n=n: self.open(n))
+            self.rows.append(row)
+
+        self.entry.bind("<KeyRelease>", self.on_key)
+        self.entry.bind("<Down>", lambda e: self.move(1))
+        self.entry.bind("<Up>", lambda e: self.move(-1))
+        self.entry.bind("<Return>", lambda e: self.open(self.selected))
+        self.bind("<Escape>", lambda e: self.destroy())
+        self.after(50, self.entry.focus_set)
+        self.show_results()
+
+    def on_key(self, event):
+        if event.keysym in ("Up", "Down", "Return", "Escape"):
+            return
+        self.show_results()
+
+    def show_results(self):
+        self.results = self.index.search(self.entry.get(), ROWS)
+        self.selected = 0
+        for n, row in enumerate(self.rows):
+            if n < len(self.results):
+                note_id, title = self.results[n]
+                row.configure(
+                    text=self.display_titles.get(note_id, title or "Untitled"))
+                row.pack(fill="x", padx=10, pady=1)
+            else:
+                row.pack_forget()
+        self._highlight()
+
+    def move(self, step):
+        if self.results:
+            self.selected = (self.selected + step) % len(self.results)
+            self._highlight()
+        return "break"
+
+    def _highlight(self):
+        for n, row in enumerate(self.rows[:len(self.results)]):
+            row.configure(
+                fg_color="#555555" if n == self.selected else "#333333")
+
+    def open(self, n):
+        if n >= len(self.results):
+            return
+        note_id = self.results[n][0]
+        self.destroy()
+        self.on_open(note_id)
@@ -1,7 +1,7 @@
 import customtkinter as ctk
 import tkinter as tk
 import tkinter.messagebox as tkmsg
-from tkinter import simpledialog
+from tkinter import simpledialog, filedialog
 import os
 import json
 
@@ -13,6 +13,7 @@ from scripts.utils import askstring, clear_all_notes
 from scripts.feedback_collection import FeedbackAPI
 from scripts.license_manager import LicenseManager
 from scripts.auto_updater import AutoUpdater
+from scripts import perf
 
 
 def load_settings():
@@ -126,6 +127,13 @@ class SettingsWindow(ctk.CTkToplevel):
                                 **self.styles["button"])
         update_bt.pack(anchor="w", padx=10, pady=5)
 
+        # Performance section: hidden unless tracing is on.
+        # Ctrl+Shift+P toggles it.
+        self.perf_frame = None
+        if perf.is_enabled():
+            self.show_performance()
+        self.bind("<Control-Shift-P>", self.toggle_performance)
+
         # Bottom buttons
         btn_frame = tk.Frame(self, bg=self.colors["bg"])
         btn_frame.pack(side="bottom", fill="x", pady=10)
@@ -183,13 +191,60 @@ class SettingsWindow(ctk.CTkToplevel):
         )
         if answer and answer.strip().upper() == "YES":
             clear_all_notes()
-            self.parent.notes.clear()
-            self.parent.refresh_list()
-            self.parent.title_entry.delete(0, "end")
-            self.parent.textbox.delete("1.0", "end")
-            self.parent.current_index = None
+            self.parent.reset_after_clear()
             tkmsg.showinfo("Success", "All notes deleted successfully!")
 
+    def toggle_performance(self, event=None):
+        perf.enable(not perf.is_enabled())
+        self.settings["performance_tracing"] = perf.is_enabled()
+        save_settings(self.settings)
+        if perf.is_enabled():
+            self.show_performance()
+        elif self.perf_frame is not None:
+            self.perf_frame.destroy()
+            self.perf_frame = None
+            self.geometry("450x450")
+
+    def show_performance(self):
+        if self.perf_frame is not None:
+            return
+        self.geometry("450x700")
+        self.perf_frame = tk.LabelFrame(
+            self, text="Performance", **self.styles["section"])
+        self.perf_frame.pack(fill="x", padx=15, pady=10, ipady=5)
+
+        self.perf_label = tk.Label(
+            self.perf_frame, justify="left", anchor="w",
+            bg=self.colors["bg"], fg=self.colors["fg"],
+            font=("Consolas", 9))
+        self.perf_label.pack(fill="x", padx=10, pady=5)
+
+        row = tk.Frame(self.perf_frame, bg=self.colors["bg"])
+        row.pack(fill="x")
+        tk.Button(row, text="Refresh", command=self.refresh_performance,
+                  **self.styles["button"]).pack(side="left", padx=10, pady=5)
+        tk.Button(row, text="Export JSON", command=self.export_performance,
+                  **self.styles["button"]).pack(side="left", pady=5)
+        self.refresh_performance()
+
+    def refresh_performance(self):
+        rows = [f"{'':<30}{'p50 ms':>8}{'p95 ms':>8}{'max ms':>8}"]
+        for name, s in perf.stats().items():
+            rows.append(f"{name[-30:]:<30}{s['p50_ms']:>8.1f}"
+                        f"{s['p95_ms']:>8.1f}{s['max_ms']:>8.1f}")
+        if len(rows) == 1:
+            rows.append("No timings recorded yet.")
+        self.perf_label.config(text="\n".join(rows))
+
+    def export_performance(self):
+        path = filedialog.asksaveasfilename(
+            parent=self, title="Export performance data",
+            defaultextension=".json", initialfile="bmtb_performance.json",
+            filetypes=[("JSON", "*.json")])
+        if path:
+            perf.export_json(path)
+            tkmsg.showinfo("Info", f"Performance data saved to {path}")
+
     def verify_current_password(self):
         if not os.path.exists(PASS_FILE):
             tkmsg.showerror("Error", "No password set yet.")
@@ -0,0 +1,64 @@
+# text_stats.py
+"""Live word/character/line counts for the editor.
+
+Counts are kept per line, so an edit only recounts the lines it
+touched (see `editor_buffer.TextChange`) instead of re-scanning the
+whole note on every keystroke.
+"""
+from .utils import count_words_in_string
+
+READING_WORDS_PER_MINUTE = 200
+
+
+class TextStats:
+    def __init__(self, text=""):
+        self.load(text)
+
+    def load(self, text: str):
+        """Count `text` from scratch."""
+        lines = text.split("\n")
+        self.line_words = [count_words_in_string(line) for line in lines]
+        self.line_chars = [len(line) for line in lines]
+        self.words = sum(self.line_words)
+        self._chars = sum(self.line_chars)
+
+    def apply(self, change):
+        """Update the counts from an editor `TextChange`."""
+        if change.op == "reset":
+            self.load(change.text)
+            return
+
+        start, stop = change.first - 1, change.old_last
+        self.words -= sum(self.line_words[start:stop])
+        self._chars -= sum(self.line_chars[start:stop])
+
+        new_words = [count_words_in_string(line) for line in change.new_lines]
+        new_chars = [len(line) for line in change.new_lines]
+        self.line_words[start:stop] = new_words
+        self.line_chars[start:stop] = new_chars
+        self.words += sum(new_words)
+        self._chars += sum(new_chars)
+
+    @property
+    def lines(self) -> int:
+        return len(self.line_chars)
+
+    @property
+    def chars(self) -> int:
+        """Characters including line breaks."""
+        return self._chars + self.lines - 1
+
+    @property
+    def reading_minutes(self) -> int:
+        return round(self.words / READING_WORDS_PER_MINUTE)
+
+    def summary(self) -> str:
+        minutes = self.reading_minutes
+        reading = f"{minutes} min read" if minutes else "< 1 min read"
+        return (f"{_plural(self.words, 'word')}   "
+                f"{_plural(self.chars, 'character')}   "
+                f"{_plural(self.lines, 'line')}   {reading}")
+
+
+def _plural(count, noun):
+    return f"{count:,} {noun}" if count == 1 else f"{count:,} {noun}s"
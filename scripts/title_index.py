@@ -0,0 +1,205 @@
+# title_index.py
+"""In-memory index of note titles for the quick switcher (Ctrl+P).
+
+Titles are case-folded and indexed two ways:
+- a sorted list of whole titles, for titles starting with the query;
+- the sorted vocabulary of title words, each with the notes using it.
+
+A query word is looked up in the vocabulary (a bisect for words that
+start with it, a scan of the vocabulary for words that contain it),
+which is far smaller than the list of notes, and the matches come out
+of those words' note lists. Matches are produced best kind first and
+the search stops once it has `limit` of them, so its cost depends on
+the result count and the vocabulary, not on the number of notes.
+
+Ranking: exact title, title prefix, a word starting with the query,
+a word containing it. When nothing matches, words having the query's
+characters in order are tried ("mtg" finds "meeting"). Ties go to the
+note saved or opened most recently, and an empty query lists those.
+
+USAGE:
+    index = TitleIndex(get_all_titles())  # least recently updated first
+    index.set(note_id, "New title")   # on save
+    index.touch(note_id)              # on open
+    index.remove(note_id)             # on delete
+    index.search("meet")              # -> [(note_id, title), ...]
+"""
+import bisect
+import heapq
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+RESULT_LIMIT = 20
+# Titles starting with the query that are ranked at most (a letter or
+# two can match most of the titles)
+PREFIX_SCAN = 1000
+
+
+def _is_subsequence(query: str, text: str) -> bool:
+    it = iter(text)
+    return all(c in it for c in query)
+
+
+class TitleIndex:
+    """(note id, title) pairs searchable by word and prefix, fast.
+
+    `pairs` come least recently used first.
+    """
+
+    def __init__(self, pairs: Iterable[Tuple[int, str]] = ()):
+        self.titles: Dict[int, str] = {}
+        self._folded: Dict[int, str] = {}
+        # word -> ids, least recently used first
+        self._notes: Dict[str, List[int]] = defaultdict(list)
+        self._used: Dict[int, int] = {}  # note id -> when last used
+        self._clock = 0
+        for note_id, title in dict(pairs).items():
+            self._clock += 1
+            self._used[note_id] = self._clock
+            self.titles[note_id] = title
+            self._folded[note_id] = folded = title.casefold()
+            for word in set(folded.split()):
+                self._notes[word].append(note_id)
+        self._by_title = sorted((t, i) for i, t in self._folded.items())
+        self._words = sorted(self._notes)
+        self._vocabulary: Optional[str] = None  # "\n".join(_words)
+
+    def __len__(self):
+        return len(self.titles)
+
+    def set(self, note_id: int, title: str) -> None:
+        """Add a note, or update its title (it was just saved)."""
+        if self.titles.get(note_id) == title:
+            self.touch(note_id)
+            return
+        self.remove(note_id)
+        self._clock += 1
+        self._used[note_id] = self._clock
+        self.titles[note_id] = title
+        self._folded[note_id] = folded = title.casefold()
+        bisect.insort(self._by_title, (folded, note_id))
+        for word in set(folded.split()):
+            if word not in self._notes:
+                bisect.insort(self._words, word)
+                self._vocabulary = None
+            self._notes[word].append(note_id)
+
+    def touch(self, note_id: int) -> None:
+        """Make a note the most recently used one (it was opened)."""
+        folded = self._folded.get(note_id)
+        if folded is None:
+            return
+        self._clock += 1
+        self._used[note_id] = self._clock
+        for word in set(folded.split()):
+            ids = self._notes[word]
+            ids.remove(note_id)
+            ids.append(note_id)
+
+    def remove(self, note_id: int) -> None:
+        folded = self._folded.pop(note_id, None)
+        if folded is None:
+            return
+        del self.titles[note_id]
+        del self._used[note_id]
+        at = bisect.bisect_left(self._by_title, (folded, note_id))
+        del self._by_title[at]
+        for word in set(folded.split()):
+            ids = self._notes[word]
+            ids.remove(note_id)
+            if not ids:
+                del self._notes[word]
+                del self._words[bisect.bisect_left(self._words, word)]
+                self._vocabulary = None
+
+    # --- Searching ---
+    def _words_starting(self, prefix: str) -> List[str]:
+        words = self._words
+        start = bisect.bisect_left(words, prefix)
+        end = bisect.bisect_left(words, prefix + "\U0010ffff", start)
+        return words[start:end]
+
+    def _words_containing(self, part: str) -> List[str]:
+        if self._vocabulary is None:
+            self._vocabulary = "\n" + "\n".join(self._words) + "\n"
+        text, found, at = self._vocabulary, [], 0
+        while True:
+            at = text.find(part, at)
+            if at < 0:
+                return found
+            start = text.rfind("\n", 0, at) + 1
+            end = text.find("\n", at)
+            if start != at:  # prefixes are found by _words_starting
+                found.append(text[start:end])
+            at = end
+
+    def _words_like(self, part: str) -> List[str]:
+        return [word for word in self._words_starting(part[:1])
+                if _is_subsequence(part, word)]
+
+    def search(self, query: str,
+               limit: int = RESULT_LIMIT) -> List[Tuple[int, str]]:
+        """The best matches for `query`, best first."""
+        words = query.casefold().split()
+        if not words:
+            return self.recent(limit)
+        phrase = " ".join(words)
+        found: Dict[int, tuple] = {}  # note id -> rank
+
+        by_title = self._by_title
+        start = bisect.bisect_left(by_title, (phrase,))
+        end = bisect.bisect_left(
+            by_title, (phrase + "\U0010ffff",), start,
+            min(len(by_title), start + max(limit, PREFIX_SCAN)))
+        for title, note_id in heapq.nsmallest(
+                limit, by_title[start:end],
+                key=lambda pair: (len(pair[0]), -self._used[pair[1]])):
+            found[note_id] = (0 if title == phrase else 1, 0,
+                              len(title), -self._used[note_id])
+
+        collect = self._collect if len(words) == 1 else self._intersect
+        for kind, lookup in ((2, self._words_starting),
+                             (3, self._words_containing),
+                             (4, self._words_like)):
+            if len(found) >= limit or kind == 4 and found:
+                break
+            collect(words, kind, lookup, found, limit)
+
+        best = sorted(found, key=found.get)[:limit]
+        return [(i, self.titles[i]) for i in best]
+
+    def recent(self, limit: int = RESULT_LIMIT) -> List[Tuple[int, str]]:
+        """The most recently saved or opened notes, latest first."""
+        latest = heapq.nlargest(limit, self._used, key=self._used.get)
+        return [(i, self.titles[i]) for i in latest]
+
+    def _rank(self, note_id, kind, first):
+        title = self._folded[note_id]
+        return kind, title.find(first), len(title), -self._used[note_id]
+
+    def _collect(self, words, kind, lookup, found, limit):
+        # One word: its closest vocabulary matches first, most recently
+        # used notes first, until there are enough.
+        for word in sorted(lookup(words[0]), key=len):
+            for note_id in reversed(self._notes[word]):
+                if note_id not in found:
+                    found[note_id] = self._rank(note_id, kind, words[0])
+                    if len(found) >= limit:
+                        return
+
+    def _intersect(self, words, kind, lookup, found, limit):
+        # Several words: the notes having a match for each of them.
+        # At kind 3 a word may match anywhere, so kind 2 matches count.
+        matches = []
+        for word in words:
+            vocabulary = lookup(word)
+            if kind == 3:
+                vocabulary += self._words_starting(word)
+            matches.append(set().union(
+                *(self._notes[w] for w in vocabulary)))
+        matches.sort(key=len)
+        ids = matches[0].intersection(*matches[1:]).difference(found)
+        for note_id in heapq.nsmallest(
+                limit - len(found), ids,
+                key=lambda i: self._rank(i, kind, words[0])):
+            found[note_id] = self._rank(note_id, kind, words[0])
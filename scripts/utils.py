@@ -8,28 +8,51 @@ Provides a tiny, well-documented API the main app can import:
 - update_note(id, title, content)
 - save_note(title, content, note_id=None) -> id (insert or update)
 - get_notes() -> list[dict]
+- get_notes_page(limit, after) -> list[dict] (keyset pagination)
+- get_note(id) -> dict or None
+- count_notes() -> int
+- iter_notes(batch_size, since) -> generator of dicts (streams big databases)
+- add_notes(pairs or (title, content, tags)) -> number inserted (one transaction)
 - delete_note(id)
+- vacuum() / collect_chunk_garbage()
+- set_compression(enabled) / recompact_notes() -> (rewritten, bytes saved)
+- parse_tags(text) -> set of "#tag" names found in text
+- set_note_tags(id, tags) -> whether anything changed
+- get_all_tags() -> [(tag, number of notes)]
+- get_notes_by_tags(all_of, any_of) -> list[dict]
 - migrate_from_json(path) -> number of imported notes
+- save_editor_state(id, cursor, scroll) / get_editor_state(id)
+- get_meta(key) / set_meta(key, value): small app state kept in the DB
 
 USAGE:
     from utils import create_table, get_notes, save_note, delete_note
     create_table()  # call once at app start
 
 Notes: this module expects the caller to handle encryption/decryption of `content`.
+Long bodies are stored zlib-compressed (see encode_content), very long
+ones as deduplicated chunks (see chunk_store.py); every function here
+takes and returns `content` as a plain str either way.
+
+The GUI helpers at the bottom import customtkinter/requests lazily, so
+the database functions can be used headless (see scripts/cli.py).
 """
-import requests
 import re
 import hashlib
-import customtkinter as ctk
 import os
 import sqlite3
+import sys
 import json
+import threading
+import zlib
+from pathlib import Path
 from .constants import (NOTES_DB, RECOVERY_FILE, logging, APP_ICON)
-from typing import (List, Dict, Optional)
-import winreg
+from .perf import traced
+from . import chunk_store, maintenance
+from typing import (Dict, Iterable, Iterator, List, Optional, Tuple)
 # import tkinter.messagebox as tkmsg
 
 def set_user_env_var(name, value):
+    import winreg
     reg_path = r"Environment"
     reg_key = winreg.OpenKey(
         winreg.HKEY_CURRENT_USER,
@@ -57,6 +80,52 @@ def get_connection() -> sqlite3.Connection:
     return sqlite3.connect(NOTES_DB)
 
 
+# Listing and search go through one read-only connection per thread
+# that stays open, with the database memory-mapped: pages read once
+# stay in the process (and the OS cache) instead of being copied into
+# a fresh page cache by every call. The app sets this from "mmap_reads".
+MMAP_READS = True
+MMAP_MAX_BYTES = (8 << 30) if sys.maxsize > 2 ** 32 else (256 << 20)
+_read_local = threading.local()
+
+
+def get_read_connection() -> sqlite3.Connection:
+    """Return this thread's cached read-only connection.
+
+    Falls back to get_connection() when memory-mapped reads are off or
+    the database doesn't exist yet.
+    """
+    path = str(NOTES_DB)
+    if not MMAP_READS or not os.path.exists(path):
+        return get_connection()
+    cached = getattr(_read_local, "conn", None)
+    if cached is None or cached[0] != path:
+        close_read_connection()
+        uri = Path(path).resolve().as_uri() + "?mode=ro"
+        cached = [path, sqlite3.connect(uri, uri=True), 0]
+        _read_local.conn = cached
+    size = os.path.getsize(path)
+    if size > cached[2]:
+        # Map the whole file, with room to grow before remapping
+        cached[2] = min(MMAP_MAX_BYTES, size + size // 4 + (16 << 20))
+        cached[1].execute(f"PRAGMA mmap_size = {cached[2]}").fetchall()
+    return cached[1]
+
+
+def close_read_connection() -> None:
+    """Close this thread's read connection (e.g. before moving the file)."""
+    cached = getattr(_read_local, "conn", None)
+    if cached is not None:
+        cached[1].close()
+        _read_local.conn = None
+
+
+def set_mmap_reads(enabled: bool = True) -> None:
+    global MMAP_READS
+    MMAP_READS = enabled
+    close_read_connection()
+
+
 def create_table() -> None:
     """Create the notes table if it doesn't exist.
 
@@ -66,6 +135,7 @@ def create_table() -> None:
       - content (encrypted or plain text, the app decides)
       - created_at
       - updated_at
+      - version (bumped by every update, see update_note)
     """
     if os.path.exists(NOTES_DB) and\
             os.path.getsize(NOTES_DB) > 10_000_000:
@@ -73,6 +143,7 @@ def create_table() -> None:
             "Warning: Notes database is very large and may slow startup.")
     try:
         with get_connection() as conn:
+            maintenance.create_tables(conn)  # must come first
             c = conn.cursor()
             c.execute(
                 """
@@ -81,10 +152,56 @@ def create_table() -> None:
                 title TEXT NOT NULL,
                 content TEXT NOT NULL,
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                version INTEGER NOT NULL DEFAULT 1
+                );
+                """
+            )
+            columns = [r[1] for r in c.execute("PRAGMA table_info(notes)")]
+            if "version" not in columns:
+                c.execute("ALTER TABLE notes ADD COLUMN"
+                          " version INTEGER NOT NULL DEFAULT 1")
+            # Serves ORDER BY updated_at DESC, id DESC (every listing)
+            c.execute(
+                "CREATE INDEX IF NOT EXISTS idx_notes_updated"
+                " ON notes (updated_at, id)"
+            )
+            # Where the user left off in each note (cursor and scroll)
+            c.execute(
+                """
+                CREATE TABLE IF NOT EXISTS editor_state (
+                note_id INTEGER PRIMARY KEY,
+                cursor TEXT NOT NULL,
+                scroll REAL NOT NULL DEFAULT 0,
                 updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 );
                 """
             )
+            # Tags are plain text (like titles) so filtering by tag never
+            # has to decrypt notes. note_tags' primary key serves
+            # "tags of a note", the index "notes with a tag".
+            c.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tags (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+                );
+                """
+            )
+            c.execute(
+                """
+                CREATE TABLE IF NOT EXISTS note_tags (
+                note_id INTEGER NOT NULL,
+                tag_id INTEGER NOT NULL,
+                PRIMARY KEY (note_id, tag_id)
+                ) WITHOUT ROWID;
+                """
+            )
+            c.execute(
+                "CREATE INDEX IF NOT EXISTS idx_note_tags_tag"
+                " ON note_tags (tag_id, note_id)"
+            )
+            chunk_store.create_tables(conn)
             conn.commit()
     except sqlite3.DatabaseError:
         logging.error(
@@ -93,59 +210,171 @@ def create_table() -> None:
             " delete the file.")
 
 
+# --- Content storage format ---
+# `content` holds either TEXT (stored as is) or a BLOB whose first byte
+# says how it is encoded. SQLite columns accept either type.
+FORMAT_ZLIB = 1
+FORMAT_CHUNKED = chunk_store.FORMAT_CHUNKED
+COMPRESS_NOTES = True   # the app turns this off with "compress_notes"
+COMPRESS_MIN_CHARS = 1024  # shorter bodies don't shrink enough
+# Bodies this long are stored as shared chunks, so an edit only writes
+# the chunks it changed and duplicated text is stored once.
+CHUNK_MIN_CHARS = 32 * 1024
+
+
+def encode_content(content: str):
+    """Return what to store for `content`: TEXT, or a compressed BLOB."""
+    if not COMPRESS_NOTES or len(content) < COMPRESS_MIN_CHARS:
+        return content
+    raw = content.encode("utf-8")
+    packed = zlib.compress(raw, 6)
+    if len(packed) + 1 >= len(raw):
+        return content  # incompressible; keep it readable
+    return bytes([FORMAT_ZLIB]) + packed
+
+
+def set_compression(enabled: bool = True) -> None:
+    """Choose whether bodies saved from now on are compressed."""
+    global COMPRESS_NOTES
+    COMPRESS_NOTES = enabled
+
+
+def _stored_size(value) -> int:
+    return len(value.encode("utf-8")) if isinstance(value, str)\
+        else len(value)
+
+
+def decode_content(value, conn: Optional[sqlite3.Connection] = None) -> str:
+    """Turn a stored `content` value back into the note's text.
+
+    Chunked bodies are read from the chunks table through `conn`.
+    """
+    if value is None:
+        return ""
+    if isinstance(value, str):
+        return value
+    if value[0] == FORMAT_ZLIB:
+        return zlib.decompress(value[1:]).decode("utf-8")
+    if value[0] == FORMAT_CHUNKED:
+        return chunk_store.load(conn or get_connection(), value)
+    raise ValueError(f"Unknown note content format {value[0]}")
+
+
+def _store_content(conn, content: str, old=None):
+    """Return the value to write for `content`, replacing `old`."""
+    if len(content) >= CHUNK_MIN_CHARS:
+        # Only the chunks that differ from `old` are written
+        return chunk_store.store(conn, content, old)
+    chunk_store.release(conn, old)
+    return encode_content(content)
+
+
 def add_note(title: str, content: str) -> int:
     """Insert a new note. Returns the new note id."""
     with get_connection() as conn:
         c = conn.cursor()
         c.execute(
             "INSERT INTO notes (title, content) VALUES (?, ?)",
-            (title, content)
+            (title, _store_content(conn, content))
         )
         nid = c.lastrowid
         conn.commit()
     return nid  # type: ignore
 
 
-def update_note(note_id: int, title: str, content: str) -> None:
-    """Update an existing note.
+class SaveConflict(Exception):
+    """The note was saved by someone else since `version` was read."""
 
+    def __init__(self, note_id, expected, found):
+        super().__init__(f"note {note_id} is at version {found},"
+                         f" not {expected}")
+        self.note_id = note_id
+        self.expected = expected
+        self.found = found  # None if the note was deleted
+
+
+def update_note(note_id: int, title: str, content: str,
+                version: Optional[int] = None) -> int:
+    """Update an existing note. Returns its new version.
+
+    With `version`, the note is only written if it is still at that
+    version (the one the caller loaded); otherwise SaveConflict is
+    raised and nothing changes. Without it the note is overwritten.
     Note: this also updates the updated_at timestamp.
     """
     with get_connection() as conn:
         c = conn.cursor()
+        # Take the write lock now: the old content read below must
+        # still be the stored one when it is replaced.
+        c.execute("BEGIN IMMEDIATE")
+        row = c.execute("SELECT content, version FROM notes WHERE id = ?",
+                        (note_id,)).fetchone()
+        if version is not None and (row is None or row[1] != version):
+            raise SaveConflict(note_id, version, row and row[1])
         c.execute(
-            "UPDATE notes SET title = ?, content = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
-            (title, content, note_id),
+            "UPDATE notes SET title = ?, content = ?,"
+            " updated_at = CURRENT_TIMESTAMP, version = version + 1"
+            " WHERE id = ?",
+            (title, _store_content(conn, content, row and row[0]), note_id),
         )
         conn.commit()
+    return row[1] + 1 if row else 0
 
 
-def save_note(title: str, content: str, note_id: Optional[int] = None) -> int:
+@traced()
+def save_note(title: str, content: str, note_id: Optional[int] = None,
+              version: Optional[int] = None) -> int:
     """Save a note. If note_id is provided it will update, otherwise insert.
 
-    Returns the id of the saved note.
+    `version` is passed on to update_note(). Returns the id of the
+    saved note.
     """
     if note_id:
-        update_note(note_id, title, content)
+        update_note(note_id, title, content, version)
         return note_id
     return add_note(title, content)
 
 
+def add_notes(notes: Iterable[Tuple]) -> int:
+    """Insert many (title, content) pairs in a single transaction.
+
+    Items may also be (title, content, tags) to set each note's #tags
+    (see set_note_tags) in the same transaction.
+    Returns the number of notes inserted.
+    """
+    count = 0
+    with get_connection() as conn:
+        c = conn.cursor()
+        for title, content, *tags in notes:
+            c.execute("INSERT INTO notes (title, content) VALUES (?, ?)",
+                      (title, _store_content(conn, content)))
+            if tags:
+                _set_note_tags(c, c.lastrowid, set(tags[0]))
+            count += 1
+        conn.commit()
+    return count
+
+
 def clear_all_notes():
     with get_connection() as conn:
         c = conn.cursor()
         c.execute("DELETE FROM notes")
+        c.execute("DELETE FROM chunks")
+        c.execute("DELETE FROM editor_state")
+        c.execute("DELETE FROM note_tags")
+        c.execute("DELETE FROM tags")
         conn.commit()
 
 
+@traced()
 def get_notes() -> List[Dict]:
     """Return all notes as a list of dicts ordered by updated_at desc."""
-    with get_connection() as conn:
+    with get_read_connection() as conn:
         c = conn.cursor()
         c.execute(
             "SELECT id, title, content, created_at,"
             " updated_at FROM notes ORDER BY updated_at"
-            " DESC"
+            " DESC, id DESC"
         )
         rows = c.fetchall()
 
@@ -155,7 +384,7 @@ def get_notes() -> List[Dict]:
             {
                 "id": r[0],
                 "title": r[1] or "",
-                "content": r[2] or "",
+                "content": decode_content(r[2], conn),
                 "created_at": r[3],
                 "updated_at": r[4],
             }
@@ -163,11 +392,372 @@ def get_notes() -> List[Dict]:
     return notes
 
 
+def iter_notes(batch_size: int = 500,
+               since: Optional[str] = None) -> Iterator[Dict]:
+    """Like get_notes(), but yields rows as they are read.
+
+    Only `batch_size` rows are in memory at a time, which keeps
+    exporting or searching a large database cheap. With `since`, only
+    notes saved at or after that updated_at are read.
+    """
+    query = ("SELECT id, title, content, created_at, updated_at"
+             " FROM notes")
+    params = []
+    if since is not None:
+        query += " WHERE updated_at >= ?"
+        params.append(since)
+    with get_read_connection() as conn:
+        c = conn.cursor()
+        c.execute(query + " ORDER BY updated_at DESC, id DESC", params)
+        while True:
+            rows = c.fetchmany(batch_size)
+            if not rows:
+                break
+            for r in rows:
+                yield {
+                    "id": r[0],
+                    "title": r[1] or "",
+                    "content": decode_content(r[2], conn),
+                    "created_at": r[3],
+                    "updated_at": r[4],
+                }
+
+
+PAGE_SIZE = 100
+
+
+@traced()
+def get_notes_page(limit: int = PAGE_SIZE,
+                   after: Optional[Tuple[str, int]] = None,
+                   with_content: bool = False) -> List[Dict]:
+    """Return up to `limit` notes, in get_notes() order, after a cursor.
+
+    `after` is the (updated_at, id) of the last note of the previous
+    page (None for the first page). Each page is a range scan of the
+    updated_at index, so its cost depends on `limit`, not on how many
+    notes there are or how deep the page is.
+    Without `with_content` notes have no "content" key; fetch it with
+    get_note() when the note is opened.
+    """
+    columns = "id, title, created_at, updated_at, version"
+    if with_content:
+        columns += ", content"
+    query = f"SELECT {columns} FROM notes"
+    params: list = []
+    if after is not None:
+        query += " WHERE (updated_at, id) < (?, ?)"
+        params += list(after)
+    query += " ORDER BY updated_at DESC, id DESC LIMIT ?"
+    params.append(limit)
+
+    with get_read_connection() as conn:
+        rows = conn.execute(query, params).fetchall()
+    notes = []
+    for r in rows:
+        note = {"id": r[0], "title": r[1] or "",
+                "created_at": r[2], "updated_at": r[3], "version": r[4]}
+        if with_content:
+            note["content"] = decode_content(r[5], conn)
+        notes.append(note)
+    return notes
+
+
+def page_cursor(note: Dict) -> Tuple[str, int]:
+    """The `after` value that continues a listing past `note`."""
+    return (note["updated_at"], note["id"])
+
+
+def get_note(note_id: int) -> Optional[Dict]:
+    """Return one note (with content), or None if it doesn't exist."""
+    with get_read_connection() as conn:
+        r = conn.execute(
+            "SELECT id, title, content, created_at, updated_at, version"
+            " FROM notes WHERE id = ?",
+            (note_id,),
+        ).fetchone()
+    if r is None:
+        return None
+    return {"id": r[0], "title": r[1] or "", "content": decode_content(r[2], conn),
+            "created_at": r[3], "updated_at": r[4], "version": r[5]}
+
+
+def count_notes() -> int:
+    with get_read_connection() as conn:
+        return conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+
+def latest_update() -> Optional[str]:
+    """The newest updated_at of all notes (None when there are none)."""
+    with get_read_connection() as conn:
+        return conn.execute("SELECT MAX(updated_at) FROM notes").fetchone()[0]
+
+
+def get_notes_changed_since(since: Optional[str]) -> List[Dict]:
+    """Notes (without content) saved at or after `since`, newest first.
+
+    updated_at has one-second resolution, so notes saved in the second
+    of `since` are returned again; callers compare with what they have.
+    """
+    with get_read_connection() as conn:
+        rows = conn.execute(
+            "SELECT id, title, created_at, updated_at, version FROM notes"
+            " WHERE updated_at >= ? ORDER BY updated_at DESC, id DESC",
+            (since or "",)).fetchall()
+    return [{"id": r[0], "title": r[1] or "", "created_at": r[2],
+             "updated_at": r[3], "version": r[4]} for r in rows]
+
+
+def get_existing_ids(note_ids: Iterable[int]) -> set:
+    """The ids in `note_ids` that still have a note."""
+    note_ids = list(note_ids)
+    found = set()
+    with get_read_connection() as conn:
+        for start in range(0, len(note_ids), 900):
+            batch = note_ids[start:start + 900]
+            found.update(r[0] for r in conn.execute(
+                "SELECT id FROM notes WHERE id IN"
+                f" ({', '.join('?' * len(batch))})", batch))
+    return found
+
+
 def delete_note(note_id: int) -> None:
     """Delete a note by id."""
     with get_connection() as conn:
         c = conn.cursor()
+        row = c.execute(
+            "SELECT content FROM notes WHERE id = ?", (note_id,)).fetchone()
+        if row is not None:
+            chunk_store.release(conn, row[0])
         c.execute("DELETE FROM notes WHERE id = ?", (note_id,))
+        c.execute("DELETE FROM editor_state WHERE note_id = ?", (note_id,))
+        c.execute("DELETE FROM note_tags WHERE note_id = ?", (note_id,))
+        _prune_tags(c)
+        conn.commit()
+
+
+# --- Tags ---
+
+TAG_PATTERN = re.compile(r"(?<![\w#&])#(\w[\w/-]*)")
+
+
+def parse_tags(text: str) -> set:
+    """Return the #tags in `text`, lower-cased and without the '#'."""
+    return {tag.lower().rstrip("/-") for tag in TAG_PATTERN.findall(text)}
+
+
+def _prune_tags(c) -> None:
+    """Forget tags no note uses any more."""
+    c.execute(
+        "DELETE FROM tags WHERE NOT EXISTS"
+        " (SELECT 1 FROM note_tags WHERE tag_id = tags.id)"
+    )
+
+
+def set_note_tags(note_id: int, tags: Iterable[str]) -> bool:
+    """Make `tags` the note's tags, touching only the ones that changed.
+
+    Returns True if any tag was added or removed.
+    """
+    with get_connection() as conn:
+        changed = _set_note_tags(conn.cursor(), note_id, set(tags))
+        if changed:
+            conn.commit()
+    return changed
+
+
+def _set_note_tags(c, note_id: int, tags: set) -> bool:
+    c.execute(
+        "SELECT t.name, t.id FROM note_tags nt"
+        " JOIN tags t ON t.id = nt.tag_id WHERE nt.note_id = ?",
+        (note_id,),
+    )
+    current = dict(c.fetchall())
+    added = tags - current.keys()
+    removed = current.keys() - tags
+    if not added and not removed:
+        return False
+
+    for name in added:
+        c.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (name,))
+        c.execute(
+            "INSERT OR IGNORE INTO note_tags (note_id, tag_id)"
+            " SELECT ?, id FROM tags WHERE name = ?",
+            (note_id, name),
+        )
+    if removed:
+        c.executemany(
+            "DELETE FROM note_tags WHERE note_id = ? AND tag_id = ?",
+            ((note_id, current[name]) for name in removed),
+        )
+        _prune_tags(c)
+    return True
+
+
+def get_all_titles() -> List[Tuple[int, str]]:
+    """(id, title) of every note, least recently updated first.
+
+    Never reads content.
+    """
+    with get_read_connection() as conn:
+        return [(r[0], r[1] or "") for r in conn.execute(
+            "SELECT id, title FROM notes ORDER BY updated_at, id")]
+
+
+def get_all_tags() -> List[Tuple[str, int]]:
+    """Return (tag, number of notes) pairs, most used first."""
+    with get_read_connection() as conn:
+        return conn.execute(
+            "SELECT t.name, COUNT(*) FROM tags t"
+            " JOIN note_tags nt ON nt.tag_id = t.id"
+            " GROUP BY t.id ORDER BY COUNT(*) DESC, t.name"
+        ).fetchall()
+
+
+def get_notes_by_tags(all_of: Iterable[str] = (),
+                      any_of: Iterable[str] = (),
+                      with_content: bool = True) -> List[Dict]:
+    """Notes having every tag in `all_of` and at least one in `any_of`.
+
+    Answered from the tag index alone; ordered like get_notes().
+    Without `with_content` the (large) content column is not read.
+    """
+    all_of = sorted({t.lower().lstrip("#") for t in all_of})
+    any_of = sorted({t.lower().lstrip("#") for t in any_of})
+    where, params = [], []
+    if all_of:
+        marks = ", ".join("?" * len(all_of))
+        where.append(
+            "id IN (SELECT nt.note_id FROM note_tags nt"
+            " JOIN tags t ON t.id = nt.tag_id"
+            f" WHERE t.name IN ({marks})"
+            " GROUP BY nt.note_id HAVING COUNT(*) = ?)")
+        params += [*all_of, len(all_of)]
+    if any_of:
+        marks = ", ".join("?" * len(any_of))
+        where.append(
+            "id IN (SELECT nt.note_id FROM note_tags nt"
+            " JOIN tags t ON t.id = nt.tag_id"
+            f" WHERE t.name IN ({marks}))")
+        params += any_of
+
+    columns = "id, title, content, created_at, updated_at, version"\
+        if with_content else "id, title, '', created_at, updated_at, version"
+    with get_read_connection() as conn:
+        rows = conn.execute(
+            f"SELECT {columns} FROM notes"
+            f" {'WHERE ' + ' AND '.join(where) if where else ''}"
+            " ORDER BY updated_at DESC, id DESC",
+            params,
+        ).fetchall()
+    return [
+        {
+            "id": r[0],
+            "title": r[1] or "",
+            "content": decode_content(r[2], conn),
+            "created_at": r[3],
+            "updated_at": r[4],
+            "version": r[5],
+        }
+        for r in rows
+    ]
+
+
+def collect_chunk_garbage() -> int:
+    """Repair chunk reference counts and delete unused chunks."""
+    with get_connection() as conn:
+        removed = chunk_store.collect_garbage(conn)
+        conn.commit()
+    return removed
+
+
+def vacuum() -> None:
+    """Rebuild the database file, returning the space of deleted notes."""
+    conn = get_connection()
+    try:
+        # Also converts older databases (see maintenance.py)
+        conn.execute(
+            f"PRAGMA auto_vacuum = {maintenance.AUTO_VACUUM_INCREMENTAL}")
+        conn.execute("VACUUM")
+    finally:
+        conn.close()
+
+
+def recompact_notes(batch_size: int = 100) -> Tuple[int, int]:
+    """Rewrite stored bodies in the current format (see COMPRESS_NOTES).
+
+    Compresses long TEXT bodies, or decompresses BLOBs when compression
+    is off. Works in small transactions so it can run in the background
+    while the app saves; a note saved meanwhile is left alone, and
+    updated_at is not touched. Space is only returned to the disk by
+    vacuum().
+    Returns (notes rewritten, bytes saved).
+    """
+    if COMPRESS_NOTES:
+        where = "typeof(content) = 'text' AND length(content) >= ?"
+        params = [COMPRESS_MIN_CHARS]
+    else:
+        # Chunked bodies keep their format; only their chunks are packed
+        where = "typeof(content) = 'blob' AND substr(content, 1, 1) != ?"
+        params = [bytes([FORMAT_CHUNKED])]
+    rewritten = saved = 0
+    last_id = 0
+    while True:
+        with get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT id, content FROM notes WHERE id > ? AND {where}"
+                " ORDER BY id LIMIT ?",
+                [last_id, *params, batch_size],
+            ).fetchall()
+            if not rows:
+                break
+            last_id = rows[-1][0]
+            updates = []
+            for note_id, value in rows:
+                new = encode_content(decode_content(value))
+                if type(new) is not type(value):
+                    updates.append((new, note_id, value))
+                    saved += _stored_size(value) - _stored_size(new)
+            c = conn.cursor()
+            c.executemany(
+                "UPDATE notes SET content = ? WHERE id = ? AND content = ?",
+                updates)
+            rewritten += max(c.rowcount, 0)
+            conn.commit()
+    return rewritten, saved
+
+
+def save_editor_state(note_id: int, cursor: str, scroll: float) -> None:
+    """Remember the cursor index and scroll fraction of a note."""
+    with get_connection() as conn:
+        conn.execute(
+            "INSERT OR REPLACE INTO editor_state (note_id, cursor, scroll)"
+            " VALUES (?, ?, ?)",
+            (note_id, cursor, scroll),
+        )
+        conn.commit()
+
+
+def get_editor_state(note_id: int) -> Optional[Dict]:
+    """Return {"cursor", "scroll"} saved for a note, or None."""
+    with get_read_connection() as conn:
+        row = conn.execute(
+            "SELECT cursor, scroll FROM editor_state WHERE note_id = ?",
+            (note_id,),
+        ).fetchone()
+    if row is None:
+        return None
+    return {"cursor": row[0], "scroll": row[1]}
+
+
+def get_meta(key: str, default: Optional[str] = None) -> Optional[str]:
+    """A value from the `meta` table (see maintenance.py)."""
+    with get_connection() as conn:
+        return maintenance.get_meta(conn, key, default)
+
+
+def set_meta(key: str, value) -> None:
+    with get_connection() as conn:
+        maintenance.set_meta(conn, key, value)
         conn.commit()
 
 
@@ -186,14 +776,8 @@ def migrate_from_json(json_path: str = "notes.json") -> int:
     with open(json_path, "r", encoding="utf-8") as f:
         data = json.load(f)
 
-    count = 0
-    for item in data:
-        title = item.get("title", "")
-        content = item.get("content", "")
-        add_note(title, content)
-        count += 1
-
-    return count
+    return add_notes((item.get("title", ""), item.get("content", ""))
+                     for item in data)
 
 
 def set_recovery_key(code: str):
@@ -241,7 +825,7 @@ def _center_window(w, parent=None):
     w.wm_deiconify()  # Become visible at the desired location
 
 
-def center_window(w: ctk.CTk | ctk.CTkToplevel, wdth, hght, offsetx=0, offsety=0):
+def center_window(w: "ctk.CTk | ctk.CTkToplevel", wdth, hght, offsetx=0, offsety=0):
     """Center any CTk/Tk window on the screen."""
     w.update_idletasks()  # Ensure geometry info is accurate
     w.wm_withdraw()
@@ -265,6 +849,7 @@ def center_window(w: ctk.CTk | ctk.CTkToplevel, wdth, hght, offsetx=0, offsety=0
 
 def askstring(title="Input", prompt="Enter value:", show=None, placeholder="", width=300, height=150):
     """Universal CTk askstring dialog. Returns str or None."""
+    import customtkinter as ctk
 
     # Root hidden window
     root = ctk.CTk()
@@ -329,6 +914,7 @@ def count_words_in_string(text):
 
 
 def has_internet():
+    import requests
     try:
         requests.get("https://www.google.com", timeout=3)
         return True
@@ -336,6 +922,7 @@ def has_internet():
         return False
 
 def connected_to_server(url):
+    import requests
     try:
         logging.info(f"Attempting to connect to server at '{url}'")
         response = requests.get(url, timeout=60)
@@ -0,0 +1,33 @@
+# conftest.py
+"""Shared test setup.
+
+Every data path in `scripts` lives under %APPDATA%, so it is pointed at
+a throwaway folder before anything from `scripts` is imported. Tests
+that touch the database take the `db` fixture: a fresh, empty database
+per test.
+
+    python -m pytest -q tests
+"""
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ["APPDATA"] = tempfile.mkdtemp(prefix="bmtb_tests_")
+
+from scripts import utils  # noqa: E402
+from scripts.constants import bootstrap  # noqa: E402
+
+bootstrap(with_logging=False)
+
+
+@pytest.fixture
+def db(tmp_path, monkeypatch):
+    """`scripts.utils`, working on an empty database of its own."""
+    monkeypatch.setattr(utils, "NOTES_DB", tmp_path / "notes.db")
+    utils.create_table()
+    yield utils
+    utils.close_read_connection()
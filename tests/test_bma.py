@@ -0,0 +1,50 @@
+# test_bma.py
+"""Handing activities to BMA, against benchmarks/stub_bma.py."""
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from scripts.bma_express import ActivitiesAPI
+
+STUB = Path(__file__).resolve().parent.parent / "benchmarks" / "stub_bma.py"
+
+
+@pytest.fixture
+def received(tmp_path, monkeypatch):
+    out = tmp_path / "activities.jsonl"
+    monkeypatch.setenv("STUB_BMA_FILE", str(out))
+
+    def read():
+        with open(out, "r", encoding="utf-8") as f:
+            return [json.loads(line)["activity"] for line in f]
+    return read
+
+
+def api():
+    return ActivitiesAPI(bma_command=[sys.executable, str(STUB)])
+
+
+def test_activities_are_added_in_batches(received, monkeypatch):
+    bma = api()
+    calls = []
+    run_add = bma._run_add
+    monkeypatch.setattr(bma, "_run_add",
+                        lambda batch: calls.append(batch) or run_add(batch))
+    assert bma.add_activities(["one", "two", "three"]) == 3
+    assert calls == [["one", "two", "three"]]
+    assert received() == ["one", "two", "three"]
+
+
+def test_batches_respect_max_batch(received):
+    bma = ActivitiesAPI(bma_command=[sys.executable, str(STUB)], max_batch=2)
+    assert list(bma._batches(["one", "two", "three"]))\
+        == [["one", "two"], ["three"]]
+    assert bma.add_activities(["one", "two", "three"]) == 3
+    assert received() == ["one", "two", "three"]
+
+
+def test_missing_bma_adds_nothing():
+    bma = ActivitiesAPI(bma_command=["/nonexistent/Activities.exe"])
+    assert bma.add_activities(["one"]) == 0
@@ -0,0 +1,102 @@
+# test_chunk_store.py
+"""Chunked note bodies: round trips, sharing, reference counts, GC."""
+import random
+import sqlite3
+from collections import Counter
+
+from scripts import chunk_store
+
+
+def make_text(seed, lines=3000) -> str:
+    rng = random.Random(seed)
+    return "".join(f"line {i}: {rng.random():.12f}\n" for i in range(lines))
+
+
+def stored_refs(db) -> dict:
+    """Chunk id -> refs, as stored."""
+    with sqlite3.connect(db.NOTES_DB) as conn:
+        return dict(conn.execute("SELECT id, refs FROM chunks"))
+
+
+def counted_refs(db) -> dict:
+    """Chunk id -> how many times the notes actually use it."""
+    counts = Counter()
+    with sqlite3.connect(db.NOTES_DB) as conn:
+        for (value,) in conn.execute("SELECT content FROM notes"):
+            if chunk_store.is_chunked(value):
+                counts.update(chunk_store._ids(value))
+    return dict(counts)
+
+
+def test_chunk_text_round_trip_and_limits():
+    text = make_text(1) + "x" * (3 * chunk_store.MAX_CHUNK_CHARS) + "\nend"
+    chunks = chunk_store.chunk_text(text)
+    assert "".join(chunks) == text
+    assert all(len(c) <= chunk_store.MAX_CHUNK_CHARS for c in chunks)
+
+
+def test_chunk_boundaries_only_move_near_an_edit():
+    text = make_text(2)
+    lines = text.splitlines(keepends=True)
+    lines[1500] = "edited\n"
+    before = chunk_store.chunk_text(text)
+    after = chunk_store.chunk_text("".join(lines))
+    assert len(set(before) - set(after)) <= 2
+
+
+def test_long_note_round_trip(db):
+    text = make_text(3)
+    assert len(text) >= db.CHUNK_MIN_CHARS
+    note_id = db.save_note("big", text)
+    assert db.get_note(note_id)["content"] == text
+    assert stored_refs(db) == counted_refs(db)
+
+
+def test_shared_chunks_survive_deleting_one_note(db):
+    text = make_text(4)
+    first = db.save_note("a", text)
+    second = db.save_note("b", text + "a different ending\n")
+    shared = set(counted_refs(db))
+    db.delete_note(first)
+    assert db.get_note(second)["content"] == text + "a different ending\n"
+    assert stored_refs(db) == counted_refs(db)
+    assert set(stored_refs(db)) <= shared
+
+
+def test_refcounts_follow_updates_and_deletes(db):
+    text = make_text(5)
+    note_id = db.save_note("a", text)
+    other = db.save_note("b", text)
+    lines = text.splitlines(keepends=True)
+    lines[10] = "changed\n"
+    db.save_note("a", "".join(lines), note_id)
+    assert stored_refs(db) == counted_refs(db)
+
+    # Shrinking below CHUNK_MIN_CHARS releases the chunks
+    db.save_note("b", "short now", other)
+    assert stored_refs(db) == counted_refs(db)
+    db.delete_note(note_id)
+    assert stored_refs(db) == {}
+
+
+def test_update_writes_only_changed_chunks(db):
+    text = make_text(6)
+    note_id = db.save_note("a", text)
+    lines = text.splitlines(keepends=True)
+    lines[1000] = "changed\n"
+    chunk_store.STATS.clear()
+    db.save_note("a", "".join(lines), note_id)
+    assert chunk_store.STATS["chunks_written"] <= 2
+    assert chunk_store.STATS["refs_updated"] <= 4
+
+
+def test_gc_removes_orphans_and_repairs_counts(db):
+    note_id = db.save_note("a", make_text(7))
+    with sqlite3.connect(db.NOTES_DB) as conn:
+        conn.execute("INSERT INTO chunks (hash, data, refs)"
+                     " VALUES (x'00', x'00', 1)")
+        conn.execute("UPDATE chunks SET refs = refs + 5"
+                     " WHERE id = (SELECT MIN(id) FROM chunks)")
+    assert db.collect_chunk_garbage() == 1
+    assert stored_refs(db) == counted_refs(db)
+    assert db.get_note(note_id)["content"] == make_text(7)
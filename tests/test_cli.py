@@ -0,0 +1,77 @@
+# test_cli.py
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from scripts import cli
+from scripts.licensing import MAX_FREEMIUM_NOTES
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def run(capsys, *argv):
+    assert cli.main(list(argv)) == 0
+    return capsys.readouterr().out.splitlines()
+
+
+def test_imported_notes_are_tagged(db, tmp_path, capsys):
+    path = tmp_path / "notes.jsonl"
+    path.write_text("\n".join(json.dumps(note) for note in [
+        {"title": "Sprint", "content": "#work plan the sprint"},
+        {"title": "Bread", "content": "#home #shopping flour"},
+        {"title": "Review", "content": "#work review PRs"},
+    ]), encoding="utf-8")
+    run(capsys, "import", str(path), "--batch", "2")
+
+    listed = run(capsys, "list", "--tag", "work")
+    assert sorted(line.split("\t")[2] for line in listed)\
+        == ["Review", "Sprint"]
+    assert run(capsys, "tags") == ["2\t#work", "1\t#home", "1\t#shopping"]
+
+
+def test_add_and_export_round_trip(db, capsys):
+    note_id = int(run(capsys, "add", "Idea", "  call Ada #todo ")[0])
+    exported = [json.loads(line) for line in run(capsys, "export")]
+    assert [(n["id"], n["title"], n["content"]) for n in exported]\
+        == [(note_id, "Idea", "call Ada #todo")]
+    assert json.loads(run(capsys, "tags", "--json")[0])\
+        == {"tag": "todo", "notes": 1}
+
+
+def test_runs_without_tk(tmp_path):
+    code = ("import sys; from scripts import cli; cli.main(['list']);"
+            " print(sorted(m for m in sys.modules if 'tkinter' in m))")
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True,
+        text=True, env={**os.environ, "APPDATA": str(tmp_path)}, check=True)
+    assert out.stdout.strip() == "[]"
+
+
+def test_add_stops_at_the_free_limit(db, capsys):
+    for number in range(MAX_FREEMIUM_NOTES):
+        run(capsys, "add", f"Note {number}", "text")
+    assert cli.main(["add", "One more", "text"]) == 1
+    assert "free version" in capsys.readouterr().err
+    assert db.count_notes() == MAX_FREEMIUM_NOTES
+
+
+def test_import_stops_at_the_free_limit(db, tmp_path, capsys):
+    db.add_note("Existing", "text")
+    path = tmp_path / "notes.json"
+    path.write_text(json.dumps([{"title": f"Note {number}", "content": "x"}
+                                for number in range(7)]), encoding="utf-8")
+    assert cli.main(["import", str(path), "--batch", "3"]) == 1
+    assert "Imported 4 notes." in capsys.readouterr().err
+    assert db.count_notes() == MAX_FREEMIUM_NOTES
+
+
+def test_licensed_import_has_no_limit(db, tmp_path, capsys, monkeypatch):
+    monkeypatch.setattr(cli, "has_valid_license", lambda: True)
+    path = tmp_path / "notes.json"
+    path.write_text(json.dumps([{"title": f"Note {number}", "content": "x"}
+                                for number in range(7)]), encoding="utf-8")
+    run(capsys, "import", str(path))
+    run(capsys, "add", "One more", "text")
+    assert db.count_notes() == 8
@@ -0,0 +1,47 @@
+# test_display_titles.py
+import types
+
+from scripts.display_titles import (ELLIPSIS, DisplayTitles, fit_text,
+                                    graphemes)
+
+
+def width(text):
+    """A fake font: 10 px per character, 20 for wide ones."""
+    return sum(20 if ord(c) > 0x2e80 else 10 for c in text)
+
+
+def test_graphemes_keep_clusters_together():
+    family = "\U0001f468\u200d\U0001f469\u200d\U0001f467"
+    flag = "\U0001f1eb\U0001f1f7"
+    thumbs = "\U0001f44d\U0001f3fd"
+    assert graphemes(f"e\u0301a{family}{flag}{flag}{thumbs}") == [
+        "e\u0301", "a", family, flag, flag, thumbs]
+
+
+def test_fit_text():
+    assert fit_text("short", 100, width) == "short"
+    assert fit_text("a long title here", 100, width) == "a long ti" + ELLIPSIS
+    # Wide characters take more room, and no trailing space is kept
+    assert fit_text("日本語のノート", 50, width) == "日本" + ELLIPSIS
+    assert fit_text("ab cd", 40, width) == "ab" + ELLIPSIS
+
+
+def test_fit_text_never_splits_a_cluster():
+    accented = "e\u0301" * 20
+    fitted = fit_text(accented, 60, width)
+    assert fitted.endswith("́" + ELLIPSIS)
+
+
+def test_cached_per_note_until_the_title_changes():
+    calls = []
+    font = types.SimpleNamespace(
+        measure=lambda text: calls.append(text) or width(text))
+    titles = DisplayTitles(font, 100)
+    assert titles.get(1, "title") == "title"
+    measured = len(calls)
+    titles.get(1, "title")
+    assert len(calls) == measured
+    assert titles.get(1, "a much longer title") == "a much lo" + ELLIPSIS
+    titles.discard(1)
+    titles.get(1, "title")
+    assert len(calls) > measured
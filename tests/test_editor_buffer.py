@@ -0,0 +1,100 @@
+# test_editor_buffer.py
+import random
+
+from scripts.editor_buffer import LineBuffer, TextChange
+from scripts.cipher import SimpleCipher
+
+encrypt = SimpleCipher().encrypt
+
+
+def replace(buffer, first, old_last, new_lines):
+    buffer.apply(TextChange("insert", first, old_last, new_lines))
+
+
+def test_edits_keep_lines_and_dirty_flag():
+    buffer = LineBuffer("one\ntwo\nthree")
+    assert not buffer.dirty
+    replace(buffer, 2, 2, ["2", "2b"])
+    assert buffer.text() == "one\n2\n2b\nthree"
+    assert buffer.edited == (2, 3)
+    buffer.mark_saved()
+    assert not buffer.dirty
+
+
+def test_edited_range_follows_lines_moved_by_later_edits():
+    buffer = LineBuffer("\n".join("abcdefgh"))
+    replace(buffer, 6, 6, ["F"])
+    replace(buffer, 2, 3, ["B"])  # two lines become one: F moves up
+    assert buffer.edited == (2, 5)
+
+
+def test_encoded_matches_encrypting_the_stripped_text():
+    rng = random.Random(1)
+    pieces = ["", " ", "\t", "word", "  two words ", "é"]
+    for _ in range(200):
+        buffer = LineBuffer("\n".join(
+            rng.choice(pieces) for _ in range(rng.randint(1, 20))))
+        for _ in range(10):
+            first = rng.randint(1, len(buffer))
+            old_last = rng.randint(first, min(len(buffer), first + 2))
+            replace(buffer, first, old_last,
+                    [rng.choice(pieces) for _ in range(rng.randint(1, 3))])
+            if rng.random() < 0.5:
+                assert buffer.encoded(encrypt)\
+                    == encrypt(buffer.text().strip())
+                buffer.mark_saved()
+
+
+def test_encoded_only_encrypts_edited_lines():
+    calls = []
+
+    def counting(text):
+        calls.append(text)
+        return encrypt(text)
+
+    buffer = LineBuffer("\n".join(f"line {i}" for i in range(1000)))
+    buffer.encoded(counting)
+    buffer.mark_saved()
+    calls.clear()
+    replace(buffer, 500, 500, ["edited"])
+    buffer.encoded(counting)
+    # The edited line, the newline, and the first and last lines
+    assert sorted(calls) == sorted(["edited", "\n", "line 0", "line 999"])
+
+
+class DisabledText:
+    """A tk.Text in state="disabled", as far as TextWatcher can tell."""
+
+    def __init__(self):
+        self.tk = self
+        self.calls = []
+
+    def __str__(self):
+        return ".text"
+
+    def createcommand(self, name, func):
+        self.dispatch = func
+
+    def call(self, *args):
+        if len(args) == 1:
+            args = args[0]
+        if args[0] == "rename":
+            return ""
+        self.calls.append(args[1:])
+        return "disabled" if args[1:] == ("cget", "-state") else ""
+
+
+def test_edits_of_a_disabled_widget_are_not_reported():
+    from scripts.editor_buffer import TextWatcher
+
+    widget = DisabledText()
+    watcher = TextWatcher(widget)
+    buffer = LineBuffer("one\ntwo")
+    watcher.add_listener(buffer.apply)
+    widget.dispatch("delete", "insert-1c")  # Backspace
+    widget.dispatch("insert", "insert", "pasted")
+    widget.dispatch("replace", "1.0", "1.3", "x")
+    assert buffer.text() == "one\ntwo" and not buffer.dirty
+    # Passed on to Tk as they were, which ignores them
+    assert ("delete", "insert-1c") in widget.calls
+    assert ("insert", "insert", "pasted") in widget.calls
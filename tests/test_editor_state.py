@@ -0,0 +1,86 @@
+# test_editor_state.py
+from scripts import editor_state
+from scripts.editor_buffer import TextChange
+from scripts.editor_state import (EditorState, EditorStateCache,
+                                  UndoStack)
+
+
+class Widget:
+    """Records what an undo/redo does to the text widget."""
+
+    def __init__(self):
+        self.calls = []
+
+    def insert(self, index, text):
+        self.calls.append(("insert", index, text))
+
+    def delete(self, index, end):
+        self.calls.append(("delete", index, end))
+
+    def mark_set(self, mark, index):
+        pass
+
+    def see(self, index):
+        pass
+
+
+def typed(index, end, text):
+    return TextChange("insert", 1, 1, [], index=index, end=end, text=text)
+
+
+def test_cache_evicts_least_recently_used():
+    cache = EditorStateCache(capacity=2)
+    cache.put(1, EditorState("1.0"))
+    cache.put(2, EditorState("2.0"))
+    cache.get(1)
+    cache.put(3, EditorState("3.0"))
+    assert cache.get(2) is None
+    assert cache.get(1).cursor == "1.0" and cache.get(3).cursor == "3.0"
+    cache.discard(1)
+    assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_typing_is_undone_a_word_at_a_time():
+    stack = UndoStack()
+    for i, char in enumerate("ab cd"):
+        stack.record(typed(f"1.{i}", f"1.{i + 1}", char))
+    assert len(stack.groups) == 2  # "ab", then " cd"
+    widget = Widget()
+    assert stack.undo(widget)
+    assert widget.calls == [("delete", "1.4", "1.5"),
+                            ("delete", "1.3", "1.4"),
+                            ("delete", "1.2", "1.3")]
+    widget.calls.clear()
+    assert stack.redo(widget)
+    assert [c[2] for c in widget.calls] == [" ", "c", "d"]
+
+
+def test_pause_or_new_line_starts_a_new_step(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(editor_state.time, "monotonic", lambda: now[0])
+    stack = UndoStack()
+    stack.record(typed("1.0", "1.1", "a"))
+    now[0] += editor_state.GROUP_PAUSE_SECONDS + 1
+    stack.record(typed("1.1", "1.2", "b"))
+    stack.record(typed("1.2", "2.0", "\n"))
+    assert len(stack.groups) == 3
+
+
+def test_new_edit_clears_redo_and_reset_clears_all():
+    stack = UndoStack()
+    stack.record(typed("1.0", "1.1", "a"))
+    stack.undo(Widget())
+    stack.record(typed("1.0", "1.1", "b"))
+    assert not stack.redo_groups
+    stack.record(TextChange("reset", 1, -1, [""]))
+    assert not stack.groups and not stack.undo(Widget())
+
+
+def test_history_is_bounded(monkeypatch):
+    monkeypatch.setattr(editor_state, "MAX_UNDO_GROUPS", 5)
+    stack = UndoStack()
+    for i in range(10):
+        stack.record(typed(f"{i + 1}.0", f"{i + 2}.0", "\n"))
+    assert len(stack.groups) == 5
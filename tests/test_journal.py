@@ -0,0 +1,117 @@
+# test_journal.py
+"""Unsaved edits written to the journal come back after a "crash"."""
+import os
+import time
+
+from scripts.editor_buffer import TextChange
+from scripts.journal import EditJournal, journal_file
+from scripts.cipher import SimpleCipher
+
+cipher = SimpleCipher()
+
+
+def journal_at(path):
+    return EditJournal(path, encrypt=cipher.encrypt,
+                       decrypt=cipher.decrypt, flush_interval=0)
+
+
+def edit(first, old_last, *lines):
+    return TextChange("insert", first, old_last, list(lines))
+
+
+def test_edits_after_a_save_are_recovered(tmp_path):
+    saved = {7: ("Title", "one\ntwo")}
+    journal = journal_at(tmp_path / "edits.journal")
+    journal.checkpoint(7, "Title", "\none\ntwo\n")
+    journal.record(edit(3, 3, "TWO", "three"))
+    journal.record_title("New title")
+    journal.close()  # as if the app died here
+
+    journal = journal_at(tmp_path / "edits.journal")
+    assert list(journal.recover(saved.get)) == [
+        (7, "New title", "one\nTWO\nthree")]
+    journal.close()
+    assert list(journal_at(tmp_path / "edits.journal").recover(
+        saved.get)) == []
+
+
+def test_nothing_to_recover_after_a_checkpoint(tmp_path):
+    journal = journal_at(tmp_path / "edits.journal")
+    journal.checkpoint(7, "Title", "one")
+    journal.record(edit(1, 1, "ONE"))
+    journal.checkpoint(7, "Title", "ONE")  # saved
+    journal.close()
+    saved = {7: ("Title", "ONE")}
+    assert list(journal_at(tmp_path / "edits.journal").recover(
+        saved.get)) == []
+
+
+def test_outdated_or_deleted_notes_are_skipped(tmp_path):
+    journal = journal_at(tmp_path / "edits.journal")
+    journal.checkpoint(7, "Title", "one")
+    journal.record(edit(1, 1, "ONE"))
+    journal.close()
+    elsewhere = {7: ("Title", "saved by another window")}
+    assert list(journal_at(tmp_path / "edits.journal").recover(
+        elsewhere.get)) == []
+
+
+def test_a_record_cut_short_ends_the_replay(tmp_path):
+    path = tmp_path / "edits.journal"
+    journal = journal_at(path)
+    journal.checkpoint(7, "Title", "one")
+    journal.record(edit(1, 1, "ONE"))
+    journal.close()
+    with open(path, "a", encoding="utf-8") as f:
+        f.write('{"n": 7, "f": 1, "o"')
+    saved = {7: ("Title", "one")}
+    assert list(journal_at(path).recover(saved.get)) == [
+        (7, "Title", "ONE")]
+
+
+def test_lines_are_stored_encrypted(tmp_path):
+    path = tmp_path / "edits.journal"
+    journal = journal_at(path)
+    journal.checkpoint(7, "Title", "one")
+    journal.record(edit(1, 1, "secret words"))
+    journal.close()
+    assert "secret" not in path.read_text(encoding="utf-8")
+
+
+def wait_written(path):
+    for _ in range(200):
+        if path.exists() and path.stat().st_size:
+            return
+        time.sleep(0.01)
+    raise AssertionError(f"{path} never written")
+
+
+def test_each_window_recovers_only_journals_nobody_holds(tmp_path):
+    saved = {7: ("Title", "one"), 8: ("Other", "two")}
+    crashed = journal_at(tmp_path / "edits.1.journal")
+    crashed.checkpoint(8, "Other", "two")
+    crashed.record(edit(1, 1, "TWO"))
+    crashed.close()
+    running = journal_at(tmp_path / "edits.2.journal")
+    running.checkpoint(7, "Title", "one")
+    running.record(edit(1, 1, "ONE"))
+    wait_written(running.path)
+
+    starting = journal_at(tmp_path / "edits.3.journal")
+    assert list(starting.recover(saved.get)) == [(8, "Other", "TWO")]
+    assert not crashed.path.exists()
+    running.close()
+    assert list(starting.recover(saved.get)) == [(7, "Title", "ONE")]
+
+
+def test_a_clean_close_leaves_no_journal(tmp_path):
+    journal = journal_at(tmp_path / "edits.1.journal")
+    journal.checkpoint(7, "Title", "one")
+    journal.record(edit(1, 1, "ONE"))
+    journal.checkpoint(7, "Title", "ONE")  # saved
+    journal.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_journal_file_is_per_process():
+    assert journal_file().name == f"edits.{os.getpid()}.journal"
@@ -0,0 +1,43 @@
+# test_logging_pipeline.py
+import json
+import logging
+
+import pytest
+
+from scripts.logging_pipeline import start_logging, stop_logging
+
+
+@pytest.fixture
+def log_to(tmp_path):
+    path = tmp_path / "app.log"
+    yield path
+    stop_logging()
+
+
+def log_an_exception():
+    try:
+        {}["missing"]
+    except KeyError:
+        logging.exception("lookup %s failed", "x")
+
+
+def test_json_records_keep_the_exception(log_to):
+    start_logging(log_to, json_records=True)
+    logging.info("hello %s", "world")
+    log_an_exception()
+    stop_logging()
+    first, second = (json.loads(line) for line in
+                     log_to.read_text(encoding="utf-8").splitlines())
+    assert first["message"] == "hello world" and "exception" not in first
+    assert second["message"] == "lookup x failed"
+    assert second["level"] == "ERROR"
+    assert "KeyError: 'missing'" in second["exception"]
+
+
+def test_text_records_still_show_the_traceback(log_to):
+    start_logging(log_to, json_records=False)
+    log_an_exception()
+    stop_logging()
+    text = log_to.read_text(encoding="utf-8")
+    assert "ERROR - lookup x failed\nTraceback" in text
+    assert "KeyError: 'missing'" in text
@@ -0,0 +1,68 @@
+# test_maintenance.py
+import os
+import sqlite3
+
+from scripts import maintenance
+
+
+def make_old_db(path, rows=2000):
+    """A database made before incremental auto-vacuum, with free pages."""
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE notes (id INTEGER PRIMARY KEY, body)")
+        conn.executemany("INSERT INTO notes (body) VALUES (?)",
+                         (("x" * 500,) for _ in range(rows)))
+        maintenance.create_tables(conn)
+    with sqlite3.connect(path) as conn:
+        conn.execute("DELETE FROM notes")
+
+
+def pragma(path, name):
+    with sqlite3.connect(path) as conn:
+        return conn.execute(f"PRAGMA {name}").fetchone()[0]
+
+
+def test_convert_once(tmp_path):
+    path = tmp_path / "old.db"
+    make_old_db(path)
+    assert pragma(path, "auto_vacuum") == 0
+    assert maintenance.convert_auto_vacuum(path)
+    assert pragma(path, "auto_vacuum") == maintenance.AUTO_VACUUM_INCREMENTAL
+    assert not maintenance.convert_auto_vacuum(path)
+
+
+def test_big_databases_are_left_for_bmtb_vacuum(tmp_path, monkeypatch):
+    path = tmp_path / "old.db"
+    make_old_db(path)
+    monkeypatch.setattr(maintenance, "CONVERT_MAX_BYTES", 1000)
+    assert not maintenance.convert_auto_vacuum(path)
+    assert pragma(path, "auto_vacuum") == 0
+    # Upkeep still runs, without vacuuming
+    assert maintenance.release_free_pages(path) == 0
+    while maintenance.run_step(path, now=1e9):
+        pass
+    assert pragma(path, "freelist_count") > 0
+
+
+def test_free_pages_shrink_the_file(tmp_path):
+    path = tmp_path / "new.db"
+    with sqlite3.connect(path) as conn:
+        maintenance.create_tables(conn)
+    make_old_db(path)  # same tables, now in an incremental database
+    before = os.path.getsize(path)
+    assert maintenance.release_free_pages(path) > 0
+    assert pragma(path, "freelist_count") == 0
+    assert os.path.getsize(path) < before // 4
+    assert maintenance.release_free_pages(path) == 0
+
+
+def test_steps_analyze_then_stop(tmp_path):
+    path = tmp_path / "new.db"
+    make_old_db(path)
+    steps = 0
+    while maintenance.run_step(path, now=1e9):
+        steps += 1
+        assert steps < 100
+    with sqlite3.connect(path) as conn:
+        assert maintenance.get_meta(conn, "last_analyze") is not None
+        assert maintenance.get_meta(conn, "last_optimize") is not None
+    assert not maintenance.run_step(path, now=1e9 + 60)
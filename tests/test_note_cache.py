@@ -0,0 +1,47 @@
+# test_note_cache.py
+import sys
+
+from scripts.note_cache import NoteCache
+
+
+def test_hit_miss_and_version():
+    cache = NoteCache(1 << 20)
+    cache.put(1, 1, "text")
+    assert cache.get(1, 1) == "text"
+    assert cache.get(1, 2) is None  # saved since: outdated
+    assert cache.get(2, 1) is None
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_evicts_least_recently_used_by_bytes():
+    body = "x" * 1000
+    cache = NoteCache(3 * sys.getsizeof(body))
+    for note_id in (1, 2, 3):
+        cache.put(note_id, 1, body)
+    cache.get(1, 1)
+    cache.put(4, 1, body)
+    assert cache.get(2, 1) is None
+    assert all(cache.get(i, 1) == body for i in (1, 3, 4))
+    assert cache.size <= cache.budget
+
+
+def test_one_large_note_does_not_evict_the_rest():
+    cache = NoteCache(10_000)
+    cache.put(1, 1, "small")
+    cache.put(2, 1, "x" * 20_000)
+    assert cache.get(2, 1) is None
+    assert cache.get(1, 1) == "small"
+
+
+def test_put_replaces_and_size_is_tracked():
+    cache = NoteCache(1 << 20)
+    cache.put(1, 1, "a" * 100)
+    cache.put(1, 2, "b" * 10)
+    assert len(cache) == 1 and cache.size == sys.getsizeof("b" * 10)
+    cache.invalidate(1)
+    assert cache.size == 0
+    cache.put(None, 1, "unsaved notes are not cached")
+    assert len(cache) == 0
+    cache.put(3, 1, "c")
+    cache.clear()
+    assert (len(cache), cache.size) == (0, 0)
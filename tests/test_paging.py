@@ -0,0 +1,41 @@
+# test_paging.py
+"""Keyset pages of the notes list."""
+import sqlite3
+
+
+def add_notes_at(db, stamps):
+    """Notes with the given updated_at values (many share a second)."""
+    with sqlite3.connect(db.NOTES_DB) as conn:
+        conn.executemany(
+            "INSERT INTO notes (title, content, updated_at)"
+            " VALUES (?, ?, ?)",
+            ((f"note {i}", f"body {i}", stamp)
+             for i, stamp in enumerate(stamps)))
+
+
+def all_pages(db, limit, **kwargs):
+    pages, page = [], db.get_notes_page(limit, **kwargs)
+    while page:
+        pages.append(page)
+        page = db.get_notes_page(limit, after=db.page_cursor(page[-1]),
+                                 **kwargs)
+    return pages
+
+
+def test_pages_match_the_full_listing(db):
+    add_notes_at(db, [f"2024-01-0{1 + i % 3} 10:00:00" for i in range(25)])
+    pages = all_pages(db, 7)
+    assert [len(p) for p in pages] == [7, 7, 7, 4]
+    listed = [note["id"] for page in pages for note in page]
+    assert listed == [note["id"] for note in db.get_notes()]
+
+
+def test_pages_leave_out_content_unless_asked(db):
+    add_notes_at(db, ["2024-01-01 10:00:00"] * 3)
+    assert "content" not in db.get_notes_page(2)[0]
+    page = db.get_notes_page(2, with_content=True)
+    assert page[0]["content"] == "body 2"
+
+
+def test_empty_database(db):
+    assert db.get_notes_page() == []
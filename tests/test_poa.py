@@ -0,0 +1,73 @@
+# test_poa.py
+import sqlite3
+
+from scripts.poa import PoaScanner, extract_poas
+
+
+def test_extract_poas():
+    text = ("Plan\n- call the bank\n* [ ] buy milk\n- [x] done already\n"
+            "TODO: renew passport\n- call the bank\nnot a poa")
+    assert extract_poas(text) == ["call the bank", "buy milk",
+                                  "renew passport"]
+
+
+def set_updated_at(db, note_id, stamp):
+    with sqlite3.connect(db.NOTES_DB) as conn:
+        conn.execute("UPDATE notes SET updated_at = ? WHERE id = ?",
+                     (stamp, note_id))
+
+
+def scan_changed(db, cache_file, since):
+    """What NotesApp.send_new_poas does, without BMA."""
+    scanner = PoaScanner(cache_file)
+    notes = list(db.iter_notes(since=since))
+    new = scanner.scan(notes, str, complete=since is None)
+    if since is not None:
+        scanner.forget_deleted(db.get_existing_ids(scanner.note_ids()))
+    scanner.save()
+    return new, [note["id"] for note in notes], scanner
+
+
+def test_only_notes_saved_since_the_last_scan_are_read(db, tmp_path):
+    cache = tmp_path / "poas.json"
+    old = db.add_note("old", "- existing")
+    kept = db.add_note("kept", "- another")
+    gone = db.add_note("gone", "- soon deleted")
+    for note_id in (old, kept, gone):
+        set_updated_at(db, note_id, "2024-01-01 10:00:00")
+    new, _, _ = scan_changed(db, cache, None)
+    assert new == []  # the first scan only records
+
+    db.update_note(kept, "kept", "- another\n- and a new one")
+    db.delete_note(gone)
+    new, read, scanner = scan_changed(db, cache, "2024-06-01 00:00:00")
+    assert new == ["and a new one"]
+    assert read == [kept]
+    assert sorted(scanner.note_ids()) == [old, kept]
+
+    # Seen again (same second): nothing is reported twice
+    assert scan_changed(db, cache, "2024-06-01 00:00:00")[0] == []
+
+
+def test_cache_file_holds_no_note_text(tmp_path):
+    cache = tmp_path / "poas.json"
+    notes = [{"id": 1, "content": "- call the bank"}]
+    scanner = PoaScanner(cache)
+    scanner.scan(notes, str)
+    notes[0]["content"] += "\nTODO: renew passport"
+    assert scanner.scan(notes, str) == ["renew passport"]
+    scanner.save()
+    saved = cache.read_text(encoding="utf-8")
+    assert "bank" not in saved and "passport" not in saved
+    assert PoaScanner(cache).scan(notes, str) == []
+
+
+def test_old_cache_with_poa_texts_is_converted(tmp_path):
+    cache = tmp_path / "poas.json"
+    cache.write_text('{"1": {"hash": "stale", "poas": ["call the bank"]}}',
+                     encoding="utf-8")
+    scanner = PoaScanner(cache)
+    notes = [{"id": 1, "content": "- call the bank\n- buy milk"}]
+    assert scanner.scan(notes, str) == ["buy milk"]
+    scanner.save()
+    assert "bank" not in cache.read_text(encoding="utf-8")
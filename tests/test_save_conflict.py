@@ -0,0 +1,88 @@
+# test_save_conflict.py
+"""Versioned saves: stale versions are refused, both copies are kept."""
+import types
+
+import pytest
+
+from note_app import NotesApp
+from scripts.display_titles import DisplayTitles
+from scripts.editor_buffer import LineBuffer, TextChange
+from scripts.note_cache import NoteCache
+
+
+class Entry:
+    """Stands in for the title CTkEntry."""
+
+    def __init__(self, text=""):
+        self.text = text
+
+    def get(self):
+        return self.text
+
+    def delete(self, first, last=None):
+        self.text = ""
+
+    def insert(self, index, text):
+        self.text = text
+
+
+def make_app(notes, title, text):
+    """Just enough of a NotesApp to run save_current_note."""
+    buffer = LineBuffer("")
+    buffer.apply(TextChange("reset", 1, -1, text.split("\n"), text=text))
+    app = types.SimpleNamespace(
+        notes=notes, _note_ids={n["id"] for n in notes}, current_index=0,
+        title_entry=Entry(title), line_buffer=buffer, tag_filter=None,
+        encrypt=lambda s: s, note_cache=NoteCache(1 << 20),
+        title_index=None, display_titles=DisplayTitles(
+            types.SimpleNamespace(measure=len), 150),
+        journal=types.SimpleNamespace(checkpoint=lambda *a: None),
+        refresh_list=lambda: None)
+    for name in ("save_current_note", "_keep_both_copies",
+                 "get_current_note", "_index_title"):
+        setattr(app, name, getattr(NotesApp, name).__get__(app))
+    return app
+
+
+def test_update_bumps_the_version(db):
+    note_id = db.add_note("t", "one")
+    assert db.update_note(note_id, "t", "two", version=1) == 2
+    assert db.update_note(note_id, "t", "three") == 3
+    assert db.get_note(note_id)["version"] == 3
+
+
+def test_stale_version_raises_and_changes_nothing(db):
+    note_id = db.add_note("t", "one")
+    db.update_note(note_id, "t", "theirs", version=1)
+    with pytest.raises(db.SaveConflict) as raised:
+        db.update_note(note_id, "t", "ours", version=1)
+    assert (raised.value.expected, raised.value.found) == (1, 2)
+    note = db.get_note(note_id)
+    assert (note["content"], note["version"]) == ("theirs", 2)
+
+
+def test_saving_a_deleted_note_conflicts(db):
+    note_id = db.add_note("t", "one")
+    db.delete_note(note_id)
+    with pytest.raises(db.SaveConflict) as raised:
+        db.update_note(note_id, "t", "ours", version=1)
+    assert raised.value.found is None
+
+
+def test_conflicting_save_keeps_both_copies(db):
+    note_id = db.add_note("Plan", "original")
+    app = make_app([{"id": note_id, "title": "Plan", "version": 1}],
+                   "Plan", "ours")
+    db.update_note(note_id, "Plan", "theirs", version=1)  # elsewhere
+
+    app.save_current_note()
+
+    assert db.count_notes() == 2
+    ours, theirs = app.notes
+    assert theirs["id"] == note_id
+    assert db.get_note(note_id)["content"] == "theirs"
+    assert db.get_note(ours["id"])["content"] == "ours"
+    assert ours["title"] == "Plan (conflicting copy)"
+    assert app.title_entry.get() == ours["title"]
+    assert app.current_index == 0
+    assert app._note_ids == {note_id, ours["id"]}
@@ -0,0 +1,41 @@
+# test_text_stats.py
+import random
+
+from scripts.editor_buffer import LineBuffer, TextChange
+from scripts.text_stats import TextStats
+
+
+def test_counts():
+    stats = TextStats("Hello world\n\nthree more words")
+    assert (stats.words, stats.lines, stats.chars) == (5, 3, 29)
+    assert stats.summary() == (
+        "5 words   29 characters   3 lines   < 1 min read")
+
+
+def test_singular_and_reading_time():
+    assert TextStats("one").summary().startswith("1 word   3 characters"
+                                                 "   1 line")
+    assert TextStats("word " * 400).reading_minutes == 2
+
+
+def test_edits_match_counting_from_scratch():
+    rng = random.Random(1)
+    pieces = ["", "a", "two words", "don't stop", "  "]
+    stats, buffer = TextStats("start"), LineBuffer("start")
+    for _ in range(500):
+        first = rng.randint(1, len(buffer))
+        old_last = rng.randint(first, min(len(buffer), first + 2))
+        change = TextChange(
+            "insert", first, old_last,
+            [rng.choice(pieces) for _ in range(rng.randint(1, 3))])
+        stats.apply(change)
+        buffer.apply(change)
+        fresh = TextStats(buffer.text())
+        assert (stats.words, stats.chars, stats.lines)\
+            == (fresh.words, fresh.chars, fresh.lines)
+
+
+def test_reset_recounts():
+    stats = TextStats("a b c")
+    stats.apply(TextChange("reset", 1, -1, ["x", "y"], text="x\ny"))
+    assert (stats.words, stats.lines) == (2, 2)
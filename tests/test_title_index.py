@@ -0,0 +1,75 @@
+# test_title_index.py
+from scripts.title_index import TitleIndex
+
+
+def ids(results):
+    return [note_id for note_id, _ in results]
+
+
+def make_index():
+    return TitleIndex([
+        (1, "Meeting notes"),
+        (2, "Team meeting"),
+        (3, "Meet"),
+        (4, "Shopping list"),
+        (5, "Grocery list for the meetup"),
+    ])
+
+
+def test_ranking_exact_then_prefix_then_word_then_substring():
+    index = make_index()
+    # Same kind: the earlier match first
+    assert ids(index.search("meet")) == [3, 1, 2, 5]
+    assert ids(index.search("eting")) == [1, 2]
+
+
+def test_case_insensitive():
+    assert ids(make_index().search("SHOP")) == [4]
+
+
+def test_several_words_must_all_match():
+    index = make_index()
+    assert ids(index.search("list meet")) == [5]
+    assert ids(index.search("list gro")) == [5]
+    assert index.search("list team") == []
+
+
+def test_subsequence_only_when_nothing_else_matches():
+    index = make_index()
+    assert ids(index.search("mtg")) == [2, 1]  # shorter title first
+    assert ids(index.search("shp")) == [4]
+
+
+def test_limit_and_empty_query():
+    index = TitleIndex((i, f"note {i}") for i in range(1, 101))
+    assert len(index.search("note", limit=10)) == 10
+    # Nothing typed: the most recently used notes
+    assert ids(index.search("   ", limit=3)) == [100, 99, 98]
+
+
+def test_recently_used_notes_first_among_equals():
+    index = TitleIndex([(1, "Plan A"), (2, "Plan B"), (3, "Plan C")])
+    assert ids(index.search("plan")) == [3, 2, 1]
+    index.touch(1)  # opened
+    index.set(2, "Plan B")  # saved, same title
+    assert ids(index.search("plan")) == [2, 1, 3]
+    assert ids(index.search("")) == [2, 1, 3]
+    index.set(3, "Plan D")  # renamed
+    assert ids(index.search("plan", limit=1)) == [3]
+    index.remove(3)
+    assert ids(index.recent()) == [2, 1]
+
+
+def test_set_and_remove_keep_the_index_in_step():
+    index = make_index()
+    index.set(4, "Meeting agenda")
+    assert 4 in ids(index.search("agenda"))
+    assert index.search("shopping") == []
+    index.remove(1)
+    index.remove(1)  # already gone: no error
+    assert 1 not in ids(index.search("meet"))
+    assert len(index) == 4
+    index.set(6, "Brand new")
+    assert index.search("brand") == [(6, "Brand new")]
+    index.remove(6)
+    assert index.search("brand") == [] and "brand" not in index._words